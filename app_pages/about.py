@@ -0,0 +1,66 @@
+# ---- ABOUT US ----
+
+import streamlit as st
+
+from water_habits.assets import picture_html
+from water_habits.styles import apply_styles
+
+apply_styles("about")
+
+# Load images
+sjsu_img = picture_html("static/sjsu_logo.png", "about-image", "width:100px;", "SJSU logo", lazy=False)
+photo_img = picture_html("static/Photo4.jpg", "about-image", alt="Our team", sizes="(max-width: 768px) 100vw, 75vw", lazy=False)
+
+# ---- About Us Header
+st.markdown("<h1 style='text-align:center; color:black;'>👨‍🏫 About Us</h1>", unsafe_allow_html=True)
+
+# ---- Side-by-side layout for logo and photo
+col1, col2 = st.columns([1, 3])
+
+with col1:
+    st.markdown(f"""
+    <div style="text-align:center;">
+        {sjsu_img}
+    </div>
+    """, unsafe_allow_html=True)
+
+with col2:
+    st.markdown(f"""
+    <div style="text-align:center;">
+        {photo_img}
+        <div class="about-image-caption">
+            Front Row (L–R): Andy Nguyen, Bella Le, Gisselle Picho<br>
+            Back Row (L–R): Rachel Yengle, Shreya Sobti
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+# ---- Floating Card Text
+st.markdown("""
+<div class="about-card">
+<div class="about-text">
+
+We’re a team of students from **San José State University** who are passionate about teaching children sustainable water habits through play and interactive storytelling.
+
+🌍 **Our Mission:**  
+Our mission is to inspire young minds to become lifelong champions of water conservation.  
+We believe that children are not just the leaders of tomorrow — they are powerful change-makers today. Through fun, interactive learning, we aim to nurture a sense of responsibility, creativity, and care for our planet’s most precious resource: water.  
+By making sustainability exciting and accessible, we hope to plant seeds of awareness that grow into a future where every drop counts.
+
+✨ **About Water Habits for Kids:**  
+*Water Habits for Kids* is an educational platform created with young learners in mind.  
+Designed for children between the ages of 3–12, it blends playful storytelling, real-world tips, and interactive challenges to make saving water a natural and enjoyable part of everyday life.
+
+💧 **Fun Fact:**  
+Turning off the tap while brushing your teeth can save up to 8 gallons of water every day!
+
+🌊 **Why It Matters:**  
+Teaching children about water conservation from an early age is crucial because the habits they form now will shape the future of our planet.  
+Water is one of our most precious resources, yet it's often taken for granted.  
+By helping kids understand the value of every drop, we empower them to make smarter choices that reduce waste, protect ecosystems, and ensure clean water is available for generations to come.
+
+👉 Thank you for visiting our project — together, let's make every drop count! 🌱
+
+</div>
+</div>
+""", unsafe_allow_html=True)
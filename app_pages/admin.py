@@ -0,0 +1,63 @@
+# ---- ADMIN ----
+# Hidden page: not in the nav bar, and only shown with ?token=<ADMIN_TOKEN>
+# (from .streamlit/secrets.toml or the environment). Everything here is this
+# process's numbers.
+
+import streamlit as st
+
+from water_habits.progress import get_progress_store
+from water_habits.resources import (
+    get_breakers, get_image_store, get_llm_cache, get_scheduler, get_single_flight, get_tip_pool,
+)
+from water_habits.styles import apply_styles
+from water_habits.telemetry import TELEMETRY, token_matches
+
+apply_styles("admin")
+
+if not token_matches(st.query_params.get("token", "")):
+    st.error("🔒 Not available.")
+    st.stop()
+
+st.markdown("<h1 style='text-align:center;'>🛠️ Performance</h1>", unsafe_allow_html=True)
+
+# ---- Spans ----
+st.markdown("### ⏱️ Timings (seconds)")
+rows = TELEMETRY.summary()
+if rows:
+    st.dataframe(rows, hide_index=True, width="stretch")
+else:
+    st.info("No timings recorded yet.")
+
+# ---- Tokens ----
+st.markdown("### 🔤 Token usage")
+tokens = TELEMETRY.tokens()
+if tokens:
+    st.dataframe(tokens, hide_index=True, width="stretch")
+else:
+    st.info("No API calls yet.")
+
+# ---- Resilience + caches ----
+st.markdown("### 🧰 Breakers, queue and caches")
+col_left, col_right = st.columns(2)
+with col_left:
+    st.markdown("**Circuit breakers**")
+    st.json({name: breaker.stats() for name, breaker in get_breakers().items()})
+    st.markdown("**Scheduler**")
+    st.json(get_scheduler().stats())
+    st.markdown("**Single-flight**")
+    st.json(get_single_flight().stats())
+with col_right:
+    st.markdown("**LLM cache**")
+    st.json(get_llm_cache().stats())
+    st.markdown("**Image store**")
+    st.json(get_image_store().stats())
+    st.markdown("**Tip pool**")
+    st.json(get_tip_pool().stats())
+    st.markdown("**Progress store**")
+    st.json(get_progress_store().stats())
+
+# ---- Prometheus ----
+metrics = TELEMETRY.prometheus_text()
+st.download_button("📥 metrics.prom", metrics, file_name="metrics.prom", on_click="ignore")
+with st.expander("Prometheus text"):
+    st.code(metrics, language="text")
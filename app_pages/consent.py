@@ -0,0 +1,70 @@
+# ---- CONSENT PAGE ----
+# The only page registered until the visitor agrees; see WaterHabitsApp.py.
+
+import streamlit as st
+
+from water_habits.styles import apply_styles
+
+if 'show_privacy' not in st.session_state:
+    st.session_state.show_privacy = False
+if 'show_terms' not in st.session_state:
+    st.session_state.show_terms = False
+
+
+def show(flag, value):
+    st.session_state[flag] = value
+
+
+def accept_terms():
+    # The entry script registers the app pages on the next run and lands on Home
+    st.session_state.agreed_to_terms = True
+
+
+apply_styles("consent")
+
+# ---- Welcome Title ----
+st.markdown("<h1 style='text-align:center;'>🚸 Welcome to Water Habits for Kids</h1>", unsafe_allow_html=True)
+
+st.markdown("""
+Before using the app, please review and agree to our **Privacy Policy** and **Terms of Service**.
+""")
+
+# ---- Privacy Policy + Terms Buttons ----
+col_privacy, col_terms = st.columns(2)
+with col_privacy:
+    st.button("📜 View Privacy Policy", on_click=show, args=("show_privacy", True))
+with col_terms:
+    st.button("📜 View Terms of Service", on_click=show, args=("show_terms", True))
+
+# ---- Show Privacy Policy ----
+if st.session_state.show_privacy:
+    with st.expander("📜 Privacy Policy", expanded=True):
+        st.markdown("""
+        **Privacy Policy**  
+        We care about your privacy!  
+        - We do **not collect** your name, age, or any personal information.  
+        - We only track how many water-saving tips or stories you create to improve the app.  
+        - Your information stays private and is **never shared** with anyone else.  
+        By using this app, you agree to this simple, friendly privacy approach.
+        """)
+        st.button("❌ Close Privacy Policy", on_click=show, args=("show_privacy", False))
+
+# ---- Show Terms of Service ----
+if st.session_state.show_terms:
+    with st.expander("📜 Terms of Service", expanded=True):
+        st.markdown("""
+        **Terms of Service**  
+        This app is for **educational and fun purposes** only.  
+        - All tips and stories are AI-generated for inspiration, not for official advice.  
+        - You use this app at your own discretion.  
+        - We are not responsible for how you use the content outside of the app.  
+        By continuing, you agree to use this app responsibly.
+        """)
+        st.button("❌ Close Terms of Service", on_click=show, args=("show_terms", False))
+
+# ---- Agreement Checkbox ----
+agree = st.checkbox("✅ I have read and agree to the Privacy Policy and Terms of Service.")
+
+# ---- Continue Button ----
+if agree:
+    st.button("👉 Continue", on_click=accept_terms)
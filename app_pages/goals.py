@@ -0,0 +1,118 @@
+# ---- WATER GOALS ----
+
+import streamlit as st
+
+from water_habits.assets import picture_html
+from water_habits.progress import (
+    DAILY_GOAL, device_token, forget_device, get_progress_store, remember_device, sync_cookie, today,
+)
+from water_habits.styles import apply_styles
+
+apply_styles("goals")
+
+# Load images
+# The first photo is above the fold; the second loads lazily as the kid scrolls
+yard_img = picture_html("static/Kids_in_Yard.jpg", "goal-image", alt="Learning Rainwater Collection", lazy=False)
+bathroom_img = picture_html("static/Kids_in_Bathroom.jpg", "goal-image", alt="Practicing Water-Saving at Home")
+
+# Water-Saving Goals Header
+st.markdown("<h1 style='text-align:center; color:black;'>🌍 Water-Saving Goals</h1>", unsafe_allow_html=True)
+
+# First Image
+st.markdown(f"""
+<div style="text-align:center;">
+    {yard_img}
+    <div class="goal-image-caption">Learning Rainwater Collection</div>
+</div>
+""", unsafe_allow_html=True)
+
+# First Floating Card (Journey, Problem, Solution)
+st.markdown("""
+<div class="goals-card">
+<div class="goals-text">
+
+### Our Journey to Building Water Habits for Kids 🌱
+
+Our team started this project with one simple question:  
+*How can we teach young children the importance of water conservation in a way that truly sticks?*
+
+We realized that while many resources exist for adults, few tools truly engage children — especially through fun and empowerment.
+
+### Understanding the Problem 🚰
+- Kids respond better to **short, achievable actions** they can control.
+- **Positive reinforcement** boosts motivation.
+- **Stories and characters** help emotional connection.
+
+These insights shaped our goal: an interactive app where kids don't just learn — they **become water heroes**.
+
+### Building the Solution 💡
+**Water Habits for Kids** is designed to make small daily conservation habits fun and meaningful.
+
+</div>
+</div>
+""", unsafe_allow_html=True)
+
+# Second Image
+st.markdown(f"""
+<div style="text-align:center;">
+    {bathroom_img}
+    <div class="goal-image-caption">Practicing Water-Saving at Home</div>
+</div>
+""", unsafe_allow_html=True)
+
+# Second Floating Card (Water Goals Feature + Mission)
+st.markdown("""
+<div class="goals-card">
+<div class="goals-text">
+
+### Why We Created Water Goals 🎯
+Setting a goal gives kids ownership and pride in saving water!
+
+- Children pick one small daily action.
+- They track progress.
+- They celebrate success.
+
+### Our Mission 🌎
+To empower young generations to protect water through everyday choices — one small, joyful goal at a time.
+
+👉 Thank you for being part of the change! 🌱
+
+</div>
+</div>
+""", unsafe_allow_html=True)
+
+# ---- MY PROGRESS ----
+# Kept only after a grown-up opts in: counts under a random code in a cookie, no names
+sync_cookie()
+token = device_token()
+if token:
+    progress = get_progress_store().summary(token, today())
+    goal_line = "goal met! 🎉" if progress["goal_met_today"] else f"daily goal: {DAILY_GOAL}"
+    st.markdown(f"""
+<div class="goals-card">
+<div class="goals-text">
+
+### Our Progress 📈
+- Today: **{progress['today_tips']}** tips and **{progress['today_stories']}** stories ({goal_line})
+- 🔥 Streak: **{progress['streak']}** days in a row (best: {progress['best_streak']})
+- 🏆 Days we met our goal: **{progress['goal_days']}**
+- 💧 All together: {progress['tips']} tips and {progress['stories']} stories
+
+</div>
+</div>
+""", unsafe_allow_html=True)
+    st.button("🗑️ Forget our progress", on_click=forget_device)
+else:
+    st.markdown(f"""
+<div class="goals-card">
+<div class="goals-text">
+
+### Track Your Progress 📈
+Grown-ups: turn this on to count tips and stories on this device, keep a streak
+and see the days you reached {DAILY_GOAL} water-saving actions. We only store the counts,
+under a random code — never a name.
+
+</div>
+</div>
+""", unsafe_allow_html=True)
+    st.button("💾 Remember our progress on this device", on_click=remember_device)
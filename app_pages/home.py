@@ -0,0 +1,30 @@
+# ---- HOME ----
+
+import streamlit as st
+
+from water_habits.navigation import go
+from water_habits.styles import apply_styles
+
+apply_styles("home")
+
+st.markdown("<br><h1 style='text-align:center; color:#003344;'>💧 Welcome to Water Habits for Kids</h1>", unsafe_allow_html=True)
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("""
+    <div class='feature-card'>
+        <h3>💡 Water-Saving Tips</h3>
+        <p>Fun, personalized tips for kids to build daily conservation habits.</p>
+    """, unsafe_allow_html=True)
+    st.button("Start Tips", key="start_tips", on_click=go, args=("tips",))
+    st.markdown("</div>", unsafe_allow_html=True)
+
+with col2:
+    st.markdown("""
+    <div class='feature-card'>
+        <h3>📖 Eco Story + Game</h3>
+        <p>Interactive story and comic adventure to save water together!</p>
+    """, unsafe_allow_html=True)
+    st.button("Start Story", key="start_story", on_click=go, args=("story",))
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,235 @@
+# ---- STORY PAGE ----
+
+import time
+from concurrent.futures import as_completed
+
+import streamlit as st
+
+from water_habits.circuit_breaker import CircuitOpen
+from water_habits.image_store import normalize_panel, stored_panel_image
+from water_habits.llm import (
+    STORY_SCHEMA, STRUCTURED_STORY_MODEL,
+    offline_story, parse_story_bundle, partial_json_string, stream_into, structured_story_messages,
+)
+from water_habits.llm_cache import cached_completion, cached_stream
+from water_habits.openai_client import timeout_for
+from water_habits.progress import track
+from water_habits.resources import (
+    get_breakers, get_image_pool, get_image_store, get_llm_cache, get_single_flight, queued_client,
+)
+from water_habits.retry import ACTION_DEADLINES, DeadlineExceeded, is_retryable
+from water_habits.scheduler import SchedulerBusy
+from water_habits.single_flight import StreamAbandoned
+from water_habits.styles import apply_styles
+from water_habits.telemetry import TELEMETRY
+
+apply_styles("story")
+
+breakers = get_breakers()
+flight = get_single_flight()
+llm_cache = get_llm_cache()
+image_pool = get_image_pool()
+image_store = get_image_store()
+
+st.markdown("<h1 style='text-align:center;'>📖 Eco Story Adventure + Game</h1>", unsafe_allow_html=True)
+
+
+# ---- STORY AREA ----
+# A fragment: submitting the form reruns only this block (story, game and
+# comic), not the nav bar or the rest of the page.
+@st.fragment
+@TELEMETRY.timed("fragment_run", page="story")
+def story_area():
+    # Story choices, sent together when the button is pressed
+    with st.form("story_form", border=False):
+        hero = st.text_input("🧒 Hero’s Name", placeholder="e.g., Andy")
+        setting = st.selectbox("🌍 Choose a Story Setting", ["bathroom", "garden", "school", "beach", "forest"])
+        habit = st.selectbox("💧 Water Habit Focus", ["brushing teeth", "watering plants", "taking showers", "fixing leaks"])
+        generate = st.form_submit_button("✨ Generate My Eco Adventure")
+
+    theme = "Blue Drop"  # Set default theme automatically
+    hint_mode = True     # Set default hints on
+
+    # "structured" = one JSON-schema call for story + panels + tip (default)
+    # "two_call"  = original gpt-3.5 story, then a gpt-4 comic script; add ?pipeline=two_call to compare
+    pipeline = st.query_params.get("pipeline", "structured")
+
+    if generate:
+        # 📘 Personalized Story (streamed straight into the story card)
+        st.markdown("<h2 style='text-align:center;'>📘 Your Personalized Story</h2>", unsafe_allow_html=True)
+        story_slot = st.empty()
+        story_slot.markdown("<div class='story-card'><p>✍️ Writing your story...</p></div>", unsafe_allow_html=True)
+
+        def render_story(text, done):
+            cursor = "" if done else " ▌"
+            return f"<div class='story-card'><p>{text}{cursor}</p></div>"
+
+        def show_bundle(bundle):
+            story_slot.markdown(
+                render_story(f"{bundle['story']}<br><br>💧 <strong>Tip:</strong> {bundle['tip']}", True),
+                unsafe_allow_html=True
+            )
+            return bundle["story"], bundle["panels"]
+
+        panel_descriptions = []
+        deadline = time.monotonic() + ACTION_DEADLINES["story"]
+
+        # Offline mode: the API is degraded (circuit open), so don't make anyone wait on it
+        offline = breakers["chat"].is_open()
+
+        try:
+            if offline:
+                story, panel_descriptions = show_bundle(offline_story(hero, setting, habit))
+            elif pipeline == "two_call":
+                story_prompt = (
+                    f"Write a fun children's story about {hero}, a young eco-hero in the {setting}, "
+                    f"learning to save water by practicing {habit}. Include a friendly sidekick and end with a water-saving tip."
+                )
+
+                pieces = cached_stream(
+                    llm_cache, queued_client("story", story_slot, deadline), "story", flight,
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": "You are a creative children's storyteller focused on sustainability."},
+                        {"role": "user", "content": story_prompt}
+                    ],
+                    max_tokens=800,
+                    temperature=0.8,
+                    timeout=timeout_for("story")
+                )
+
+                story = stream_into(story_slot, pieces, render_story)
+            else:
+                pieces = cached_stream(
+                    llm_cache, queued_client("story", story_slot, deadline), "story", flight,
+                    model=STRUCTURED_STORY_MODEL,
+                    messages=structured_story_messages(hero, setting, habit),
+                    response_format={"type": "json_schema", "json_schema": STORY_SCHEMA},
+                    max_tokens=1200,
+                    temperature=0.8,
+                    timeout=timeout_for("story")
+                )
+
+                # The JSON streams in; show the "story" field as it grows
+                raw = stream_into(
+                    story_slot,
+                    pieces,
+                    lambda text, done: render_story(partial_json_string(text, "story"), done)
+                )
+                try:
+                    with TELEMETRY.span("panel_parse", page="story", pipeline="structured"):
+                        bundle = parse_story_bundle(raw)
+                    story, panel_descriptions = show_bundle(bundle)
+                except ValueError:
+                    # Malformed or too few panels: keep whatever story streamed, use the offline comic and tip
+                    fallback = offline_story(hero, setting, habit)
+                    story, panel_descriptions = show_bundle(
+                        {**fallback, "story": partial_json_string(raw, "story").strip() or fallback["story"]}
+                    )
+        except Exception as e:
+            if not (isinstance(e, (CircuitOpen, SchedulerBusy, DeadlineExceeded, StreamAbandoned)) or is_retryable(e)):
+                raise
+            # API trouble (or a shared stream cut off) before the story arrived: fall back to the offline story
+            offline = True
+            story, panel_descriptions = show_bundle(offline_story(hero, setting, habit))
+        track("story")
+
+        with st.spinner("Creating your game and comic..."):
+
+            # Game Rules
+            rules = {
+                "brushing teeth": {"challenge": "🪥 Tap to turn off faucet.", "goal": "Save 10 gallons!", "points": "+5 per tap, -2 miss."},
+                "watering plants": {"challenge": "🌿 Water dry plants only.", "goal": "Healthy garden!", "points": "+10 good, -5 overwater."},
+                "taking showers": {"challenge": "🚿 Finish in 2 min.", "goal": "Save 5 gallons!", "points": "+2 per second saved."},
+                "fixing leaks": {"challenge": "🔧 Tap leaks fast.", "goal": "Fix 10 leaks!", "points": "+5 fix, -3 miss."}
+            }
+
+            game = rules.get(habit.lower(), {
+                "challenge": "💧 Make smart water choices!",
+                "goal": "Reduce waste!",
+                "points": "+5 per action."
+            })
+
+            # 🎮 Water-Saving Game
+            st.markdown("<h2 style='text-align:center;'>🎮 Your Water-Saving Game</h2>", unsafe_allow_html=True)
+            st.markdown(f"""
+            <div class='story-card'>
+            <p><strong>Challenge:</strong> {game['challenge']}</p>
+            <p><strong>Goal:</strong> {game['goal']}</p>
+            <p><strong>Scoring:</strong> {game['points']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # 🎬 Eco Comic
+            st.markdown("<h2 style='text-align:center;'>🎬 Your Eco Adventure Comic</h2>", unsafe_allow_html=True)
+
+            if pipeline == "two_call" and not offline:
+                scene_prompt = (
+                    f"Create a 4-6 panel comic script from this story. Number panels (1., 2., etc.) and 1-2 sentences each.\n\nStory:\n{story}"
+                )
+
+                comic_slot = st.empty()
+                try:
+                    scene_text = cached_completion(
+                        llm_cache, queued_client("comic", comic_slot, deadline), "comic", flight,
+                        model="gpt-4",
+                        messages=[{"role": "user", "content": scene_prompt}],
+                        timeout=timeout_for("comic")
+                    )
+                    comic_slot.empty()
+                except Exception as e:
+                    if not (isinstance(e, (CircuitOpen, SchedulerBusy, DeadlineExceeded)) or is_retryable(e)):
+                        raise
+                    comic_slot.warning("🚦 So many water heroes right now! Your comic will have to wait — try again in a minute.")
+                    return
+
+                import re
+                with TELEMETRY.span("panel_parse", page="story", pipeline="two_call"):
+                    panel_descriptions = [
+                        re.sub(r"^\d+\.\s*", "", panel.strip())
+                        for panel in re.findall(r'\d\.\s.*?(?=\n\d\.|\Z)', scene_text, re.DOTALL)
+                    ]
+                if not panel_descriptions:
+                    # An unnumbered script: tell the comic with the offline panels rather than show raw output
+                    panel_descriptions = offline_story(hero, setting, habit)["panels"]
+
+            if panel_descriptions:
+                # Show every panel's text right away, with an empty slot for its image
+                panels = []
+                for i, panel_cleaned in enumerate(panel_descriptions, start=1):
+                    st.markdown(f"""
+                    <div class="story-card">
+                    <h4>Panel {i}</h4>
+                    <p>{panel_cleaned}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    image_slot = st.empty()
+                    panels.append((i, panel_cleaned, image_slot))
+
+                if offline or breakers["images"].is_open():
+                    # No pictures today; the panel text tells the comic on its own
+                    st.caption("🎨 Our comic artist is taking a break — imagine the pictures!")
+                    panels = []
+                for i, panel_cleaned, image_slot in panels:
+                    image_slot.caption(f"🎨 Drawing Panel {i}...")
+
+                # Request all panel images at once; fill each slot as soon as its image is ready
+                futures = {
+                    image_pool.submit(
+                        flight.do, ("image", normalize_panel(panel_cleaned, theme)),
+                        stored_panel_image, image_store, queued_client("image", deadline=deadline),
+                        panel_cleaned, theme, timeout_for("image")
+                    ): (i, panel_cleaned, image_slot)
+                    for i, panel_cleaned, image_slot in panels
+                }
+                for future in as_completed(futures):
+                    i, panel_cleaned, image_slot = futures[future]
+                    try:
+                        image_slot.image(future.result(), caption=f"Panel {i}")
+                    except Exception:
+                        with image_slot.container():
+                            st.warning(f"⚠️ Could not generate image for Panel {i}.")
+                            st.text(f"Panel description: {panel_cleaned}")
+
+
+story_area()
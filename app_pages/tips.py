@@ -0,0 +1,129 @@
+# ---- TIPS PAGE ----
+
+import time
+
+import streamlit as st
+
+from water_habits.circuit_breaker import CircuitOpen
+from water_habits.llm_cache import cached_completion
+from water_habits.openai_client import timeout_for
+from water_habits.progress import track
+from water_habits.resources import (
+    get_breakers, get_llm_cache, get_single_flight, get_tip_index, get_tip_pool, queued_client,
+)
+from water_habits.retry import ACTION_DEADLINES, DeadlineExceeded, is_retryable
+from water_habits.scheduler import SchedulerBusy
+from water_habits.styles import apply_styles
+from water_habits.telemetry import TELEMETRY
+from water_habits.tip_history import EXPORTS, TipHistory, exporter
+from water_habits.tip_pool import tip_request
+
+apply_styles("tips")
+
+breakers = get_breakers()
+flight = get_single_flight()
+llm_cache = get_llm_cache()
+tip_pool = get_tip_pool()
+tip_index = get_tip_index()
+
+# ---- SESSION STATE ----
+if 'tips_used' not in st.session_state:
+    st.session_state.tips_used = 0
+if 'last_tip' not in st.session_state:
+    st.session_state.last_tip = ""
+if 'tip_history' not in st.session_state:
+    st.session_state.tip_history = TipHistory()
+
+st.markdown("<h2 class='custom-header'>💡 Personalized Water-Saving Tip</h2>", unsafe_allow_html=True)
+
+
+# ---- TIP AREA ----
+# A fragment: submitting the form reruns only this block, not the nav bar or
+# the rest of the page. Typing and sliding do nothing until the form is sent.
+@st.fragment
+@TELEMETRY.timed("fragment_run", page="tips")
+def tip_area():
+    # Input fields, sent together when the button is pressed
+    with st.form("tip_form", border=False):
+        child_name = st.text_input("👶 Child's Name", placeholder="e.g Rachel")
+
+        child_age = st.slider("🎂 Child's Age", min_value=3, max_value=12, value=6)
+
+        routine = st.selectbox("🛁 Which routine?", tip_index.routines + ["Other"])
+
+        # Generate Tip Button
+        generate = st.form_submit_button("✨ Generate Tip")
+
+    if generate:
+        if not child_name:
+            st.warning("⚠️ Please enter your child's name.")
+        else:
+            age_group = tip_index.age_group_for(child_age)
+            row = tip_index.pick(age_group, routine)
+
+            if row is not None:
+                base = row.kid_friendly_phrase
+                challenge = row.challenge_idea
+            else:
+                base = "Always remember to turn off the water when you can!"
+                challenge = "Try to use less water today!"
+
+            wait_slot = st.empty()
+            deadline = time.monotonic() + ACTION_DEADLINES["tip"]
+            try:
+                # Local pool first; only go to the API if this combination has nothing left
+                final_tip = tip_pool.draw(base, child_age)
+                if final_tip is None:
+                    if breakers["chat"].is_open():
+                        raise CircuitOpen("openai-chat")
+                    final_tip = cached_completion(
+                        llm_cache, queued_client("tip", wait_slot, deadline), "tip", flight,
+                        timeout=timeout_for("tip"),
+                        **tip_request(base, child_age)
+                    )
+            except Exception as e:
+                if isinstance(e, (CircuitOpen, SchedulerBusy, DeadlineExceeded)) or is_retryable(e):
+                    # API is slow, busy or down: serve the curated CSV phrase right away
+                    final_tip = base
+                else:
+                    final_tip = None
+                    st.error(f"API error: {e}")
+            wait_slot.empty()
+
+            if final_tip:
+                st.markdown(f"""
+                    <div class="tip-box">
+                        💡 <strong>{final_tip}</strong><br><br>
+                        🎯 <em>Challenge:</em> {challenge}
+                    </div>
+                """, unsafe_allow_html=True)
+                st.session_state.tip_history.add(child_name, child_age, routine, final_tip, challenge)
+                st.session_state.last_tip = final_tip
+                st.session_state.tips_used += 1
+                track("tip")
+
+    # Tip History & Download
+    if st.session_state.tips_used > 0:
+        st.markdown("<h3 class='custom-subheader'>📊 Tip Progress</h3>", unsafe_allow_html=True)
+
+        st.markdown(f"""
+        <div style='color: black; font-weight: bold; font-size: 20px;'>
+            ✅ Tips Generated: {st.session_state.tips_used}
+        </div>
+    """, unsafe_allow_html=True)
+        st.markdown(f"<div class='most-recent'>💡 <strong>Most Recent Tip:</strong> {st.session_state.last_tip}</div>", unsafe_allow_html=True)
+
+        # The files are only built when a button is clicked, never on a rerun
+        st.markdown("<div style='color: black; font-weight: bold;'>📥 Download All My Tips</div>", unsafe_allow_html=True)
+        history = st.session_state.tip_history
+        for column, (fmt, (file_name, mime, _)) in zip(st.columns(len(EXPORTS)), EXPORTS.items()):
+            with column:
+                st.download_button(
+                    fmt.upper(), exporter(history, fmt), file_name=file_name, mime=mime,
+                    key=f"download_{fmt}", on_click="ignore",
+                )
+    else:
+        st.markdown("<div class='custom-info'>📝 No tips yet — generate one above!</div>", unsafe_allow_html=True)
+
+
+tip_area()
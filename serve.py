@@ -0,0 +1,32 @@
+# ---- ASGI ENTRY POINT ----
+# WaterHabitsApp.py wrapped in st.App, so the server can send headers and
+# answer routes that `streamlit run WaterHabitsApp.py` can't:
+#   - long-lived Cache-Control on versioned static files (water_habits/static_cache.py)
+#   - GET /metrics, the Prometheus text for this process, with
+#     "Authorization: Bearer <ADMIN_TOKEN>" (or ?token=<ADMIN_TOKEN>)
+#
+#   streamlit run serve.py
+#   uvicorn serve:app --port 8501
+
+import streamlit as st
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from water_habits.static_cache import StaticCacheMiddleware
+from water_habits.telemetry import TELEMETRY, token_matches
+
+
+async def metrics(request):
+    auth = request.headers.get("authorization", "")
+    given = auth[len("Bearer "):] if auth.startswith("Bearer ") else request.query_params.get("token", "")
+    if not token_matches(given):
+        return PlainTextResponse("Not available.\n", status_code=404)
+    return PlainTextResponse(TELEMETRY.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+app = st.App(
+    "WaterHabitsApp.py",
+    routes=[Route("/metrics", metrics)],
+    middleware=[Middleware(StaticCacheMiddleware)],
+)
@@ -0,0 +1 @@
+# WATER HABITS FOR KIDS - shared helpers used by the Streamlit app
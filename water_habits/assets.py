@@ -0,0 +1,136 @@
+# ---- STATIC ASSETS ----
+# Images in static/ are referenced by URL (served by Streamlit's static file
+# server) instead of being base64-encoded into the page on every rerun.
+# URLs carry a content hash (?v=...), so browsers can cache them for a long
+# time and still pick up a changed file right away. Streamlit's static route
+# sends no Cache-Control of its own; run the app through serve.py, whose
+# middleware (static_cache.py) marks versioned URLs immutable.
+
+import base64
+import functools
+import hashlib
+import mimetypes
+import os
+import pathlib
+
+import streamlit as st
+
+from water_habits.telemetry import TELEMETRY
+
+STATIC_DIR = pathlib.Path("static")
+STATIC_URL = "app/static"  # where Streamlit serves static/ when enableStaticServing is on
+
+
+@functools.lru_cache(maxsize=128)
+def _content_hash(path, mtime_ns):
+    # mtime_ns is only part of the cache key, so an edited file gets re-hashed
+    with TELEMETRY.span("asset_encode", step="hash"):
+        digest = hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
+    return digest[:12]
+
+
+@functools.lru_cache(maxsize=32)
+def _data_uri(path, mtime_ns):
+    with TELEMETRY.span("asset_encode", step="base64"):
+        data = pathlib.Path(path).read_bytes()
+        mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def content_hash(path):
+    """Short sha256 of a file, computed once per process per file version."""
+    return _content_hash(str(path), os.stat(path).st_mtime_ns)
+
+
+def static_serving_enabled():
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def asset_url(path):
+    """Cacheable URL for a file in static/, or a data: URI if static serving is off."""
+    path = pathlib.Path(path)
+    if static_serving_enabled() and path.parent == STATIC_DIR:
+        # Versioned, so serve.py's StaticCacheMiddleware can let browsers keep it for a year
+        return f"{STATIC_URL}/{path.name}?v={content_hash(path)}"
+    return img_to_data_uri(path)
+
+
+def img_to_data_uri(path):
+    """Base64 data: URI fallback, encoded once per process per file version."""
+    return _data_uri(str(path), os.stat(path).st_mtime_ns)
+
+
+# ---- RESPONSIVE VARIANTS ----
+# Built by `python -m water_habits.build_assets` into static/build/.
+# Everything below falls back to the original file if the build has not run.
+
+BUILD_DIR = STATIC_DIR / "build"
+MANIFEST = BUILD_DIR / "manifest.json"
+FORMAT_TYPES = {"avif": "image/avif", "webp": "image/webp"}  # best format first
+
+
+@functools.lru_cache(maxsize=4)
+def _read_manifest(mtime_ns):
+    import json
+    return json.loads(MANIFEST.read_text())
+
+
+def image_variants(path):
+    """Manifest entry for static/<name> if its built variants match the current file."""
+    path = pathlib.Path(path)
+    if not static_serving_enabled():
+        return None
+    try:
+        entry = _read_manifest(os.stat(MANIFEST).st_mtime_ns).get(path.name)
+    except (OSError, ValueError):
+        return None
+    if not entry or not entry["hash"].startswith(content_hash(path)):
+        return None  # stale build: serve the original until it is rebuilt
+    return entry
+
+
+def _srcset(files):
+    return ", ".join(f"{STATIC_URL}/build/{name} {width}w" for width, name in files)
+
+
+def picture_html(path, css_class="", style="", alt="", sizes="100vw", lazy=True):
+    """<picture> with AVIF/WebP srcsets, a blur placeholder and optional lazy loading."""
+    loading = 'loading="lazy" decoding="async"' if lazy else 'decoding="async"'
+    entry = image_variants(path)
+    if entry is None:
+        return f'<img src="{asset_url(path)}" class="{css_class}" style="{style}" alt="{alt}" {loading}>'
+
+    sources = "".join(
+        f'<source type="{mime}" srcset="{_srcset(entry["variants"][fmt])}" sizes="{sizes}">'
+        for fmt, mime in FORMAT_TYPES.items()
+        if entry["variants"].get(fmt)
+    )
+    placeholder = (
+        f"background-image:url('{entry['placeholder']}');background-size:cover;"
+    )
+    return (
+        f"<picture>{sources}"
+        f'<img src="{asset_url(path)}" class="{css_class}" style="{placeholder}{style}" alt="{alt}" '
+        f'width="{entry["width"]}" height="{entry["height"]}" {loading}>'
+        f"</picture>"
+    )
+
+
+def background_css(path, max_width=1600):
+    """CSS background-image value(s): the original, then an image-set() of built variants."""
+    css = f'background-image: url("{asset_url(path)}");'
+    entry = image_variants(path)
+    if entry is None:
+        return css
+    options = []
+    for fmt, mime in FORMAT_TYPES.items():
+        files = [f for f in entry["variants"].get(fmt, []) if f[0] <= max_width]
+        if files:
+            options.append(f'url("{STATIC_URL}/build/{files[-1][1]}") type("{mime}")')
+    if options:
+        # Browsers without image-set() type() support keep the plain url() above
+        css += f" background-image: image-set({', '.join(options)});"
+    return css
@@ -0,0 +1,351 @@
+# ---- BENCHMARKS ----
+# Headless per-page benchmarks with AppTest: rerun wall time, peak memory
+# and the size of what each run sends to the browser.
+#
+#   python -m water_habits.bench                    # compare with bench/baseline.json; exits 1 on a regression
+#   python -m water_habits.bench --record           # first capture real API answers to bench/recordings.jsonl
+#   python -m water_habits.bench --update-baseline  # make this run the new baseline
+#   python -m water_habits.bench --pages tips story --repeats 9 --out report.json
+#
+# Every page runs in its own fresh interpreter, in a scratch copy of the app
+# with an empty .cache/, so pool, answer and image caches start cold every
+# time. API calls are answered from the recordings (water_habits.replay) with
+# their recorded latencies; without recordings the "generate" steps are skipped.
+#
+# Steps, each repeated --repeats times (one unmeasured warm-up first):
+#   cold      first session after the page's shared resources were rebuilt
+#   first     a second new session (resources warm)
+#   rerun     the same session again, no input
+#   generate  tips/story: fill the form and submit it (API calls replayed)
+
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from water_habits.navigation import PAGES
+from water_habits.replay import RECORD_ENV, REPLAY_ENV, SPEED_ENV
+from water_habits.styles import payload_bytes
+
+BASELINE = "bench/baseline.json"
+RECORDINGS = "bench/recordings.jsonl"
+REPORT = ".cache/bench_report.json"
+DEFAULT_REPEATS = 5
+STEP_TIMEOUT = 300  # seconds; a replayed story + four images can take a while at speed 1
+
+# A step regresses only when it's over the baseline by both the ratio and the absolute slack
+TOLERANCES = {
+    "wall_ms": (1.25, 10.0),
+    "peak_kb": (1.20, 256.0),
+    "delta_bytes": (1.05, 64),
+}
+
+# Copied into the scratch app (scripts are resolved by path); data is linked
+_COPY = ("WaterHabitsApp.py", "app_pages")
+_LINK = ("static", "expanded_tips_data.csv", ".streamlit")
+
+
+# ---- INTERACTIONS ----
+
+def _button(at, label):
+    return next(b for b in at.button if label in b.label)
+
+
+def _submit_tip(at):
+    at.text_input[0].input("Rachel")
+    at.slider[0].set_value(7)
+    _button(at, "Generate Tip").click()
+
+
+def _submit_story(at):
+    at.text_input[0].input("Andy")
+    _button(at, "Eco Adventure").click()
+
+
+INTERACTIONS = {"tips": _submit_tip, "story": _submit_story}
+
+
+# ---- WORKER (one page, in its own interpreter) ----
+
+def _session(script, page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(script, default_timeout=STEP_TIMEOUT)
+    at.secrets["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY", "sk-bench")
+    if page != "consent":
+        at.session_state.agreed_to_terms = True
+        at.switch_page(os.path.join(os.path.dirname(script), "app_pages", f"{page}.py"))
+    return at
+
+
+def _run(at, name, prepare=None):
+    """(seconds, delta bytes, peak KiB or None) for one run of `at`."""
+    if prepare is not None:
+        prepare(at)
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    at.run()
+    seconds = time.perf_counter() - started
+    peak_kb = (tracemalloc.get_traced_memory()[1] - before) / 1024 if tracemalloc.is_tracing() else None
+    if at.exception:
+        raise RuntimeError(f"{name}: {at.exception[0].value}")
+    return seconds, payload_bytes(at.main), peak_kb
+
+
+def _reset_resources():
+    """Drop the page-facing caches so the next session starts them cold."""
+    from water_habits.resources import get_image_store, get_llm_cache, get_tip_index, get_tip_pool
+
+    for getter in (get_llm_cache, get_tip_pool, get_image_store, get_tip_index):
+        getter.clear()
+    shutil.rmtree(".cache", ignore_errors=True)
+
+
+def _round(script, page, api, seed):
+    """{step: (seconds, delta bytes, peak KiB)} for one pass over the page's steps."""
+    random.seed(seed)
+    _reset_resources()
+    steps = {"cold": _run(_session(script, page), "cold")}
+    at = _session(script, page)
+    steps["first"] = _run(at, "first")
+    steps["rerun"] = _run(at, "rerun")
+    if api and page in INTERACTIONS:
+        steps["generate"] = _run(at, "generate", INTERACTIONS[page])
+    return steps
+
+
+def nearest_rank(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def bench_page(page, script="WaterHabitsApp.py", repeats=DEFAULT_REPEATS, api=False):
+    """{step: {"wall_ms": {median, p95, min}, "peak_kb", "delta_bytes"}} for one page, in this process."""
+    script = os.path.abspath(script)
+    _round(script, page, api, seed=-1)  # warm-up: imports and first-use costs are import_budget's job
+    timings = {}
+    for repeat in range(repeats):
+        for step, (seconds, delta, _) in _round(script, page, api, seed=repeat).items():
+            timings.setdefault(step, {"seconds": [], "delta": []})
+            timings[step]["seconds"].append(seconds)
+            timings[step]["delta"].append(delta)
+
+    # Memory gets its own pass: tracing slows every allocation down, so it mustn't touch the timings
+    tracemalloc.start()
+    try:
+        peaks = {step: peak for step, (_, _, peak) in _round(script, page, api, seed=0).items()}
+    finally:
+        tracemalloc.stop()
+
+    report = {}
+    for step, values in timings.items():
+        ms = [s * 1000 for s in values["seconds"]]
+        report[step] = {
+            "wall_ms": {
+                "median": round(statistics.median(ms), 2),
+                "p95": round(nearest_rank(ms, 0.95), 2),
+                "min": round(min(ms), 2),
+            },
+            "peak_kb": round(peaks[step], 1),
+            "delta_bytes": max(values["delta"]),
+        }
+    return report
+
+
+def _worker(page, script, repeats, api, out):
+    report = {"steps": bench_page(page, script, repeats, api)}
+    if api:
+        from water_habits.resources import get_client
+
+        client = get_client()
+        if hasattr(client, "stats"):
+            report["replay"] = client.stats()
+    with open(out, "w") as f:
+        json.dump(report, f)
+
+
+# ---- ORCHESTRATION ----
+
+def scratch_app(root, secrets=None):
+    """A scratch copy of the app: scripts copied, data linked, no .cache/.
+
+    With `secrets`, .streamlit/ is a real directory holding the config and a
+    secrets.toml with those keys, so nothing is written into the checkout.
+    """
+    sandbox = tempfile.mkdtemp(prefix="wh-app-")
+    for name in _COPY:
+        source = os.path.join(root, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(sandbox, name), ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(source, sandbox)
+    for name in _LINK:
+        if os.path.exists(os.path.join(root, name)) and not (secrets is not None and name == ".streamlit"):
+            os.symlink(os.path.join(root, name), os.path.join(sandbox, name))
+    if secrets is not None:
+        config_dir = os.path.join(sandbox, ".streamlit")
+        os.makedirs(config_dir)
+        if os.path.exists(os.path.join(root, ".streamlit", "config.toml")):
+            shutil.copy2(os.path.join(root, ".streamlit", "config.toml"), config_dir)
+        with open(os.path.join(config_dir, "secrets.toml"), "w") as f:
+            f.writelines(f"{key} = {json.dumps(value)}\n" for key, value in secrets.items())
+    return sandbox
+
+
+def run_page(page, script="WaterHabitsApp.py", repeats=DEFAULT_REPEATS, env=None):
+    """Benchmark one page in a fresh interpreter and scratch app; returns the worker's report."""
+    root = os.path.dirname(os.path.abspath(script))
+    sandbox = scratch_app(root)
+    out = os.path.join(sandbox, "report.json")
+    env = {**os.environ, **(env or {})}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    api = bool(env.get(REPLAY_ENV) or env.get(RECORD_ENV))
+    try:
+        command = [
+            sys.executable, "-m", "water_habits.bench", "--worker", page,
+            "--script", os.path.join(sandbox, os.path.basename(script)),
+            "--repeats", str(repeats), "--worker-out", out,
+        ]
+        if api:
+            command.append("--api")
+        result = subprocess.run(command, cwd=sandbox, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise RuntimeError(f"{page}: {(result.stderr.strip().splitlines() or ['worker failed'])[-1]}")
+        with open(out) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+
+def record(pages, script="WaterHabitsApp.py", path=RECORDINGS):
+    """Run every interactive page once against the real API, saving each response to `path`."""
+    from water_habits.tip_pool import _api_key
+
+    if os.path.exists(path):
+        os.remove(path)
+    env = {RECORD_ENV: os.path.abspath(path), "OPENAI_API_KEY": _api_key()}
+    for page in pages:
+        if page in INTERACTIONS:
+            run_page(page, script, repeats=1, env=env)
+
+
+def run(pages, script="WaterHabitsApp.py", repeats=DEFAULT_REPEATS, recordings=RECORDINGS, speed=1.0):
+    """The full report: environment, then per page its steps (and replay hit counts)."""
+    api = os.path.exists(recordings)
+    env = {REPLAY_ENV: os.path.abspath(recordings), SPEED_ENV: str(speed)} if api else {}
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "streamlit": _version("streamlit"),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeats": repeats,
+            "replay": os.path.basename(recordings) if api else None,
+            "replay_speed": speed if api else None,
+        },
+        "pages": {},
+    }
+    for page in pages:
+        worker = run_page(page, script, repeats, env)
+        report["pages"][page] = worker["steps"]
+        if "replay" in worker:
+            report["meta"].setdefault("replay_calls", {})[page] = worker["replay"]
+    return report
+
+
+def _version(package):
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def compare(report, baseline):
+    """Regressions against `baseline`, as readable lines; steps it doesn't have are ignored."""
+    problems = []
+    for page, steps in report["pages"].items():
+        for step, now in steps.items():
+            before = baseline.get("pages", {}).get(page, {}).get(step)
+            if before is None:
+                continue
+            for metric, (ratio, slack) in TOLERANCES.items():
+                new, old = now[metric], before[metric]
+                if isinstance(new, dict):
+                    new, old = new["median"], old["median"]
+                if new > old * ratio and new - old > slack:
+                    problems.append(f"{page}/{step} {metric}: {old} -> {new} (+{(new / old - 1) * 100 if old else 100:.0f}%)")
+    return problems
+
+
+def _print(report):
+    print(f"{'page':8} {'step':9} {'median ms':>10} {'p95 ms':>8} {'peak KiB':>9} {'delta B':>8}")
+    for page, steps in report["pages"].items():
+        for step, m in steps.items():
+            print(
+                f"{page:8} {step:9} {m['wall_ms']['median']:>10.1f} {m['wall_ms']['p95']:>8.1f} "
+                f"{m['peak_kb']:>9.0f} {m['delta_bytes']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    all_pages = ["consent", *PAGES]
+    parser = argparse.ArgumentParser(description="Per-page AppTest benchmarks with recorded API answers.")
+    parser.add_argument("--script", default="WaterHabitsApp.py")
+    parser.add_argument("--pages", nargs="+", choices=all_pages, default=all_pages)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--recordings", default=RECORDINGS, help="API recordings to replay (JSON lines)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay recorded latencies this many times faster")
+    parser.add_argument("--record", action="store_true", help="re-record the API answers with the real API first")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write this run as the baseline")
+    parser.add_argument("--out", default=REPORT, help="where to write the JSON report")
+    parser.add_argument("--worker", choices=all_pages, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-out", help=argparse.SUPPRESS)
+    parser.add_argument("--api", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.script, args.repeats, args.api, args.worker_out)
+        sys.exit(0)
+
+    if args.record:
+        record(args.pages, args.script, args.recordings)
+    elif not os.path.exists(args.recordings):
+        print(f"no {args.recordings}: skipping the generate steps (record them with --record)")
+
+    report = run(args.pages, args.script, args.repeats, args.recordings, args.speed)
+    _print(report)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"report: {args.out}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"baseline updated: {args.baseline}")
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline} (create one with --update-baseline)")
+        sys.exit(0)
+    with open(args.baseline) as f:
+        problems = compare(report, json.load(f))
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,134 @@
+# ---- IMAGE BUILD STEP ----
+# Produces resized WebP/AVIF variants and a tiny blurred placeholder for the
+# photos in static/, plus a manifest the app reads to emit srcset/<picture>.
+#
+#   python -m water_habits.build_assets          # incremental
+#   python -m water_habits.build_assets --force  # rebuild everything
+#
+# Files whose content hash matches the manifest are skipped.
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import pathlib
+
+from PIL import Image, ImageFilter, features
+
+STATIC_DIR = pathlib.Path("static")
+BUILD_DIR = STATIC_DIR / "build"
+MANIFEST = BUILD_DIR / "manifest.json"
+
+# Photos worth optimizing (logos are small PNGs and stay as they are)
+SOURCES = ["Background.jpg", "Kids_in_Yard.jpg", "Kids_in_Bathroom.jpg", "Photo4.jpg"]
+WIDTHS = [480, 960, 1600]
+PLACEHOLDER_WIDTH = 24
+
+QUALITY = {"webp": 78, "avif": 55}
+
+
+def available_formats():
+    formats = ["webp"] if features.check("webp") else []
+    if features.check("avif"):
+        formats.append("avif")
+    return formats
+
+
+def file_hash(path):
+    return hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
+
+
+def load_manifest():
+    try:
+        return json.loads(MANIFEST.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _placeholder(img):
+    height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+    tiny = img.resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS).filter(ImageFilter.GaussianBlur(1))
+    buf = io.BytesIO()
+    tiny.save(buf, "WEBP", quality=40)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def build_one(name, digest, formats):
+    """Write every variant of static/<name>; returns its manifest entry."""
+    src = STATIC_DIR / name
+    stem = src.stem
+    short = digest[:12]
+    with Image.open(src) as img:
+        img = img.convert("RGB")
+        # Never upscale; always include the original width as the largest variant
+        widths = [w for w in WIDTHS if w < img.width] + [img.width]
+        variants = {}
+        for fmt in formats:
+            variants[fmt] = []
+            for width in widths:
+                height = round(img.height * width / img.width)
+                out_name = f"{stem}.{short}.w{width}.{fmt}"
+                resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+                resized.save(BUILD_DIR / out_name, fmt.upper(), quality=QUALITY[fmt])
+                variants[fmt].append([width, out_name])
+        return {
+            "hash": digest,
+            "width": img.width,
+            "height": img.height,
+            "placeholder": _placeholder(img),
+            "variants": variants,
+        }
+
+
+def _is_fresh(entry, digest, formats):
+    if not entry or entry.get("hash") != digest:
+        return False
+    if sorted(entry.get("variants", {})) != sorted(formats):
+        return False
+    return all((BUILD_DIR / out).exists() for files in entry["variants"].values() for _, out in files)
+
+
+def build(force=False, verbose=True):
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    formats = available_formats()
+    manifest = load_manifest()
+    changed = False
+
+    for name in SOURCES:
+        src = STATIC_DIR / name
+        if not src.exists():
+            continue
+        digest = file_hash(src)
+        old = manifest.get(name)
+        if not force and _is_fresh(old, digest, formats):
+            if verbose:
+                print(f"  skip   {name} (unchanged)")
+            continue
+
+        manifest[name] = build_one(name, digest, formats)
+        changed = True
+        if verbose:
+            sizes = sum((BUILD_DIR / out).stat().st_size for files in manifest[name]["variants"].values() for _, out in files)
+            print(f"  built  {name} -> {sum(len(v) for v in manifest[name]['variants'].values())} files, {sizes // 1024} KB")
+
+        # Drop variants left over from the previous version of this image
+        if old:
+            keep = {out for files in manifest[name]["variants"].values() for _, out in files}
+            for files in old.get("variants", {}).values():
+                for _, out in files:
+                    if out not in keep:
+                        (BUILD_DIR / out).unlink(missing_ok=True)
+
+    if changed:
+        tmp = MANIFEST.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        tmp.replace(MANIFEST)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build responsive image variants for static/.")
+    parser.add_argument("--force", action="store_true", help="rebuild even if nothing changed")
+    args = parser.parse_args()
+    build(force=args.force)
@@ -0,0 +1,134 @@
+# ---- CIRCUIT BREAKER ----
+# Watches recent OpenAI calls. When too many fail or crawl, the circuit
+# "opens" and pages skip the API entirely (Tips serves the curated CSV
+# phrase, Story switches to its offline mode) instead of every session
+# waiting out timeouts. After a cool-down a few probe calls are let through
+# ("half-open"); if they succeed the circuit closes again.
+
+import threading
+import time
+from collections import deque
+
+from water_habits.client_proxy import ClientProxy
+from water_habits.retry import is_retryable
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(Exception):
+    """The backend is marked as degraded; don't call it right now."""
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_rate=0.5, slow_call=8.0, window=60.0, min_calls=5,
+                 open_for=30.0, probes=1):
+        self.name = name
+        self.failure_rate = failure_rate  # share of bad calls in the window that opens the circuit
+        self.slow_call = slow_call        # seconds; slower calls count as bad
+        self.window = window
+        self.min_calls = min_calls
+        self.open_for = open_for
+        self.probes = probes
+        self._lock = threading.Lock()
+        self._calls = deque()             # (finished_at, ok)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_out = 0
+        self.opened = 0                   # times the circuit has opened
+        self.rejected = 0                 # calls refused while open
+
+    # ---- STATE ----
+    def _refresh(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.open_for:
+            self._state = HALF_OPEN
+            self._probes_out = 0
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def is_open(self):
+        return self.state == OPEN
+
+    def _trip(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self.opened += 1
+
+    # ---- CALLS ----
+    def allow(self):
+        """True if a call may go out now (in half-open, only a few probes may)."""
+        with self._lock:
+            self._refresh(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_out < self.probes:
+                self._probes_out += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok, seconds):
+        now = time.monotonic()
+        ok = ok and seconds <= self.slow_call
+        with self._lock:
+            self._refresh(now)
+            if self._state == HALF_OPEN:
+                self._probes_out = max(0, self._probes_out - 1)
+                if ok:
+                    self._state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._trip(now)
+                return
+            if self._state == OPEN:
+                return  # a straggler from before we opened
+            self._calls.append((now, ok))
+            bad = sum(1 for _, good in self._calls if not good)
+            if len(self._calls) >= self.min_calls and bad / len(self._calls) >= self.failure_rate:
+                self._trip(now)
+
+    def call(self, fn, *args, **kwargs):
+        if not self.allow():
+            raise CircuitOpen(f"{self.name} circuit is open")
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            # Only backend trouble counts against the circuit, not our own bad requests
+            self.record(not is_retryable(e), time.monotonic() - started)
+            raise
+        self.record(True, time.monotonic() - started)
+        return result
+
+    def stats(self):
+        with self._lock:
+            self._refresh(time.monotonic())
+            bad = sum(1 for _, good in self._calls if not good)
+            return {
+                "state": self._state,
+                "recent_calls": len(self._calls),
+                "recent_failures": bad,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+# ---- CLIENT VIEW ----
+
+class BreakerClient(ClientProxy):
+    """The raw client with chat and image calls each behind their own breaker."""
+
+    def __init__(self, client, chat_breaker, image_breaker):
+        super().__init__(client)
+        self.chat_breaker = chat_breaker
+        self.image_breaker = image_breaker
+
+    def _call(self, endpoint, fn, **request):
+        breaker = self.chat_breaker if endpoint == "chat" else self.image_breaker
+        return breaker.call(fn, **request)
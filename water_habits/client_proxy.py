@@ -0,0 +1,54 @@
+# ---- CLIENT PROXY ----
+# Every layer between the pages and the OpenAI client (scheduler, retries,
+# circuit breakers, telemetry, record/replay) offers the two calls the app
+# makes, client.chat.completions.create(...) and client.images.generate(...).
+# ClientProxy builds that shape once; a layer only overrides _call().
+#
+#   class Layer(ClientProxy):
+#       def _call(self, endpoint, fn, **request):   # endpoint: "chat" or "images"
+#           ...                                     # fn(**request) makes the call on the inner client
+#           return fn(**request)
+
+ENDPOINTS = ("chat", "images")
+
+
+def send(client, endpoint, request):
+    """Make one `endpoint` call on `client` itself."""
+    if endpoint == "chat":
+        return client.chat.completions.create(**request)
+    return client.images.generate(**request)
+
+
+class _Completions:
+    def __init__(self, proxy):
+        self._proxy = proxy
+
+    def create(self, **request):
+        p = self._proxy
+        return p._call("chat", lambda **r: send(p.client, "chat", r), **request)
+
+
+class _Images:
+    def __init__(self, proxy):
+        self._proxy = proxy
+
+    def generate(self, **request):
+        p = self._proxy
+        return p._call("images", lambda **r: send(p.client, "images", r), **request)
+
+
+class _Chat:
+    def __init__(self, proxy):
+        self.completions = _Completions(proxy)
+
+
+class ClientProxy:
+    """A client-shaped view of `client`; both endpoints go through _call()."""
+
+    def __init__(self, client):
+        self.client = client
+        self.chat = _Chat(self)
+        self.images = _Images(self)
+
+    def _call(self, endpoint, fn, **request):
+        return fn(**request)
@@ -0,0 +1,246 @@
+# ---- FAKE OPENAI SERVER ----
+# A local, OpenAI-compatible stand-in for load tests: chat completions
+# (plain, JSON-schema stories, streamed as server-sent events) and image
+# generations, with configurable latency, errors and streaming behaviour.
+#
+#   python -m water_habits.fake_openai --port 8900 --latency 0.8 --error-rate 0.02
+#   OPENAI_BASE_URL=http://127.0.0.1:8900/v1 streamlit run WaterHabitsApp.py
+#
+# The openai package reads OPENAI_BASE_URL itself, so the app needs no
+# change; any API key is accepted. GET /stats returns the request counters.
+
+import base64
+import io
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "splash drip tap bucket river cloud garden puddle shower sprinkler rain barrel "
+    "leak faucet ocean droplet watering can hero sidekick turtle frog"
+).split()
+
+
+class Behaviour:
+    def __init__(self, latency=0.8, image_latency=4.0, jitter=0.3, chunk_delay=0.02, chunk_words=3,
+                 buffered=False, error_rate=0.0, error_status=500, stall_rate=0.0, stall=30.0):
+        self.latency = latency              # seconds to the first byte of a chat answer
+        self.image_latency = image_latency  # seconds for an image
+        self.jitter = jitter                # +/- fraction applied to both latencies
+        self.chunk_delay = chunk_delay      # seconds between streamed chunks
+        self.chunk_words = chunk_words      # words per streamed chunk
+        self.buffered = buffered            # send a stream's chunks all at once at the end
+        self.error_rate = error_rate        # fraction of calls answered with error_status
+        self.error_status = error_status
+        self.stall_rate = stall_rate        # fraction of streams that stop halfway for `stall` seconds
+        self.stall = stall
+
+
+def _wait(seconds, jitter):
+    time.sleep(max(0.0, seconds * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def _sentence(n=10):
+    words = random.choices(WORDS, k=n)
+    return " ".join(words).capitalize() + "."
+
+
+def _answer(request):
+    """Text for a chat request, shaped like what the app asked for."""
+    prompt = request["messages"][-1]["content"]
+    if (request.get("response_format") or {}).get("type") == "json_schema":
+        return json.dumps({
+            "story": " ".join(_sentence() for _ in range(8)),
+            "panels": [_sentence(12) for _ in range(4)],
+            "tip": _sentence(6),
+        })
+    if "comic script" in prompt:
+        return "\n".join(f"{i}. {_sentence(12)}" for i in range(1, 5))
+    if "Rewrite this" in prompt:
+        return f"Splash! {_sentence(12)}"
+    return " ".join(_sentence() for _ in range(12))
+
+
+def _usage(request, text):
+    prompt = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+    completion = len(text.split())
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _png(size):
+    from PIL import Image
+
+    width, height = (int(n) for n in size.split("x"))
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), tuple(random.randrange(256) for _ in range(3))).save(buf, "PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, name):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    behaviour = Behaviour()
+    stats = Stats()
+
+    def log_message(self, *args):
+        pass  # one line per request would drown the load test's output
+
+    # ---- RESPONSES ----
+    def _json(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self):
+        status = self.behaviour.error_status
+        self.stats.add(f"error_{status}")
+        headers = [("Retry-After", "1")] if status == 429 else []
+        self._json(status, {"error": {"message": "injected failure", "type": "server_error", "code": None}}, headers)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, request, text):
+        b = self.behaviour
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": request["model"]}
+        words = text.split(" ")
+        pieces = [" ".join(words[i:i + b.chunk_words]) + " " for i in range(0, len(words), b.chunk_words)]
+        pieces[-1] = pieces[-1].rstrip(" ")
+        events = [
+            {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+            for piece in pieces
+        ]
+        events.append({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if (request.get("stream_options") or {}).get("include_usage"):
+            events.append({**base, "choices": [], "usage": _usage(request, text)})
+
+        stall_at = len(events) // 2 if random.random() < b.stall_rate else None
+        out = []
+        for i, event in enumerate(events):
+            if i == stall_at:
+                self.stats.add("stall")
+                time.sleep(b.stall)
+            out.append(f"data: {json.dumps(event)}\n\n".encode())
+            if not b.buffered:
+                self._chunk(b"".join(out))
+                out = []
+                time.sleep(b.chunk_delay)
+        out.append(b"data: [DONE]\n\n")
+        self._chunk(b"".join(out))
+        self._chunk(b"")
+
+    # ---- ROUTES ----
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._json(200, self.stats.snapshot())
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0].rstrip("/")
+        b = self.behaviour
+
+        if path.endswith("/chat/completions"):
+            self.stats.add("chat_stream" if request.get("stream") else "chat")
+            _wait(b.latency, b.jitter)
+            if random.random() < b.error_rate:
+                return self._error()
+            text = _answer(request)
+            if request.get("stream"):
+                return self._stream(request, text)
+            self._json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion",
+                "created": int(time.time()), "model": request["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": _usage(request, text),
+            })
+        elif path.endswith("/images/generations"):
+            self.stats.add("images")
+            _wait(b.image_latency, b.jitter)
+            if random.random() < b.error_rate:
+                return self._error()
+            data = [{"b64_json": _png(request.get("size", "512x512"))} for _ in range(request.get("n", 1))]
+            self._json(200, {"created": int(time.time()), "data": data})
+        else:
+            self._json(404, {"error": {"message": f"no route {path}"}})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream (timeouts, the end of a load test) are expected
+        if not issubclass(sys.exc_info()[0], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(host="127.0.0.1", port=8900, behaviour=None):
+    """A started server (in a daemon thread); call .shutdown() to stop it."""
+    handler = type("ConfiguredHandler", (Handler,), {"behaviour": behaviour or Behaviour(), "stats": Stats()})
+    server = _Server((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    defaults = Behaviour()
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="seconds to a chat answer's first byte")
+    parser.add_argument("--image-latency", type=float, default=defaults.image_latency)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="+/- fraction of the latencies")
+    parser.add_argument("--chunk-delay", type=float, default=defaults.chunk_delay, help="seconds between stream chunks")
+    parser.add_argument("--chunk-words", type=int, default=defaults.chunk_words)
+    parser.add_argument("--buffered", action="store_true", help="deliver each stream in one piece at the end")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status, help="e.g. 429, 500, 503")
+    parser.add_argument("--stall-rate", type=float, default=defaults.stall_rate, help="fraction of streams that stall")
+    parser.add_argument("--stall", type=float, default=defaults.stall, help="seconds a stalled stream hangs")
+    args = parser.parse_args()
+
+    behaviour = Behaviour(
+        latency=args.latency, image_latency=args.image_latency, jitter=args.jitter,
+        chunk_delay=args.chunk_delay, chunk_words=args.chunk_words, buffered=args.buffered,
+        error_rate=args.error_rate, error_status=args.error_status,
+        stall_rate=args.stall_rate, stall=args.stall,
+    )
+    server = serve(args.host, args.port, behaviour)
+    print(f"fake OpenAI on http://{args.host}:{args.port}/v1  (OPENAI_BASE_URL)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
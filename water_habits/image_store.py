@@ -0,0 +1,124 @@
+# ---- COMIC IMAGE STORE ----
+# Generated panel images are kept on disk instead of hot-linking OpenAI's
+# short-lived URLs. Files are content-addressed (sha256 of the PNG), and an
+# SQLite index maps a normalized "panel description + theme" to a file, so
+# near-identical panels ("Andy turns off the tap in the bathroom" /
+# "andy turns off the tap, in the bathroom!") reuse the same art.
+
+import base64
+import hashlib
+import os
+import re
+import threading
+import time
+
+from water_habits.sqlite_util import ThreadLocalConnection
+from water_habits.telemetry import TELEMETRY
+
+STORE_DIR = ".cache/images"
+DEFAULT_MAX_BYTES = 500 * 1024**2
+
+# Words that don't change what a panel looks like
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "at", "with", "for", "is", "are",
+    "was", "were", "be", "his", "her", "their", "its", "then", "as", "by", "from", "into",
+}
+
+
+def normalize_panel(description, theme):
+    """Order-insensitive bag of meaningful words + theme, e.g. 'blue drop|andy bathroom off tap turns'."""
+    words = re.findall(r"[a-z0-9']+", description.lower())
+    kept = sorted({w.strip("'") for w in words if w not in _STOPWORDS and len(w) > 1})
+    return f"{theme.strip().lower()}|{' '.join(kept)}"
+
+
+class ImageStore:
+    def __init__(self, root=STORE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._conn = ThreadLocalConnection(os.path.join(root, "index.sqlite3"), "foreign_keys=ON")
+        os.makedirs(root, exist_ok=True)
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                sha TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS panels (
+                panel_key TEXT PRIMARY KEY,
+                sha TEXT NOT NULL REFERENCES files (sha) ON DELETE CASCADE
+            );
+            CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+        """)
+
+    def path_for(self, sha):
+        return os.path.join(self.root, f"{sha}.png")
+
+    def lookup(self, description, theme):
+        """Local file for this panel (or a near-identical one), or None."""
+        db = self._conn()
+        row = db.execute("SELECT sha FROM panels WHERE panel_key = ?", (normalize_panel(description, theme),)).fetchone()
+        if row is None:
+            return None
+        path = self.path_for(row[0])
+        if not os.path.exists(path):
+            db.execute("DELETE FROM files WHERE sha = ?", (row[0],))
+            return None
+        db.execute("UPDATE files SET last_used = ? WHERE sha = ?", (time.time(), row[0]))
+        return path
+
+    def save(self, description, theme, data):
+        """Store PNG bytes for this panel; returns the local path."""
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.path_for(sha)
+        if not os.path.exists(path):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        db = self._conn()
+        db.execute(
+            "INSERT INTO files (sha, size, last_used) VALUES (?, ?, ?) "
+            "ON CONFLICT (sha) DO UPDATE SET last_used = excluded.last_used",
+            (sha, len(data), time.time()),
+        )
+        db.execute(
+            "INSERT OR REPLACE INTO panels (panel_key, sha) VALUES (?, ?)",
+            (normalize_panel(description, theme), sha),
+        )
+        self._evict(db)
+        return path
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for sha, size in db.execute("SELECT sha, size FROM files ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM files WHERE sha = ?", (sha,))
+            try:
+                os.remove(self.path_for(sha))
+            except OSError:
+                pass
+            total -= size
+
+    def stats(self):
+        count, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+        return {"images": count, "bytes": size}
+
+
+def stored_panel_image(store, client, description, theme, timeout=None):
+    """Local path of the art for this panel, generating (and storing) it only if we have none."""
+    path = store.lookup(description, theme)
+    if path is not None:
+        return path
+    response = client.images.generate(
+        prompt=f"Comic panel about: {description}, visual theme {theme}",
+        n=1,
+        size="512x512",
+        response_format="b64_json",
+        timeout=timeout
+    )
+    with TELEMETRY.span("panel_image_decode"):
+        return store.save(description, theme, base64.b64decode(response.data[0].b64_json))
@@ -0,0 +1,129 @@
+# ---- IMPORT BUDGET ----
+# Cold-start import cost of each page, from `python -X importtime`.
+#
+#   python -m water_habits.import_budget            # report; exits 1 if a page is over budget
+#   python -m water_habits.import_budget --runs 9   # more samples per page (default 5)
+#   python -m water_habits.import_budget --raw DIR  # also keep each page's raw importtime log
+#
+# Each page is rendered with AppTest in a fresh interpreter, --runs times.
+# Streamlit itself (and AppTest) is imported and warmed up first, since a
+# running server has already paid for it; everything imported after that is
+# what a new visitor's first render of that page costs the process.
+#
+# A single timing is at the mercy of disk cache and CPU contention, so the
+# time budget is checked against the median run, and the budgets are set
+# well above what the pages measure. The forbidden-package check is exact:
+# a package loaded in any run is a failure.
+
+import os
+import subprocess
+import sys
+
+from water_habits.navigation import PAGES
+
+# ms of imports (median run) a page may add on a cold process, and packages it must not load
+BUDGETS = {
+    "consent": (50, ("openai", "pandas", "httpx")),
+    "home": (50, ("openai", "pandas", "httpx")),
+    "about": (50, ("openai", "pandas", "httpx")),
+    "goals": (50, ("openai", "pandas", "httpx")),
+    "tips": (200, ("openai", "pandas")),
+    "story": (200, ("openai", "pandas")),
+}
+DEFAULT_RUNS = 5
+
+MARKER = "---- page imports start ----"
+
+_PROBE = """
+import sys
+from streamlit.testing.v1 import AppTest
+
+warm = AppTest.from_string("import streamlit as st\\nst.write('warm')")
+warm.run()
+sys.stderr.write({marker!r} + "\\n")
+
+at = AppTest.from_file({script!r}, default_timeout=60)
+at.secrets["OPENAI_API_KEY"] = "sk-import-budget"
+if {page!r} != "consent":
+    at.session_state.agreed_to_terms = True
+    at.switch_page({page_file!r})
+at.run()
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+"""
+
+
+def measure(page, script="WaterHabitsApp.py"):
+    """(total_ms, {top-level package: cumulative ms}, loaded packages, raw log) for one cold render of `page`."""
+    script = os.path.abspath(script)
+    page_file = os.path.join(os.path.dirname(script), "app_pages", f"{page}.py")
+    code = _PROBE.format(marker=MARKER, script=script, page=page, page_file=page_file)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(script), capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"{page}: {result.stderr.strip().splitlines()[-1]}")
+
+    log = result.stderr.split(MARKER, 1)[1]
+    total_us = 0
+    packages = {}
+    loaded = set()
+    for line in log.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        loaded.add(name.strip().split(".")[0])
+        # Top-level imports are the unindented names; their cumulative time includes their children
+        if not name.startswith("  "):
+            top = name.strip().split(".")[0]
+            packages[top] = packages.get(top, 0) + int(cumulative_us) / 1000
+    return total_us / 1000, packages, loaded, log
+
+
+def measure_runs(page, runs=DEFAULT_RUNS, script="WaterHabitsApp.py"):
+    """measure() `runs` times: the median run's (total_ms, packages, log), every total, and everything loaded in any run."""
+    samples = sorted((measure(page, script) for _ in range(runs)), key=lambda sample: sample[0])
+    total_ms, packages, _, log = samples[(len(samples) - 1) // 2]
+    totals = [sample[0] for sample in samples]
+    loaded = set().union(*(sample[2] for sample in samples))
+    return total_ms, totals, packages, loaded, log
+
+
+def check(page, total_ms, loaded):
+    """List of budget violations for a page (total_ms: the median run)."""
+    limit_ms, forbidden = BUDGETS[page]
+    problems = [f"loads {name}" for name in forbidden if name in loaded]
+    if total_ms > limit_ms:
+        problems.append(f"{total_ms:.0f} ms > {limit_ms} ms")
+    return problems
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-page cold-start import cost (python -X importtime).")
+    parser.add_argument("--script", default="WaterHabitsApp.py")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="cold renders per page; the median is checked")
+    parser.add_argument("--raw", help="directory to write each page's (median run's) raw importtime log to")
+    args = parser.parse_args()
+
+    over = False
+    print(f"{'page':10} {'median':>9}  {'min-max':>9}  {'budget':>7}  heaviest")
+    for page in ["consent", *PAGES]:
+        total_ms, totals, packages, loaded, log = measure_runs(page, max(1, args.runs), args.script)
+        heaviest = sorted(packages.items(), key=lambda item: -item[1])[:4]
+        problems = check(page, total_ms, loaded)
+        over = over or bool(problems)
+        spread = f"{min(totals):.0f}-{max(totals):.0f}"
+        print(
+            f"{page:10} {total_ms:>6.0f} ms  {spread:>9}  {BUDGETS[page][0]:>4} ms  "
+            + ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest)
+            + (f"  OVER: {'; '.join(problems)}" if problems else "")
+        )
+        if args.raw:
+            os.makedirs(args.raw, exist_ok=True)
+            with open(os.path.join(args.raw, f"{page}.importtime.txt"), "w") as f:
+                f.write(log)
+    sys.exit(1 if over else 0)
@@ -0,0 +1,170 @@
+# ---- LLM HELPERS ----
+# Small wrappers around the OpenAI calls the pages make.
+
+import json
+import time
+
+# Don't push a websocket delta for every token; repaint at most this often
+STREAM_REPAINT_INTERVAL = 0.08  # seconds
+
+
+def iter_stream_text(stream):
+    """Yield the text pieces of a streamed chat completion."""
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        piece = chunk.choices[0].delta.content
+        if piece:
+            yield piece
+
+
+def stream_into(placeholder, pieces, render, interval=STREAM_REPAINT_INTERVAL):
+    """Fill `placeholder` as text arrives; returns the whole text when the stream ends.
+
+    `render(text, done)` turns the text so far into the markdown/HTML to show.
+    """
+    parts = []
+    last_paint = 0.0
+    for piece in pieces:
+        parts.append(piece)
+        now = time.monotonic()
+        if now - last_paint >= interval:
+            placeholder.markdown(render("".join(parts), False), unsafe_allow_html=True)
+            last_paint = now
+    text = "".join(parts).strip()
+    placeholder.markdown(render(text, True), unsafe_allow_html=True)
+    return text
+
+
+# ---- COMIC PANEL IMAGES ----
+
+# Upper bound on image calls in flight at once, across all sessions in the process
+IMAGE_WORKERS = 8
+
+
+# ---- STRUCTURED STORY + COMIC ----
+# One JSON-schema response carries the story, the comic panels and the tip,
+# instead of a second gpt-4 call that re-reads the whole story.
+
+STRUCTURED_STORY_MODEL = "gpt-4o-mini"  # json_schema output needs a 4o-family model
+
+STORY_SCHEMA = {
+    "name": "eco_story",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            # "story" comes first so it can be streamed into the card
+            "story": {"type": "string"},
+            "panels": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+            "tip": {"type": "string"},
+        },
+        "required": ["story", "panels", "tip"],
+        "additionalProperties": False,
+    },
+}
+
+MIN_PANELS, MAX_PANELS = 4, 6
+
+
+def structured_story_messages(hero, setting, habit):
+    return [
+        {"role": "system", "content": "You are a creative children's storyteller focused on sustainability."},
+        {"role": "user", "content": (
+            f"Write a fun children's story about {hero}, a young eco-hero in the {setting}, "
+            f"learning to save water by practicing {habit}. Include a friendly sidekick. "
+            f"Also turn the story into a {MIN_PANELS}-{MAX_PANELS} panel comic script (1-2 sentences per panel, "
+            f"no numbering) and give one short water-saving tip."
+        )},
+    ]
+
+
+def parse_story_bundle(text):
+    """Validate a structured story response; returns {"story", "panels", "tip"} or raises ValueError."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"story response is not JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("story response is not an object")
+
+    story = data.get("story")
+    tip = data.get("tip")
+    panels = data.get("panels")
+    if not isinstance(story, str) or not story.strip():
+        raise ValueError("story is missing")
+    if not isinstance(tip, str):
+        raise ValueError("tip is missing")
+    if not isinstance(panels, list) or not all(isinstance(p, str) for p in panels):
+        raise ValueError("panels must be a list of strings")
+    panels = [p.strip() for p in panels if p.strip()][:MAX_PANELS]
+    if len(panels) < MIN_PANELS:
+        raise ValueError(f"{len(panels)} comic panels, expected at least {MIN_PANELS}")
+    return {"story": story.strip(), "panels": panels, "tip": tip.strip()}
+
+
+def partial_json_string(buffer, key):
+    """Best-effort decode of a string field from a JSON document that is still streaming."""
+    marker = f'"{key}"'
+    start = buffer.find(marker)
+    if start == -1:
+        return ""
+    start = buffer.find('"', start + len(marker))
+    if start == -1:
+        return ""
+    raw = []
+    i = start + 1
+    while i < len(buffer):
+        ch = buffer[i]
+        if ch == "\\":
+            if i + 1 >= len(buffer):
+                break  # escape split across chunks; wait for the rest
+            if buffer[i + 1] == "u" and i + 6 > len(buffer):
+                break
+            step = 6 if buffer[i + 1] == "u" else 2
+            raw.append(buffer[i:i + step])
+            i += step
+            continue
+        if ch == '"':
+            break
+        raw.append(ch)
+        i += 1
+    try:
+        return json.loads('"' + "".join(raw) + '"')
+    except json.JSONDecodeError:
+        return "".join(raw)
+
+
+# ---- OFFLINE STORY ----
+# Used when the API is marked as degraded, so the Story page still gives
+# kids something right away.
+
+OFFLINE_TIPS = {
+    "brushing teeth": "Turn off the tap while you brush — that can save up to 8 gallons a day!",
+    "watering plants": "Water plants in the morning so the sun doesn't drink it first!",
+    "taking showers": "Short showers save buckets — try finishing before your favorite song ends!",
+    "fixing leaks": "Tell a grown-up about drips — one leaky tap can waste gallons every day!",
+}
+
+
+def offline_story(hero, setting, habit):
+    """A simple template story + comic in the same shape as parse_story_bundle()."""
+    hero = hero or "Our hero"
+    tip = OFFLINE_TIPS.get(habit.lower(), "Every drop counts — turn off the water when you're not using it!")
+    story = (
+        f"{hero} was in the {setting} when a tiny water drop named Drip waved hello. "
+        f"\"Psst! Did you know {habit} can waste lots of water?\" whispered Drip. "
+        f"{hero} thought hard, then smiled: \"I can be a water hero!\" "
+        f"Together they found a clever way to use just the water they needed while {habit}. "
+        f"Drip sparkled with joy, and {hero} promised to do it every single day."
+    )
+    panels = [
+        f"{hero} meets Drip, a friendly water drop, in the {setting}.",
+        f"Drip shows {hero} how much water goes to waste while {habit}.",
+        f"{hero} comes up with a smart water-saving plan.",
+        f"{hero} and Drip celebrate — every drop counts!",
+    ]
+    return {"story": story, "panels": panels, "tip": tip}
@@ -0,0 +1,182 @@
+# ---- LLM RESPONSE CACHE ----
+# Content-addressed cache for chat completions, stored in SQLite so every
+# Streamlit process on the box shares it.
+#
+# Keys hash the model, messages and sampling params. Each key keeps up to
+# `max_variants` different answers: until it has that many we still call the
+# API (a miss) and add the new answer, after that we serve a random stored
+# one (a hit). That keeps tips varied while capping spend.
+
+import hashlib
+import json
+import os
+import random
+import time
+
+from water_habits.llm import iter_stream_text
+from water_habits.sqlite_util import ThreadLocalConnection
+
+CACHE_PATH = ".cache/llm_cache.sqlite3"
+DEFAULT_TTL = 7 * 24 * 3600        # seconds before an answer is stale
+DEFAULT_MAX_ENTRIES = 20_000       # LRU bound on stored answers
+DEFAULT_MAX_BYTES = 50 * 1024**2   # LRU bound on stored text
+DEFAULT_MAX_VARIANTS = 5
+
+# Request fields that don't change the answer
+_IGNORED_PARAMS = {"stream", "timeout"}
+
+
+def cache_key(model, messages, **params):
+    payload = {
+        "model": model,
+        "messages": messages,
+        "params": {k: v for k, v in params.items() if k not in _IGNORED_PARAMS},
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, max_variants=DEFAULT_MAX_VARIANTS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_variants = max_variants
+        self._conn = ThreadLocalConnection(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_key ON entries (key);
+                CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+                CREATE TABLE IF NOT EXISTS stats (
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value INTEGER NOT NULL,
+                    PRIMARY KEY (kind, name)
+                );
+            """)
+
+    def _count(self, db, kind, name):
+        db.execute(
+            "INSERT INTO stats (kind, name, value) VALUES (?, ?, 1) "
+            "ON CONFLICT (kind, name) DO UPDATE SET value = value + 1",
+            (kind, name),
+        )
+
+    # ---- LOOKUP / STORE ----
+    def get(self, key, kind="chat"):
+        """A cached answer for `key`, or None if we should call the API (and `put` the result)."""
+        db = self._conn()
+        now = time.time()
+        rows = db.execute(
+            "SELECT id, value FROM entries WHERE key = ? AND created > ?",
+            (key, now - self.ttl),
+        ).fetchall()
+        if len(rows) < self.max_variants:
+            self._count(db, kind, "miss")
+            return None
+        entry_id, value = random.choice(rows)
+        db.execute("UPDATE entries SET last_used = ? WHERE id = ?", (now, entry_id))
+        self._count(db, kind, "hit")
+        return value
+
+    def put(self, key, value, kind="chat"):
+        if not value:
+            return
+        db = self._conn()
+        now = time.time()
+        db.execute(
+            "INSERT INTO entries (key, kind, value, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, kind, value, len(value.encode()), now, now),
+        )
+        self._evict(db, now)
+
+    def _evict(self, db, now):
+        db.execute("DELETE FROM entries WHERE created <= ?", (now - self.ttl,))
+        count, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        # Drop least recently used answers until we are back under both limits
+        excess_rows = max(0, count - self.max_entries)
+        excess_bytes = max(0, size - self.max_bytes)
+        doomed = []
+        freed = 0
+        for entry_id, entry_size in db.execute("SELECT id, size FROM entries ORDER BY last_used"):
+            if len(doomed) >= excess_rows and freed >= excess_bytes:
+                break
+            doomed.append((entry_id,))
+            freed += entry_size
+        db.executemany("DELETE FROM entries WHERE id = ?", doomed)
+        for _ in doomed:
+            self._count(db, "all", "evicted")
+
+    # ---- REPORTING ----
+    def stats(self):
+        """{kind: {"hit": n, "miss": n, ...}} across every process sharing the cache file."""
+        report = {}
+        for kind, name, value in self._conn().execute("SELECT kind, name, value FROM stats"):
+            report.setdefault(kind, {})[name] = value
+        return report
+
+
+# ---- CACHED CALLS ----
+
+def cached_completion(cache, client, kind, flight=None, **request):
+    """chat.completions.create(...) returning just the message text, through the cache.
+
+    With a SingleFlight, identical concurrent requests share one lookup/call.
+    """
+    key = cache_key(**request)
+
+    def complete():
+        text = cache.get(key, kind)
+        if text is None:
+            response = client.chat.completions.create(**request)
+            text = response.choices[0].message.content.strip()
+            cache.put(key, text, kind)
+        return text
+
+    if flight is not None:
+        return flight.do((kind, key), complete)
+    return complete()
+
+
+def cached_stream(cache, client, kind, flight=None, **request):
+    """Streamed chat completion as text pieces; a cache hit comes back as one piece.
+
+    The answer is stored only if the stream finishes.
+    """
+    key = cache_key(**request)
+
+    def pieces():
+        text = cache.get(key, kind)
+        if text is not None:
+            yield text
+            return
+        parts = []
+        for piece in iter_stream_text(client.chat.completions.create(stream=True, **request)):
+            parts.append(piece)
+            yield piece
+        cache.put(key, "".join(parts).strip(), kind)
+
+    if flight is not None:
+        return flight.do_stream((kind, key), pieces)
+    return pieces()
+
+if __name__ == "__main__":
+    # python -m water_habits.llm_cache  -> hit/miss counts for the shared cache
+    for kind, counts in sorted(LLMCache().stats().items()):
+        hits, misses = counts.get("hit", 0), counts.get("miss", 0)
+        rate = hits / (hits + misses) if hits + misses else 0.0
+        print(f"{kind:8} hits={hits} misses={misses} hit_rate={rate:.0%} {counts}")
@@ -0,0 +1,456 @@
+# ---- LOAD TEST ----
+# Simulated visitors driving a running app over Streamlit's own websocket
+# protocol, the way a browser tab does: every click or form submit is a
+# BackMsg.rerun_script carrying the widget states, and a step is done when
+# the server's script_finished arrives.
+#
+#   python -m water_habits.loadtest --launch --sessions 20          # fake API + app on free ports, then test
+#   python -m water_habits.loadtest --launch --sessions 50 --ramp 20 --error-rate 0.05 --latency 2
+#   python -m water_habits.loadtest --url http://localhost:8501 --pid 4242 --sessions 30
+#
+# Each session runs FLOW (terms -> tips x3 -> story) --flows times, each time
+# as a new visitor (a new websocket). With --pid (or --launch) the server
+# process's CPU and RSS are sampled from /proc while the test runs.
+
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from water_habits.bench import nearest_rank, scratch_app
+from water_habits.fake_openai import Behaviour, serve
+
+STEP_TIMEOUT = 180.0     # seconds a single rerun may take before the session gives up
+THINK_TIME = 1.0         # mean seconds a visitor pauses between actions
+SAMPLE_INTERVAL = 0.5    # seconds between server CPU/RSS samples
+
+_DONE = (
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR,
+)
+
+# Widget type -> the WidgetState field its value travels in
+_VALUE_FIELDS = {
+    "text_input": "string_value",
+    "selectbox": "string_value",
+    "slider": "double_array_value",
+    "checkbox": "bool_value",
+}
+
+HEROES = ["Andy", "Maya", "Leo", "Zoe", "Sam", "Priya", "Kai", "Nora"]
+
+
+class StepFailed(Exception):
+    pass
+
+
+# ---- ONE VISITOR ----
+
+class Session:
+    """One browser tab: a websocket, the widgets the last run drew, and the values the user set."""
+
+    def __init__(self, url, step_timeout=STEP_TIMEOUT):
+        self.url = url.rstrip("/").replace("http", "ws", 1) + "/_stcore/stream"
+        self.step_timeout = step_timeout
+        self.page_hash = ""
+        self.widgets = {}   # label -> (widget type, proto, fragment id)
+        self.values = {}    # widget id -> (widget type, value)
+        self.exceptions = []
+        self.received = 0   # bytes of ForwardMsgs
+        self._finished = asyncio.Event()
+        self._ws = None
+        self._reader = None
+
+    async def __aenter__(self):
+        from websockets.asyncio.client import connect
+
+        self._ws = await connect(self.url, subprotocols=["streamlit"], max_size=None)
+        self._reader = asyncio.create_task(self._read())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._reader.cancel()
+        await self._ws.close()
+
+    async def _read(self):
+        async for raw in self._ws:
+            self.received += len(raw)
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = msg.new_session.page_script_hash
+                if not msg.new_session.fragment_ids_this_run:
+                    self.widgets = {}  # a full run redraws the page; a fragment run only its part
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._element(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "script_finished" and msg.script_finished in _DONE:
+                self._finished.set()
+
+    def _element(self, element, fragment_id):
+        element_type = element.WhichOneof("type")
+        if element_type == "exception":
+            self.exceptions.append(element.exception.message)
+            return
+        proto = getattr(element, element_type)
+        fields = proto.DESCRIPTOR.fields_by_name
+        if "id" in fields and "label" in fields:
+            self.widgets[proto.label] = (element_type, proto, fragment_id)
+
+    def options(self, label):
+        return list(self.widgets[label][1].options)
+
+    async def step(self, values=None, click=None):
+        """Set widgets ({label: value}), press the `click` button and wait for the run; returns seconds."""
+        for label, value in (values or {}).items():
+            if label not in self.widgets:
+                raise StepFailed(f"no widget {label!r} on the page")
+            element_type, proto, _ = self.widgets[label]
+            self.values[proto.id] = (element_type, value)
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_hash
+        on_page = {proto.id for _, proto, _ in self.widgets.values()}
+        for widget_id, (element_type, value) in self.values.items():
+            if widget_id in on_page:
+                widget = state.widget_states.widgets.add()
+                widget.id = widget_id
+                field = _VALUE_FIELDS[element_type]
+                if field == "double_array_value":
+                    widget.double_array_value.data.extend(value)
+                else:
+                    setattr(widget, field, value)
+        if click is not None:
+            if click not in self.widgets:
+                raise StepFailed(f"no button {click!r} on the page")
+            _, proto, fragment_id = self.widgets[click]
+            widget = state.widget_states.widgets.add()
+            widget.id = proto.id
+            widget.trigger_value = True
+            state.fragment_id = fragment_id  # a form inside a fragment reruns only the fragment
+
+        seen = len(self.exceptions)
+        self._finished.clear()
+        started = time.perf_counter()
+        await self._ws.send(msg.SerializeToString())
+        try:
+            await asyncio.wait_for(self._finished.wait(), self.step_timeout)
+        except asyncio.TimeoutError:
+            raise StepFailed(f"no script_finished within {self.step_timeout:.0f}s") from None
+        if len(self.exceptions) > seen:
+            raise StepFailed(self.exceptions[-1])
+        return time.perf_counter() - started
+
+
+# ---- THE SCRIPTED VISIT ----
+
+async def flow(session, rng, record, think=THINK_TIME):
+    """Accept the terms, get three tips, then make a story; `record(step, seconds)` after each action."""
+    async def act(step, values=None, click=None):
+        record(step, await session.step(values, click))
+        await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+
+    name = rng.choice(HEROES)
+    await act("load")
+    await act("agree", {"✅ I have read and agree to the Privacy Policy and Terms of Service.": True})
+    await act("continue", click="👉 Continue")
+    await act("open_tips", click="Start Tips")
+    for _ in range(3):
+        await act("tip", {
+            "👶 Child's Name": name,
+            "🎂 Child's Age": [float(rng.randint(3, 12))],
+            "🛁 Which routine?": rng.choice(session.options("🛁 Which routine?")),
+        }, click="✨ Generate Tip")
+    await act("home", click="🏠 Home")
+    await act("open_story", click="Start Story")
+    await act("story", {
+        "🧒 Hero’s Name": f"{name} {rng.randint(1, 999)}",  # different heroes, so the answer cache can't absorb the load
+        "🌍 Choose a Story Setting": rng.choice(session.options("🌍 Choose a Story Setting")),
+        "💧 Water Habit Focus": rng.choice(session.options("💧 Water Habit Focus")),
+    }, click="✨ Generate My Eco Adventure")
+
+
+class Results:
+    def __init__(self):
+        self.latencies = {}  # step -> [seconds]
+        self.failures = {}   # step -> [message]
+        self.flows = 0
+        self.received = 0
+
+    def record(self, step, seconds):
+        self.latencies.setdefault(step, []).append(seconds)
+
+    def fail(self, step, message):
+        self.failures.setdefault(step, []).append(message)
+
+
+async def _visitor(url, index, results, flows, ramp, sessions, think, step_timeout):
+    rng = random.Random(index)
+    await asyncio.sleep(ramp * index / max(1, sessions))
+    for _ in range(flows):
+        step = "connect"
+        try:
+            async with Session(url, step_timeout) as session:
+                def record(name, seconds):
+                    nonlocal step
+                    results.record(name, seconds)
+                    step = name
+                try:
+                    await flow(session, rng, record, think)
+                    results.flows += 1
+                finally:
+                    results.received += session.received
+        except (StepFailed, OSError) as e:
+            results.fail(f"after {step}", str(e)[:200])
+        except Exception as e:  # websocket closed, protocol surprises: count it and move on
+            results.fail(f"after {step}", f"{type(e).__name__}: {e}"[:200])
+
+
+# ---- SERVER SAMPLING ----
+
+class ProcessSampler:
+    """CPU% and RSS of one process, read from /proc every `interval` seconds in a thread."""
+
+    def __init__(self, pid, interval=SAMPLE_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.cpu = []  # percent of one core, per interval
+        self.rss = []  # MiB
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="proc-sampler", daemon=True)
+
+    def _cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")  # utime + stime
+
+    def _rss_mib(self):
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    def _loop(self):
+        last_cpu, last_time = self._cpu_seconds(), time.monotonic()
+        while not self._stop.wait(self.interval):
+            try:
+                cpu, now = self._cpu_seconds(), time.monotonic()
+                self.cpu.append(100 * (cpu - last_cpu) / (now - last_time))
+                self.rss.append(self._rss_mib())
+                last_cpu, last_time = cpu, now
+            except OSError:
+                return  # the process went away
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self):
+        if not self.cpu:
+            return None
+        return {
+            "cpu_mean_pct": round(statistics.fmean(self.cpu), 1),
+            "cpu_peak_pct": round(max(self.cpu), 1),
+            "rss_start_mib": round(self.rss[0], 1),
+            "rss_peak_mib": round(max(self.rss), 1),
+            "rss_end_mib": round(self.rss[-1], 1),
+        }
+
+
+# ---- LAUNCHING ----
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(url, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"the app exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"the app didn't come up at {url} within {timeout:.0f}s")
+
+
+@contextmanager
+def launched(script="WaterHabitsApp.py", behaviour=None, log=None):
+    """Fake OpenAI server + the app in a scratch copy, each on a free port; yields (url, pid, fake server)."""
+    root = os.path.dirname(os.path.abspath(script))
+    fake = serve(port=_free_port(), behaviour=behaviour)
+    sandbox = scratch_app(root, secrets={"OPENAI_API_KEY": "sk-loadtest"})
+    port = _free_port()
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake.server_address[1]}/v1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])),
+    }
+    out = open(log, "w") if log else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", os.path.basename(script),
+            "--server.headless=true", f"--server.port={port}", "--browser.gatherUsageStats=false",
+        ],
+        cwd=sandbox, env=env, stdout=out, stderr=subprocess.STDOUT,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(url, process)
+        yield url, process.pid, fake
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        fake.shutdown()
+        if log:
+            out.close()
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+
+# ---- RUNNING + REPORTING ----
+
+def run(url, sessions=10, flows=1, ramp=5.0, think=THINK_TIME, step_timeout=STEP_TIMEOUT, pid=None):
+    """Drive `sessions` concurrent visitors against `url`; returns the report dict."""
+    results = Results()
+
+    async def main():
+        await asyncio.gather(*(
+            _visitor(url, i, results, flows, ramp, sessions, think, step_timeout) for i in range(sessions)
+        ))
+
+    sampler = ProcessSampler(pid) if pid else None
+    started = time.perf_counter()
+    if sampler:
+        with sampler:
+            asyncio.run(main())
+    else:
+        asyncio.run(main())
+    elapsed = time.perf_counter() - started
+
+    reruns = sum(len(v) for v in results.latencies.values())
+    everything = [s for v in results.latencies.values() for s in v]
+    return {
+        "sessions": sessions,
+        "flows_per_session": flows,
+        "elapsed_s": round(elapsed, 2),
+        "flows_completed": results.flows,
+        "flows_per_min": round(60 * results.flows / elapsed, 2),
+        "reruns": reruns,
+        "reruns_per_s": round(reruns / elapsed, 2),
+        "received_mib": round(results.received / 2**20, 2),
+        "latency_ms": {
+            step: _percentiles(values) for step, values in [("all", everything), *results.latencies.items()] if values
+        },
+        "failures": {step: {"count": len(m), "example": m[0]} for step, m in results.failures.items()},
+        "server": sampler.summary() if sampler else None,
+    }
+
+
+def _percentiles(seconds):
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "p50": round(nearest_rank(ms, 0.50), 1),
+        "p95": round(nearest_rank(ms, 0.95), 1),
+        "p99": round(nearest_rank(ms, 0.99), 1),
+        "max": round(max(ms), 1),
+    }
+
+
+def _print(report):
+    print(
+        f"{report['sessions']} sessions x {report['flows_per_session']} flows: "
+        f"{report['flows_completed']} completed in {report['elapsed_s']}s "
+        f"({report['flows_per_min']} flows/min, {report['reruns_per_s']} reruns/s, {report['received_mib']} MiB sent)"
+    )
+    print(f"{'step':11} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for step, p in report["latency_ms"].items():
+        print(f"{step:11} {p['count']:>6} {p['p50']:>8.0f} {p['p95']:>8.0f} {p['p99']:>8.0f} {p['max']:>8.0f}")
+    for step, failure in report["failures"].items():
+        print(f"FAILED {failure['count']}x {step}: {failure['example']}")
+    if report["server"]:
+        s = report["server"]
+        print(
+            f"server: CPU mean {s['cpu_mean_pct']}% peak {s['cpu_peak_pct']}%, "
+            f"RSS {s['rss_start_mib']} -> peak {s['rss_peak_mib']} -> {s['rss_end_mib']} MiB"
+        )
+    if report.get("fake_openai"):
+        print("fake OpenAI:", ", ".join(f"{k} {v}" for k, v in sorted(report["fake_openai"].items())))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    defaults = Behaviour()
+    parser = argparse.ArgumentParser(description="Concurrent simulated visitors over the websocket protocol.")
+    parser.add_argument("--url", help="a running app, e.g. http://localhost:8501")
+    parser.add_argument("--pid", type=int, help="the server's process id, to sample its CPU and RSS")
+    parser.add_argument("--launch", action="store_true", help="start the fake API and the app for this run")
+    parser.add_argument("--script", default="WaterHabitsApp.py")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent visitors")
+    parser.add_argument("--flows", type=int, default=1, help="visits per session")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which sessions start")
+    parser.add_argument("--think", type=float, default=THINK_TIME, help="mean pause between actions (s)")
+    parser.add_argument("--step-timeout", type=float, default=STEP_TIMEOUT)
+    parser.add_argument("--out", help="write the report as JSON")
+    group = parser.add_argument_group("fake OpenAI (with --launch)")
+    group.add_argument("--latency", type=float, default=defaults.latency)
+    group.add_argument("--image-latency", type=float, default=defaults.image_latency)
+    group.add_argument("--chunk-delay", type=float, default=defaults.chunk_delay)
+    group.add_argument("--buffered", action="store_true")
+    group.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    group.add_argument("--error-status", type=int, default=defaults.error_status)
+    group.add_argument("--stall-rate", type=float, default=defaults.stall_rate)
+    group.add_argument("--app-log", help="file for the launched app's output")
+    args = parser.parse_args()
+
+    if not args.launch and not args.url:
+        parser.error("give --url of a running app, or --launch")
+
+    options = dict(
+        sessions=args.sessions, flows=args.flows, ramp=args.ramp, think=args.think, step_timeout=args.step_timeout,
+    )
+    if args.launch:
+        behaviour = Behaviour(
+            latency=args.latency, image_latency=args.image_latency, chunk_delay=args.chunk_delay,
+            buffered=args.buffered, error_rate=args.error_rate, error_status=args.error_status,
+            stall_rate=args.stall_rate,
+        )
+        with launched(args.script, behaviour, args.app_log) as (url, pid, fake):
+            report = run(url, pid=pid, **options)
+            report["fake_openai"] = fake.RequestHandlerClass.stats.snapshot()
+    else:
+        report = run(args.url, pid=args.pid, **options)
+
+    _print(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report["failures"] else 0)
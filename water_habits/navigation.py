@@ -0,0 +1,40 @@
+# ---- NAVIGATION ----
+# The app's pages (scripts in app_pages/, relative to WaterHabitsApp.py).
+# Buttons navigate with `on_click=go, args=("tips",)`: the switch happens in
+# the callback, before the next run starts, so it costs exactly one rerun.
+
+import streamlit as st
+
+CONSENT_PAGE = ("app_pages/consent.py", "Welcome")
+# Telemetry and resilience stats; reachable only by URL (/admin?token=...)
+ADMIN_PAGE = ("app_pages/admin.py", "Admin")
+
+# name: (script, title); the first one is the default page.
+# No page icons: the built-in menu is hidden, and validating an emoji icon
+# imports streamlit's whole emoji table (~70 ms on a cold process).
+PAGES = {
+    "home": ("app_pages/home.py", "Home"),
+    "about": ("app_pages/about.py", "About Us"),
+    "goals": ("app_pages/goals.py", "Water Goals"),
+    "tips": ("app_pages/tips.py", "Water-Saving Tips"),
+    "story": ("app_pages/story.py", "Eco Story + Game"),
+}
+
+
+def page(name):
+    path, title = {"consent": CONSENT_PAGE, "admin": ADMIN_PAGE}.get(name) or PAGES[name]
+    return st.Page(path, title=title, default=name in ("consent", next(iter(PAGES))))
+
+
+def app_pages():
+    return [page(name) for name in PAGES] + [page("admin")]
+
+
+def name_of(current):
+    """Our name for the page st.navigation picked."""
+    return current.url_path or next(iter(PAGES))
+
+
+def go(name):
+    """Button callback: switch to page `name`."""
+    st.switch_page(page(name))
@@ -0,0 +1,50 @@
+# ---- SHARED OPENAI CLIENT ----
+# One pooled OpenAI client per process. Reusing it across sessions keeps
+# HTTP connections (and their TLS handshakes) alive between calls.
+
+import importlib.util
+
+import httpx
+
+# Connection pool shared by every session in this process
+MAX_CONNECTIONS = 50
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 60.0  # seconds an idle connection is kept open
+
+# HTTP/2 needs the optional "h2" package (pip install "httpx[http2]")
+HTTP2_SUPPORTED = importlib.util.find_spec("h2") is not None
+
+# Connect / read timeouts (seconds) for each kind of call the app makes
+TIMEOUTS = {
+    "tip": httpx.Timeout(10.0, connect=3.0),      # short gpt-3.5-turbo rewrite
+    "story": httpx.Timeout(60.0, connect=5.0),    # up to 800 tokens
+    "comic": httpx.Timeout(90.0, connect=5.0),    # gpt-4 panel script
+    "image": httpx.Timeout(120.0, connect=5.0),   # one comic panel image
+}
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+def make_client(api_key, max_retries=0):
+    """Build an OpenAI client on top of a tuned, keep-alive connection pool.
+
+    Retries are left to water_habits.retry, which knows each page action's deadline.
+    """
+    # openai (and pydantic under it) is the slowest import in the app; only pay
+    # for it when the first API call actually needs a client
+    from openai import DefaultHttpxClient, OpenAI
+
+    http_client = DefaultHttpxClient(
+        http2=HTTP2_SUPPORTED,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=DEFAULT_TIMEOUT,
+    )
+    return OpenAI(api_key=api_key, http_client=http_client, max_retries=max_retries)
+
+
+def timeout_for(kind):
+    """Timeout to pass as `timeout=` for a "tip", "story", "comic" or "image" call."""
+    return TIMEOUTS.get(kind, DEFAULT_TIMEOUT)
@@ -0,0 +1,288 @@
+# ---- PROGRESS ----
+# Optional, anonymous progress that survives a refresh: tips and stories per
+# day, the current and best streak of active days, and how many days met the
+# daily goal. Nothing is kept until a grown-up opts in on the Water Goals
+# page; after that the browser holds a random device token in a cookie, and
+# the store only ever sees a hash of it. No names, no tip text.
+#
+# Writes never touch SQLite on the render path: record() appends to a list,
+# and a background thread flushes the list in one transaction every
+# FLUSH_INTERVAL seconds (or once FLUSH_BATCH events are waiting). Each
+# flush folds the events into a per-day row and a per-device row, so
+# reading progress is two primary-key lookups, never a scan of the log.
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import streamlit as st
+
+from water_habits.sqlite_util import ThreadLocalConnection
+
+PROGRESS_PATH = ".cache/progress.sqlite3"
+DAILY_GOAL = 3          # tips + stories in a day that count as "goal met"
+FLUSH_INTERVAL = 2.0    # seconds between write-behind flushes
+FLUSH_BATCH = 200       # flush early once this many events are waiting
+
+KINDS = {"tip": "tips", "story": "stories"}  # event kind -> counter column
+
+
+def _device_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _fold(device, today, day, kind):
+    """Add one event to a device row and its day row (dicts, changed in place)."""
+    last = device["last_day"]
+    if last is None or day > last:
+        yesterday = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        device["streak"] = device["streak"] + 1 if last == yesterday else 1
+        device["best_streak"] = max(device["best_streak"], device["streak"])
+        device["last_day"] = day
+    column = KINDS[kind]
+    done = today["tips"] + today["stories"]
+    today[column] += 1
+    device[column] += 1
+    if done < DAILY_GOAL <= done + 1:
+        device["goal_days"] += 1
+
+
+_NEW_DEVICE = {"last_day": None, "streak": 0, "best_streak": 0, "goal_days": 0, "tips": 0, "stories": 0}
+_NEW_DAY = {"tips": 0, "stories": 0}
+
+
+class ProgressStore:
+    def __init__(self, path=PROGRESS_PATH, flush_interval=FLUSH_INTERVAL, flush_batch=FLUSH_BATCH):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._conn = ThreadLocalConnection(path, named_rows=True)
+        self._pending = []  # (device key, day, kind, timestamp), oldest first
+        self._lock = threading.Lock()        # guards _pending
+        self._write_lock = threading.Lock()  # one flush() or forget() at a time
+        self._wake = threading.Event()
+        self._flusher = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS events (
+                device TEXT NOT NULL,
+                day TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS days (
+                device TEXT NOT NULL,
+                day TEXT NOT NULL,
+                tips INTEGER NOT NULL DEFAULT 0,
+                stories INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (device, day)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS devices (
+                device TEXT PRIMARY KEY,
+                last_day TEXT,
+                streak INTEGER NOT NULL DEFAULT 0,
+                best_streak INTEGER NOT NULL DEFAULT 0,
+                goal_days INTEGER NOT NULL DEFAULT 0,
+                tips INTEGER NOT NULL DEFAULT 0,
+                stories INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+        """)
+
+    # ---- WRITE BEHIND ----
+    def record(self, token, kind, day):
+        """Queue one event (kind "tip" or "story" on `day`, an ISO date); returns at once."""
+        if kind not in KINDS:
+            raise ValueError(f"unknown progress event {kind!r}")
+        with self._lock:
+            self._pending.append((_device_key(token), day, kind, time.time()))
+            full = len(self._pending) >= self.flush_batch
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="progress-flush", daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+        if full:
+            self._wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # the events stay queued; the next flush tries again
+
+    def flush(self):
+        """Write every queued event, its day and device rows in one transaction; returns how many."""
+        with self._write_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        db = self._conn()
+        try:
+            db.execute("BEGIN IMMEDIATE")  # other processes share the file: read-modify-write under the lock
+            devices, days = {}, {}
+            for device, day, kind, _ in batch:
+                if device not in devices:
+                    row = db.execute("SELECT * FROM devices WHERE device = ?", (device,)).fetchone()
+                    devices[device] = dict(row) if row else {"device": device, **_NEW_DEVICE}
+                if (device, day) not in days:
+                    row = db.execute("SELECT tips, stories FROM days WHERE device = ? AND day = ?",
+                                     (device, day)).fetchone()
+                    days[device, day] = dict(row) if row else dict(_NEW_DAY)
+                _fold(devices[device], days[device, day], day, kind)
+            db.executemany("INSERT INTO events (device, day, kind, at) VALUES (?, ?, ?, ?)", batch)
+            db.executemany(
+                "INSERT OR REPLACE INTO days (device, day, tips, stories) VALUES (?, ?, ?, ?)",
+                [(device, day, counts["tips"], counts["stories"]) for (device, day), counts in days.items()],
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO devices (device, last_day, streak, best_streak, goal_days, tips, stories) "
+                "VALUES (:device, :last_day, :streak, :best_streak, :goal_days, :tips, :stories)",
+                list(devices.values()),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            with self._lock:
+                self._pending[:0] = batch  # put them back, in order
+            raise
+        return len(batch)
+
+    # ---- READ ----
+    def summary(self, token, today):
+        """Progress for `token` as of `today` (ISO date), including events not flushed yet."""
+        device = _device_key(token)
+        db = self._conn()
+        row = db.execute("SELECT * FROM devices WHERE device = ?", (device,)).fetchone()
+        totals = dict(row) if row else dict(_NEW_DEVICE)
+        row = db.execute("SELECT tips, stories FROM days WHERE device = ? AND day = ?", (device, today)).fetchone()
+        counts = dict(row) if row else dict(_NEW_DAY)
+        with self._lock:
+            pending = [(day, kind) for key, day, kind, _ in self._pending if key == device]
+        other_day = dict(_NEW_DAY)
+        for day, kind in pending:
+            _fold(totals, counts if day == today else other_day, day, kind)
+
+        yesterday = (date.fromisoformat(today) - timedelta(days=1)).isoformat()
+        alive = totals["last_day"] in (today, yesterday)  # a missed day ends the streak
+        return {
+            "today_tips": counts["tips"],
+            "today_stories": counts["stories"],
+            "goal_met_today": counts["tips"] + counts["stories"] >= DAILY_GOAL,
+            "streak": totals["streak"] if alive else 0,
+            "best_streak": totals["best_streak"],
+            "goal_days": totals["goal_days"],
+            "tips": totals["tips"],
+            "stories": totals["stories"],
+        }
+
+    def forget(self, token):
+        """Drop everything stored (or queued) for this token."""
+        device = _device_key(token)
+        # Under the write lock, so a flush can't write this device's rows back after the delete
+        with self._write_lock:
+            with self._lock:
+                self._pending = [event for event in self._pending if event[0] != device]
+            db = self._conn()
+            try:
+                db.execute("BEGIN IMMEDIATE")
+                for table in ("events", "days", "devices"):
+                    db.execute(f"DELETE FROM {table} WHERE device = ?", (device,))
+                db.execute("COMMIT")
+            except Exception:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        devices, events = self._conn().execute(
+            "SELECT (SELECT COUNT(*) FROM devices), (SELECT COUNT(*) FROM events)"
+        ).fetchone()
+        return {"devices": devices, "events": events, "pending": pending}
+
+
+# ---- PAGE SIDE ----
+# The device token lives in a cookie the browser sends with every new
+# session; st.context.cookies reads it, a one-line script writes it.
+
+DEVICE_COOKIE = "wh_device"
+COOKIE_MAX_AGE = 365 * 24 * 3600
+_TOKEN = re.compile(r"[A-Za-z0-9_-]{22}")
+
+_COOKIE_JS = """
+<script>
+  const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+  window.parent.document.cookie = %s + secure;
+</script>
+"""
+
+
+@st.cache_resource
+def get_progress_store():
+    return ProgressStore()
+
+
+def device_token():
+    """This browser's token if it opted in, else None."""
+    if "device_token" not in st.session_state:
+        cookie = st.context.cookies.get(DEVICE_COOKIE)
+        valid = isinstance(cookie, str) and _TOKEN.fullmatch(cookie)
+        st.session_state.device_token = cookie if valid else ""
+    return st.session_state.device_token or None
+
+
+def today():
+    """The visitor's date (their browser's timezone when it's known)."""
+    zone = st.context.timezone
+    if isinstance(zone, str):
+        try:
+            from zoneinfo import ZoneInfo
+
+            return datetime.now(ZoneInfo(zone)).date().isoformat()
+        except (ValueError, KeyError, OSError):
+            pass
+    return date.today().isoformat()
+
+
+def track(kind):
+    """Count a tip or story for this browser, if it opted in. Cheap: the write happens later."""
+    token = device_token()
+    if token:
+        get_progress_store().record(token, kind, today())
+
+
+def remember_device():
+    """Button callback: opt in."""
+    token = secrets.token_urlsafe(16)
+    st.session_state.device_token = token
+    st.session_state.cookie_update = f"{DEVICE_COOKIE}={token}; Max-Age={COOKIE_MAX_AGE}; Path=/; SameSite=Lax"
+
+
+def forget_device():
+    """Button callback: delete this browser's progress and its cookie."""
+    token = device_token()
+    if token:
+        get_progress_store().forget(token)
+    st.session_state.device_token = ""
+    st.session_state.cookie_update = f"{DEVICE_COOKIE}=; Max-Age=0; Path=/; SameSite=Lax"
+
+
+def sync_cookie():
+    """Write a cookie change from remember_device()/forget_device() to the browser."""
+    update = st.session_state.pop("cookie_update", None)
+    if update:
+        st.iframe(_COOKIE_JS % json.dumps(update), height="content")
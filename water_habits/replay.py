@@ -0,0 +1,181 @@
+# ---- RECORD / REPLAY ----
+# Captures real OpenAI responses once, then plays them back with the
+# latencies they were recorded with, so benchmarks exercise the real code
+# paths (streaming, retries, image decoding) without the network.
+#
+#   WH_OPENAI_RECORD=bench/recordings.jsonl   # wrap the real client, append every response
+#   WH_OPENAI_REPLAY=bench/recordings.jsonl   # no network: answer from the file
+#   WH_OPENAI_REPLAY_SPEED=4                  # replay latencies 4x faster
+#
+# resources.get_client() reads these, so the whole app (and python -m
+# water_habits.bench) switches over without any code change. Each line of
+# the file is one call: the request's key, the response as JSON, the time to
+# the response and, for streams, every chunk with its offset.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from water_habits.client_proxy import ClientProxy
+
+RECORD_ENV = "WH_OPENAI_RECORD"
+REPLAY_ENV = "WH_OPENAI_REPLAY"
+SPEED_ENV = "WH_OPENAI_REPLAY_SPEED"
+
+# Transport settings, not part of what was asked
+_IGNORED_PARAMS = {"timeout", "stream_options"}
+
+
+class ReplayMiss(LookupError):
+    """No recording for this call; record one with WH_OPENAI_RECORD."""
+
+
+def request_key(endpoint, request):
+    payload = {"endpoint": endpoint, **{k: v for k, v in request.items() if k not in _IGNORED_PARAMS}}
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _dump(obj):
+    """A response object (pydantic model or plain attributes) as JSON-ready data."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, SimpleNamespace) or hasattr(obj, "__dict__"):
+        return {k: _dump(v) for k, v in vars(obj).items() if not k.startswith("_")}
+    if isinstance(obj, (list, tuple)):
+        return [_dump(v) for v in obj]
+    return obj
+
+
+def _load(data):
+    """JSON data back as attribute access (response.choices[0].message.content)."""
+    if isinstance(data, dict):
+        return SimpleNamespace(**{k: _load(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return [_load(v) for v in data]
+    return data
+
+
+# ---- RECORDING ----
+
+class _Recorder:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _recorded_stream(stream, recorder, record, started):
+    chunks = []
+    for chunk in stream:
+        chunks.append([time.perf_counter() - started, _dump(chunk)])
+        yield chunk
+    # Only complete streams are kept; a broken one would replay as a short answer
+    recorder.write({**record, "chunks": chunks})
+
+
+class RecordingClient(ClientProxy):
+    """`client`, with every chat/image response appended to `path`."""
+
+    def __init__(self, client, path):
+        super().__init__(client)
+        self._recorder = _Recorder(path)
+
+    def _call(self, endpoint, fn, **request):
+        started = time.perf_counter()
+        response = fn(**request)
+        record = {
+            "key": request_key(endpoint, request), "endpoint": endpoint, "model": request.get("model"),
+            "stream": bool(request.get("stream")), "latency": time.perf_counter() - started,
+        }
+        if record["stream"]:
+            return _recorded_stream(response, self._recorder, record, started)
+        self._recorder.write({**record, "response": _dump(response)})
+        return response
+
+
+# ---- REPLAY ----
+
+def _replayed_stream(chunks, speed):
+    started = time.perf_counter()
+    for offset, chunk in chunks:
+        wait = offset / speed - (time.perf_counter() - started)
+        if wait > 0:
+            time.sleep(wait)
+        yield _load(chunk)
+
+
+class ReplayClient(ClientProxy):
+    """Answers chat/image calls from a recording file, sleeping the recorded latency.
+
+    A call recorded several times replays its recordings in turn. A call with
+    no exact match (a random pick asked a different question) gets the next
+    recording of the same endpoint, model and stream flag, and is counted in
+    `stats()["fuzzy"]`; with nothing close either it raises ReplayMiss.
+    """
+
+    def __init__(self, path, speed=1.0):
+        super().__init__(None)  # nothing behind it: _call() never uses fn
+        self.path = path
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._exact = {}  # key -> [record, ...]
+        self._similar = {}  # (endpoint, model, stream) -> [record, ...]
+        self._turns = {}
+        self._hits = self._fuzzy = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._exact.setdefault(record["key"], []).append(record)
+                    shape = (record["endpoint"], record["model"], record["stream"])
+                    self._similar.setdefault(shape, []).append(record)
+
+    def _next(self, bucket, records):
+        turn = self._turns.get(bucket, 0)
+        self._turns[bucket] = turn + 1
+        return records[turn % len(records)]
+
+    def _find(self, endpoint, request):
+        key = request_key(endpoint, request)
+        shape = (endpoint, request.get("model"), bool(request.get("stream")))
+        with self._lock:
+            if key in self._exact:
+                self._hits += 1
+                return self._next(key, self._exact[key])
+            if shape in self._similar:
+                self._fuzzy += 1
+                return self._next(shape, self._similar[shape])
+        raise ReplayMiss(f"no recording for {endpoint} {shape[1]} (stream={shape[2]}) in {self.path}")
+
+    def _call(self, endpoint, fn, **request):
+        record = self._find(endpoint, request)
+        time.sleep(record["latency"] / self.speed)
+        if record["stream"]:
+            # Chunk offsets are from the start of the call; the wait above already covered the first part
+            shift = record["latency"]
+            return _replayed_stream([(offset - shift, chunk) for offset, chunk in record["chunks"]], self.speed)
+        return _load(record["response"])
+
+    def stats(self):
+        with self._lock:
+            return {"recordings": sum(map(len, self._exact.values())), "hits": self._hits, "fuzzy": self._fuzzy}
+
+
+def client_from_env(make):
+    """The client the environment asks for: replayed, recorded, or `make()` as is."""
+    replay = os.environ.get(REPLAY_ENV)
+    if replay:
+        return ReplayClient(replay, float(os.environ.get(SPEED_ENV) or 1.0))
+    record = os.environ.get(RECORD_ENV)
+    if record:
+        return RecordingClient(make(), record)
+    return make()
@@ -0,0 +1,123 @@
+# ---- SHARED RESOURCES ----
+# Process-wide objects the pages share: the pooled API client and everything
+# wrapped around it, plus the tip data. Each getter is cached once per process
+# and only built when a page that needs it first runs, so the consent, home,
+# about and goals pages never create a client. The client itself (and the
+# openai import) waits for the first real API call, so tips served from the
+# pool never load it.
+
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from water_habits.circuit_breaker import BreakerClient, CircuitBreaker
+from water_habits.image_store import ImageStore
+from water_habits.llm import IMAGE_WORKERS
+from water_habits.llm_cache import LLMCache
+from water_habits.openai_client import make_client, timeout_for
+from water_habits.replay import client_from_env
+from water_habits.retry import resilient
+from water_habits.scheduler import Scheduler
+from water_habits.single_flight import SingleFlight
+from water_habits.telemetry import TELEMETRY, InstrumentedClient
+from water_habits.tip_index import TipIndex
+from water_habits.tip_pool import TipPool, openai_generate
+
+
+# One pooled client per process, shared across sessions so connections stay warm.
+# WH_OPENAI_RECORD / WH_OPENAI_REPLAY swap in the benchmark's recorder or replayer
+@st.cache_resource
+def get_client():
+    return client_from_env(lambda: make_client(st.secrets["OPENAI_API_KEY"]))
+
+
+# Chat and image calls each sit behind a circuit breaker; when open, pages use their offline fallbacks
+@st.cache_resource
+def get_breakers():
+    breakers = {
+        "chat": CircuitBreaker("openai-chat", slow_call=8.0),
+        "images": CircuitBreaker("openai-images", slow_call=60.0),
+    }
+    TELEMETRY.watch_breakers(breakers.values())
+    return breakers
+
+
+class _LazyClient:
+    """Stands in for get_client() until an API call touches it."""
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+
+@st.cache_resource
+def get_guarded_client():
+    breakers = get_breakers()
+    return BreakerClient(_LazyClient(), breakers["chat"], breakers["images"])
+
+
+# Bounded worker pool for comic panel images, shared by every session
+@st.cache_resource
+def get_image_pool():
+    return ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="panel-image")
+
+
+# Comic panel art kept on disk, reused for near-identical panels
+@st.cache_resource
+def get_image_store():
+    return ImageStore()
+
+
+# Every API call queues here: per-model rate limits, tips before stories/images, fair between sessions
+@st.cache_resource
+def get_scheduler():
+    return Scheduler()
+
+
+# Identical in-flight API calls from different sessions share one request
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+
+# Disk-backed answer cache for tips, stories and comic scripts (shared by all processes)
+@st.cache_resource
+def get_llm_cache():
+    return LLMCache()
+
+
+# Pre-generated tip rewrites (python -m water_habits.tip_pool); the API only refills it in the background
+@st.cache_resource
+def get_tip_pool():
+    instrumented = InstrumentedClient(get_guarded_client(), "refill", "background")
+    refill_client = get_scheduler().client(instrumented, "refill", "tip-pool")
+    return TipPool(refill=openai_generate(refill_client, timeout_for("tip")))
+
+
+# One tip index per process, shared by every session; it reloads itself when the CSV changes
+@st.cache_resource
+def get_tip_index():
+    return TipIndex("expanded_tips_data.csv")
+
+
+# ---- API ACCESS ----
+
+# The page each kind of call serves, for telemetry labels
+CALL_PAGES = {"tip": "tips", "story": "story", "comic": "story", "image": "story"}
+
+
+def queued_client(kind, wait_slot=None, deadline=None):
+    """The shared client, scheduled for this session and wrapped in this call's retry policy.
+
+    Shows the queue position in wait_slot; gives up at `deadline` (time.monotonic()).
+    """
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    on_wait = None
+    if wait_slot is not None:
+        on_wait = lambda position: wait_slot.info(
+            f"⏳ Lots of water heroes are busy right now — you're #{position} in line!"
+        )
+    instrumented = InstrumentedClient(get_guarded_client(), kind, CALL_PAGES.get(kind))
+    scheduled = get_scheduler().client(instrumented, kind, st.session_state.session_id, on_wait, deadline)
+    return resilient(scheduled, kind, deadline)
@@ -0,0 +1,204 @@
+# ---- RETRIES, DEADLINES AND HEDGING ----
+# Each page action gets an overall deadline. Inside it, retryable API errors
+# (timeouts, dropped connections, 429s, 5xx) are retried with exponential
+# backoff and full jitter. The short tip call is also hedged: if the first
+# request hasn't answered by the recent p95 latency, a duplicate is sent and
+# whichever answers first wins.
+
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+from water_habits.client_proxy import ClientProxy, send
+
+
+class DeadlineExceeded(TimeoutError):
+    """The page action ran out of time."""
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=4.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt):
+        # "Full jitter": anywhere between 0 and the exponential cap
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+# Per call site: attempts and backoff, and the deadline (seconds) for the whole page action
+POLICIES = {
+    "tip": RetryPolicy(max_attempts=3, base_delay=0.2, max_delay=1.0),
+    "story": RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0),
+    "comic": RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=4.0),
+    "image": RetryPolicy(max_attempts=2, base_delay=1.0, max_delay=4.0),
+}
+ACTION_DEADLINES = {"tip": 8.0, "story": 150.0}
+
+HEDGE_DEFAULT_AFTER = 1.5  # seconds, until we have enough samples for a real p95
+HEDGE_MIN_SAMPLES = 20
+
+
+def is_retryable(exc):
+    # openai is imported lazily with the client; until then exc can't be one of its errors
+    openai = sys.modules.get("openai")
+    if openai is not None:
+        if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+            return True
+        if isinstance(exc, openai.APIStatusError):
+            return exc.status_code in (408, 409, 429) or exc.status_code >= 500
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError))
+
+
+def retry_after(exc):
+    """Seconds the server asked us to wait, if it said."""
+    response = getattr(exc, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def clip_timeout(timeout, remaining):
+    """Shrink a per-call timeout so one attempt can't outlive the action deadline."""
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return httpx.Timeout(remaining)
+    if isinstance(timeout, (int, float)):
+        return min(timeout, remaining)
+    read = min(timeout.read or remaining, remaining)
+    connect = min(timeout.connect or remaining, remaining)
+    return httpx.Timeout(read, connect=connect)
+
+
+def call_with_retries(policy, fn, deadline=None):
+    """fn(remaining_seconds) with retries; gives up at `deadline` (time.monotonic())."""
+    attempt = 0
+    while True:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded("out of time before the call could be made")
+        try:
+            return fn(remaining)
+        except Exception as e:
+            attempt += 1
+            if not is_retryable(e) or attempt >= policy.max_attempts:
+                raise
+            delay = retry_after(e) or policy.backoff(attempt)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            time.sleep(delay)
+
+
+# ---- HEDGING ----
+
+class LatencyTracker:
+    """Rolling window of recent latencies for one call site."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q, default=None):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return default
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+TIP_LATENCY = LatencyTracker()
+
+
+def hedged(fn, tracker, remaining=None, poll=None):
+    """Run fn() and, if it is slower than the tracked p95, a duplicate; first success wins.
+
+    `poll()` runs on the calling thread while we wait (e.g. to repaint a queue position).
+    """
+    hedge_after = tracker.percentile(0.95, HEDGE_DEFAULT_AFTER)
+    started = time.monotonic()
+    give_up = None if remaining is None else started + remaining
+    pending = {_hedge_pool.submit(_timed, fn)}
+    hedge_sent = False
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                seconds, result = future.result()
+            except Exception as e:
+                error = e
+                continue
+            tracker.record(seconds)
+            return result  # the slower copy finishes in the background and is dropped
+        if not pending:
+            break  # every copy failed; the retry loop decides what happens next
+        now = time.monotonic()
+        if not hedge_sent and now - started >= hedge_after:
+            pending.add(_hedge_pool.submit(_timed, fn))
+            hedge_sent = True
+        if give_up is not None and now >= give_up:
+            raise DeadlineExceeded("no answer before the deadline")
+        if poll is not None:
+            poll()
+    raise error
+
+
+def _timed(fn):
+    started = time.monotonic()
+    result = fn()
+    return time.monotonic() - started, result
+
+
+# ---- CLIENT VIEW ----
+
+class ResilientClient(ClientProxy):
+    """A client view that retries, honours a deadline, and (for tips) hedges."""
+
+    def __init__(self, client, kind, deadline=None, tracker=None):
+        super().__init__(client)
+        self.kind = kind
+        self.policy = POLICIES.get(kind, RetryPolicy())
+        self.deadline = deadline
+        self.tracker = tracker
+
+    def _call(self, endpoint, fn, **request):
+        timeout = request.get("timeout")
+        hedge = endpoint == "chat" and not request.get("stream") and self.tracker is not None
+
+        def attempt(remaining):
+            clipped = dict(request, timeout=clip_timeout(timeout, remaining))
+            if not hedge:
+                return fn(**clipped)
+            # Hedged copies run on worker threads, so they only record the queue
+            # position; we repaint it from this (the script's) thread
+            on_wait = getattr(self.client, "on_wait", None)
+            latest = {}
+            view = self.client.with_on_wait(lambda position: latest.update(position=position)) if on_wait else self.client
+            shown = {}
+
+            def poll():
+                if latest.get("position") != shown.get("position"):
+                    shown["position"] = latest.get("position")
+                    on_wait(shown["position"])
+
+            return hedged(lambda: send(view, endpoint, clipped), self.tracker, remaining, poll if on_wait else None)
+
+        return call_with_retries(self.policy, attempt, self.deadline)
+
+
+def resilient(client, kind, deadline=None):
+    """Wrap a (scheduled) client view with this call site's retry policy."""
+    return ResilientClient(client, kind, deadline, TIP_LATENCY if kind == "tip" else None)
@@ -0,0 +1,224 @@
+# ---- OPENAI CALL SCHEDULER ----
+# Every API call waits here for its turn. Per-model token buckets keep us
+# under requests-per-minute and tokens-per-minute limits, cheap tip
+# rewrites go ahead of stories and images, and sessions at the same
+# priority take turns so one comic burst can't starve everyone else.
+
+import itertools
+import threading
+import time
+
+from water_habits.client_proxy import ClientProxy
+
+# (requests per minute, tokens per minute) per model for THIS process.
+# Our org limits are shared by every replica, so divide them between replicas.
+MODEL_LIMITS = {
+    "gpt-3.5-turbo": (3000, 160_000),
+    "gpt-4o-mini": (500, 200_000),
+    "gpt-4": (500, 10_000),
+    "dall-e-2": (100, None),  # image calls are limited by count only
+}
+DEFAULT_LIMITS = (500, 40_000)
+IMAGE_MODEL = "dall-e-2"  # what images.generate uses when no model is given
+
+# Lower number = served first
+PRIORITY = {"tip": 0, "story": 1, "comic": 2, "image": 3, "refill": 4}
+
+MAX_WAIT = 60.0  # seconds a call may queue before we give up with SchedulerBusy
+
+
+class SchedulerBusy(Exception):
+    """Raised when a call has waited longer than MAX_WAIT for capacity."""
+
+
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _fill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def has(self, amount, now):
+        self._fill(now)
+        return self.level >= min(amount, self.capacity)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+    def wait_time(self, amount, now):
+        self._fill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+
+class _Waiter:
+    def __init__(self, seq, model, kind, session, tokens):
+        self.seq = seq
+        self.model = model
+        self.kind = kind
+        self.session = session
+        self.tokens = tokens
+        self.granted = False
+
+
+def estimate_tokens(messages, max_tokens):
+    """Rough prompt + completion size (~4 characters per token)."""
+    prompt = sum(len(str(m.get("content", ""))) for m in messages or []) // 4
+    return prompt + (max_tokens or 500)
+
+
+class Scheduler:
+    def __init__(self, limits=None, max_wait=MAX_WAIT):
+        self.limits = dict(MODEL_LIMITS, **(limits or {}))
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._waiting = []
+        self._buckets = {}
+        self._served = {}          # session -> calls granted this minute (fairness)
+        self._served_reset = time.monotonic()
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def _model_buckets(self, model):
+        if model not in self._buckets:
+            rpm, tpm = self.limits.get(model, DEFAULT_LIMITS)
+            self._buckets[model] = (TokenBucket(rpm), TokenBucket(tpm) if tpm else None)
+        return self._buckets[model]
+
+    def _order(self, w):
+        return (PRIORITY.get(w.kind, 9), self._served.get(w.session, 0), w.seq)
+
+    def _dispatch(self, now):
+        """Grant every waiter that can go now; the best waiter per model goes first."""
+        if now - self._served_reset > 60:
+            self._served.clear()
+            self._served_reset = now
+        blocked = set()
+        for w in sorted(self._waiting, key=self._order):
+            if w.model in blocked:
+                continue
+            requests, tokens = self._model_buckets(w.model)
+            if requests.has(1, now) and (tokens is None or tokens.has(w.tokens, now)):
+                requests.take(1)
+                if tokens is not None:
+                    tokens.take(w.tokens)
+                w.granted = True
+                self._waiting.remove(w)
+                self._served[w.session] = self._served.get(w.session, 0) + 1
+                self.granted += 1
+            else:
+                # Keep lower-priority work from jumping ahead on this model
+                blocked.add(w.model)
+
+    def _next_refill(self, now):
+        soonest = 1.0
+        for w in self._waiting:
+            requests, tokens = self._model_buckets(w.model)
+            wait = requests.wait_time(1, now)
+            if tokens is not None:
+                wait = max(wait, tokens.wait_time(w.tokens, now))
+            soonest = min(soonest, wait)
+        return max(0.01, soonest)
+
+    def position(self, waiter):
+        """1-based place in line among calls for the same model."""
+        ahead = [w for w in self._waiting if w.model == waiter.model]
+        ahead.sort(key=self._order)
+        return ahead.index(waiter) + 1 if waiter in ahead else 0
+
+    def acquire(self, model, kind, session=None, tokens=0, on_wait=None, deadline=None):
+        """Block until this call may go. on_wait(position) is called while queued.
+
+        Gives up with SchedulerBusy after MAX_WAIT or at `deadline` (time.monotonic()), whichever is first.
+        """
+        give_up = time.monotonic() + self.max_wait
+        deadline = give_up if deadline is None else min(deadline, give_up)
+        with self._cond:
+            w = _Waiter(next(self._seq), model, kind, session, tokens)
+            self._waiting.append(w)
+            self._dispatch(time.monotonic())
+            last_position = None
+            if not w.granted:
+                self.queued += 1
+            while not w.granted:
+                now = time.monotonic()
+                if now >= deadline:
+                    self._waiting.remove(w)
+                    self.rejected += 1
+                    raise SchedulerBusy(f"no {model} capacity in time")
+                position = self.position(w)
+                if on_wait is not None and position != last_position:
+                    last_position = position
+                    self._cond.release()
+                    try:
+                        on_wait(position)
+                    finally:
+                        self._cond.acquire()
+                self._cond.wait(timeout=min(self._next_refill(now), deadline - now))
+                self._dispatch(time.monotonic())
+            self._cond.notify_all()
+        return w
+
+    def settle(self, ticket, used_tokens):
+        """Correct the token bucket once the real usage of a call is known."""
+        if used_tokens is None:
+            return
+        with self._cond:
+            _, tokens = self._model_buckets(ticket.model)
+            if tokens is not None:
+                diff = ticket.tokens - used_tokens
+                if diff > 0:
+                    tokens.give_back(diff)
+                else:
+                    tokens.take(-diff)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "waiting": len(self._waiting),
+                "granted": self.granted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+            }
+
+    def client(self, client, kind, session=None, on_wait=None, deadline=None):
+        """A view of `client` whose chat/image calls go through this scheduler."""
+        return ScheduledClient(self, client, kind, session, on_wait, deadline)
+
+
+# ---- CLIENT VIEW ----
+
+class ScheduledClient(ClientProxy):
+    def __init__(self, scheduler, client, kind, session=None, on_wait=None, deadline=None):
+        super().__init__(client)
+        self.scheduler = scheduler
+        self.kind = kind
+        self.session = session
+        self.on_wait = on_wait
+        self.deadline = deadline
+
+    def with_on_wait(self, on_wait):
+        return ScheduledClient(self.scheduler, self.client, self.kind, self.session, on_wait, self.deadline)
+
+    def _call(self, endpoint, fn, **request):
+        if endpoint == "images":
+            self.scheduler.acquire(request.get("model", IMAGE_MODEL), self.kind, self.session, 0,
+                                   self.on_wait, self.deadline)
+            return fn(**request)
+        est = estimate_tokens(request.get("messages"), request.get("max_tokens"))
+        ticket = self.scheduler.acquire(request.get("model"), self.kind, self.session, est, self.on_wait, self.deadline)
+        response = fn(**request)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.scheduler.settle(ticket, usage.total_tokens)
+        return response
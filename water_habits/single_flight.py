@@ -0,0 +1,155 @@
+# ---- SINGLE-FLIGHT ----
+# Identical requests that arrive while one is already in flight wait for that
+# call instead of firing their own. A classroom pressing "Generate Tip" with
+# the same age + routine at the same moment becomes one API call.
+#
+# Only a result or an ordinary Exception is shared. If the leader is stopped
+# by anything else (Streamlit's rerun/stop control flow, a closed generator),
+# that belongs to the leader's session alone: the followers are woken and one
+# of them makes the call instead.
+
+import threading
+
+
+class StreamAbandoned(RuntimeError):
+    """The session leading a shared stream went away after this follower had read part of it."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.abandoned = False
+
+
+class _SharedStream:
+    """Pieces of one streamed call, readable by any number of sessions."""
+
+    def __init__(self):
+        self.parts = []
+        self.finished = False
+        self.error = None
+        self.abandoned = False
+        self.cond = threading.Condition()
+
+    def read(self):
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.parts) and not self.finished:
+                    self.cond.wait()
+                if self.abandoned:
+                    # Nothing read yet: the caller can start over; otherwise the text is cut off
+                    raise StreamAbandoned("shared stream was abandoned") if i else _Retry()
+                pending = self.parts[i:]
+                finished, error = self.finished, self.error
+            for piece in pending:
+                yield piece
+            i += len(pending)
+            if finished and i >= len(self.parts):
+                if error is not None:
+                    raise error
+                return
+
+
+class _Retry(Exception):
+    """Internal: the leader gave up before a follower read anything; take the call over."""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once per key at a time; concurrent callers share its result."""
+        with self._lock:
+            self.calls += 1
+        retried = False
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                elif not retried:
+                    self.coalesced += 1
+            if leader:
+                break
+            call.done.wait()
+            if call.abandoned:
+                retried = True
+                continue  # the leader was stopped, not failed: try again, maybe as the leader
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def do_stream(self, key, make_pieces):
+        """Like do(), for a generator of text pieces; followers see pieces as the leader gets them.
+
+        A follower that had already read part of an abandoned stream gets StreamAbandoned.
+        """
+        with self._lock:
+            self.calls += 1
+        retried = False
+        while True:
+            with self._lock:
+                shared = self._streams.get(key)
+                leader = shared is None
+                if leader:
+                    shared = self._streams[key] = _SharedStream()
+                elif not retried:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                yield from shared.read()
+                return
+            except _Retry:
+                retried = True
+
+        try:
+            for piece in make_pieces():
+                with shared.cond:
+                    shared.parts.append(piece)
+                    shared.cond.notify_all()
+                yield piece
+        except Exception as e:
+            shared.error = e
+            raise
+        except BaseException:
+            # The leading session went away or was rerun mid-stream; that's not the followers' error
+            shared.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with shared.cond:
+                shared.finished = True
+                shared.cond.notify_all()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._streams),
+            }
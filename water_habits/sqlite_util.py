@@ -0,0 +1,39 @@
+# ---- SQLITE CONNECTIONS ----
+# The on-disk stores (LLM cache, image index, tip pool, progress) all talk to
+# SQLite the same way: one connection per thread, since sqlite3 connections
+# can't be shared between threads; autocommit; WAL so readers never wait on
+# the writer; synchronous=NORMAL; a few seconds of busy timeout.
+#
+#   self._conn = ThreadLocalConnection(path)                 # then self._conn().execute(...)
+#   ThreadLocalConnection(path, "foreign_keys=ON", named_rows=True)
+#
+# sqlite3 is imported on the first connection, not with this module, so a
+# page that only constructs a store doesn't pay for it up front.
+
+import threading
+
+BUSY_TIMEOUT = 5.0  # seconds to wait on another writer's lock
+PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL")
+
+
+class ThreadLocalConnection:
+    """Calling it returns this thread's connection to `path`, opening it on first use."""
+
+    def __init__(self, path, *pragmas, named_rows=False):
+        self.path = path
+        self.pragmas = PRAGMAS + pragmas
+        self.named_rows = named_rows  # rows as sqlite3.Row (row["column"]) instead of tuples
+        self._local = threading.local()
+
+    def __call__(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            import sqlite3
+
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            if self.named_rows:
+                db.row_factory = sqlite3.Row
+            for pragma in self.pragmas:
+                db.execute(f"PRAGMA {pragma}")
+            self._local.db = db
+        return db
@@ -0,0 +1,44 @@
+# ---- STATIC CACHE HEADERS ----
+# Streamlit's app/static route answers with a bare FileResponse (Last-Modified
+# and ETag, no Cache-Control), so every page load revalidates every image.
+# asset_url() puts a content hash in the query string (?v=...) and the
+# build_assets variants carry one in their file name
+# (build/<stem>.<hash>.w<width>.<fmt>); either makes a URL safe to cache
+# forever, and this middleware says so.
+#
+# Added by serve.py, the st.App entry point:
+#   streamlit run serve.py     # or: uvicorn serve:app
+
+import re
+
+STATIC_PREFIX = "/app/static/"
+HASHED_BUILD = re.compile(re.escape(STATIC_PREFIX) + r"build/[^/]+\.[0-9a-f]{12}\.w\d+\.[a-z0-9]+")
+IMMUTABLE = b"public, max-age=31536000, immutable"  # one year; new content gets a new URL
+
+
+def is_immutable(path, query_string=b""):
+    """True for app/static URLs whose content can't change: ?v=<hash>, or a hashed build/ file."""
+    if not path.startswith(STATIC_PREFIX):
+        return False
+    versioned = any(part.startswith(b"v=") for part in query_string.split(b"&"))
+    return versioned or HASHED_BUILD.fullmatch(path) is not None
+
+
+class StaticCacheMiddleware:
+    """Long-lived Cache-Control on successful, versioned app/static responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_immutable(scope["path"], scope.get("query_string", b"")):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                message = {**message, "headers": headers + [(b"cache-control", IMMUTABLE)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache)
@@ -0,0 +1,652 @@
+# ---- STYLESHEET ----
+# All of the app's CSS in one place. It is compiled once per process into a
+# single minified sheet, where each page's rules are scoped to that page,
+# and injected into the page <head> once per session. After that, a rerun
+# only sends a tiny page marker instead of ~15 <style> blocks.
+#
+#   python -m water_habits.styles            # per-page payload report
+#   python -m water_habits.styles --script old_app.py   # same, for another version of the app
+#
+# Page scoping: every page renders <div class="wh-page wh-page-<scope>...">
+# and its rules become `.stApp:has(.wh-page-<scope>) <selector>`.
+#
+# The floating bubbles are one fixed layer (#wh-bubbles) mounted into the
+# page <body> next to the stylesheet. Reruns never touch it, so the
+# animation keeps running across reruns and page switches.
+# Tune it with ?bubbles=<count> and ?motion=float|calm|off.
+
+import hashlib
+import json
+import random
+import re
+
+import streamlit as st
+
+from water_habits.assets import background_css
+from water_habits.telemetry import TELEMETRY
+
+# ---- SOURCES ----
+
+CONSENT_CSS = """
+/* Light Blue Background */
+.stApp {
+    background-color: #d6f4ff;
+}
+
+/* General Text (Black) */
+h1, h2, h3, h4, p, label, .stMarkdown, .stExpanderHeader, .css-1v0mbdj, .css-1dp5vir {
+    color: black !important;
+    font-weight: bold;
+}
+
+/* Force Navy Buttons + White Text */
+div.stButton > button {
+    background-color: #0a4c86 !important;
+    color: white !important;
+    font-weight: bold !important;
+    border-radius: 10px;
+    height: 50px;
+    width: 100%;
+    font-size: 18px;
+    border: none;
+    transition: background-color 0.3s, transform 0.2s;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+}
+
+/* Ensure ALL button child text is white */
+div.stButton > button * {
+    color: white !important;
+    font-weight: bold !important;
+}
+
+/* Button Hover Effect */
+div.stButton > button:hover {
+    background-color: #083d6d !important;
+    transform: scale(1.05);
+}
+
+/* Expander Style (Privacy + Terms) */
+.stExpander > summary {
+    background-color: #0a4c86 !important;
+    color: white !important;
+    font-weight: bold;
+    border-radius: 10px;
+    padding: 10px;
+}
+"""
+
+# Every page after the consent gate
+APP_CSS = """
+.stApp {
+    background-size: cover;
+    background-position: center;
+    background-attachment: fixed;
+}
+
+/* Global card style */
+.feature-card {
+    background-color: rgba(255, 255, 255, 0.85);
+    color: #003344;
+    padding: 1.5rem;
+    border-radius: 15px;
+    text-align: center;
+    box-shadow: 4px 6px 12px rgba(0, 0, 0, 0.2);
+    transition: transform 0.2s ease;
+}
+.feature-card:hover {
+    transform: scale(1.02);
+}
+
+/* Navigation buttons */
+div.stButton > button {
+    background-color: #0a4c86;
+    color: white;
+    font-weight: bold;
+    border-radius: 10px;
+    height: 50px;
+    width: 100%;
+    border: none;
+    font-size: 18px;
+    transition: background-color 0.3s, transform 0.2s;
+}
+div.stButton > button:hover {
+    background-color: #1565c0;
+    transform: scale(1.05);
+}
+
+/* Fade-in for cards and photos (not bubbles) */
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(20px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+"""
+
+ABOUT_CSS = """
+.about-card, .about-image {
+    animation: fadeIn 1.5s ease-out;
+}
+
+.about-card {
+    background-color: rgba(255, 255, 255, 0.85);
+    padding: 2rem;
+    border-radius: 20px;
+    box-shadow: 0 8px 16px rgba(0,0,0,0.2);
+    max-width: 1000px;
+    margin: 2rem auto;
+}
+
+.about-text {
+    color: black;
+    font-size: 18px;
+    line-height: 1.6;
+}
+
+h1, h2, h3 {
+    color: black;
+}
+
+.about-image {
+    width: 100%;
+    border-radius: 15px;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+    margin-bottom: 20px;
+    transition: transform 0.3s ease, box-shadow 0.3s ease;
+}
+
+.about-image-caption {
+    text-align: center;
+    color: #003344;
+    font-weight: bold;
+    margin-top: 10px;
+    font-size: 18px;
+}
+
+.about-image:hover {
+    transform: scale(1.03);
+    box-shadow: 0 8px 20px rgba(0,0,0,0.25);
+}
+"""
+
+GOALS_CSS = """
+.goals-card, .goal-image {
+    animation: fadeIn 1.5s ease-out;
+}
+
+.goals-card {
+    background-color: rgba(255, 255, 255, 0.85);
+    padding: 2rem;
+    border-radius: 20px;
+    box-shadow: 0 8px 16px rgba(0,0,0,0.2);
+    max-width: 1000px;
+    margin: 2rem auto;
+}
+
+.goals-text {
+    color: black;
+    font-size: 18px;
+    line-height: 1.6;
+}
+
+.goal-image {
+    width: 100%;
+    border-radius: 15px;
+    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+    margin-bottom: 20px;
+    transition: transform 0.3s ease, box-shadow 0.3s ease;
+}
+
+.goal-image:hover {
+    transform: scale(1.03);
+    box-shadow: 0 8px 20px rgba(0,0,0,0.25);
+}
+
+.goal-image-caption {
+    text-align: center;
+    color: #003344;
+    font-weight: bold;
+    margin-top: 10px;
+    font-size: 18px;
+}
+
+h1, h2, h3 {
+    color: black;
+}
+"""
+
+TIPS_CSS = """
+/* Tips page clean style */
+.stApp {
+    background-color: #d6f9ff;
+}
+
+.custom-header, .custom-subheader {
+    color: #002244 !important;
+}
+
+/* Main labels (text inputs, selects, slider) */
+label, .stTextInput>label, .stSlider>label, .stSelectbox>label {
+    color: #002244 !important;
+    font-weight: bold !important;
+}
+
+.tip-box, .custom-info, .most-recent {
+    background-color: #e0f7fa;
+    color: #002244;
+    border-radius: 10px;
+    padding: 1rem;
+    font-weight: bold;
+}
+
+/* Button styling navy (the Generate Tip button is a form submit button) */
+.stButton>button, .stFormSubmitButton>button {
+    background-color: #0a4c86;
+    color: white;
+    font-weight: bold;
+    border-radius: 10px;
+    padding: 0.5rem 1.5rem;
+}
+.stButton>button:hover, .stFormSubmitButton>button:hover {
+    background-color: #083d6d;
+}
+
+/* Child age slider range numbers ("3" and "12") */
+div[data-baseweb="slider"] > div > div > div > div {
+    color: black !important;
+    font-weight: bold !important;
+}
+"""
+
+STORY_CSS = """
+/* NAV buttons (Home, About Us, Water Goals) and the story form's submit button */
+div.stButton > button, div.stFormSubmitButton > button {
+    background-color: #0a4c86; /* Navy blue background */
+    color: white !important;   /* White text */
+    font-weight: bold;
+    border-radius: 10px;
+    padding: 0.5rem 1.5rem;
+    font-size: 18px;
+    width: 100%;
+    height: 50px;
+    border: none;
+    transition: background-color 0.3s, transform 0.2s;
+}
+
+/* Force inner text (span) inside buttons to white */
+div.stButton > button > div, div.stButton > button span,
+div.stFormSubmitButton > button > div, div.stFormSubmitButton > button span {
+    color: white !important;
+    font-weight: bold;
+}
+
+/* Hover Effect */
+div.stButton > button:hover, div.stFormSubmitButton > button:hover {
+    background-color: #083d6d;
+    transform: scale(1.05);
+}
+
+/* Light Blue Page Background */
+.stApp {
+    background-color: #d6f4ff !important;
+}
+
+/* Floating Card Style */
+.story-card {
+    background-color: rgba(255, 255, 255, 0.85);
+    padding: 2rem;
+    border-radius: 20px;
+    box-shadow: 0 8px 16px rgba(0,0,0,0.2);
+    margin: 2rem auto;
+    max-width: 900px;
+}
+
+/* Navy Blue Expander */
+.stExpander > summary {
+    background-color: #0a4c86 !important;
+    color: white !important;
+    font-weight: bold !important;
+    border-radius: 10px;
+    padding: 10px;
+}
+
+/* Floating card text + page headings in dark navy */
+.story-card, .story-card p, .story-card strong, .story-card h2, .story-card h4 {
+    color: #002244 !important;
+}
+h1, h2, h3 {
+    color: #002244 !important;
+}
+
+/* Label texts like Hero's Name, Choose a Story, etc. */
+label, .stTextInput>label, .stSelectbox>label, .stSlider>label, .stRadio>label, .stExpander>summary {
+    color: #002244 !important;
+    font-weight: bold !important;
+}
+
+/* Radio button options */
+.stRadio>div>label {
+    color: #002244 !important;
+    font-weight: bold !important;
+}
+"""
+
+# Scope name -> CSS. Order matters: later scopes win ties, as the inline blocks did.
+SCOPES = {
+    "consent": CONSENT_CSS,
+    "app": APP_CSS,
+    "about": ABOUT_CSS,
+    "goals": GOALS_CSS,
+    "tips": TIPS_CSS,
+    "story": STORY_CSS,
+}
+
+# The bubble layer lives outside .stApp, so its rules are global; it shows on
+# app pages only. Only transform and opacity animate, so the compositor does
+# all the work and nothing is re-laid-out per frame.
+BUBBLE_CSS = """
+#wh-bubbles {
+    position: fixed;
+    inset: 0;
+    overflow: hidden;
+    pointer-events: none;
+    z-index: 0;
+    display: none;
+    contain: strict;
+}
+body:has(.wh-page-app) #wh-bubbles {
+    display: block;
+}
+#wh-bubbles .bubble {
+    position: absolute;
+    bottom: -100px;
+    left: var(--left);
+    width: var(--size);
+    height: var(--size);
+    border-radius: 50%;
+    background-color: rgba(255, 255, 255, 0.7);
+    opacity: 0;
+    will-change: transform, opacity;
+    animation: bubbleUp var(--duration) linear var(--delay) infinite;
+}
+
+/* Lighter blue shades for bubbles */
+#wh-bubbles .bubble.light {
+    background-color: #cceeff;
+}
+#wh-bubbles .bubble.medium {
+    background-color: #aaddff;
+}
+#wh-bubbles .bubble.dark {
+    background-color: #88ccff;
+}
+
+@keyframes bubbleUp {
+    0% {
+        transform: translate3d(0, 0, 0) scale(0.8);
+        opacity: 0.8;
+    }
+    50% {
+        opacity: 0.5;
+    }
+    100% {
+        transform: translate3d(0, calc(-100vh - 200px), 0) scale(1.2);
+        opacity: 0;
+    }
+}
+
+/* Still bubbles, resting at different heights */
+#wh-bubbles.still .bubble {
+    animation: none;
+    will-change: auto;
+    opacity: 0.5;
+    transform: translate3d(0, var(--rest), 0);
+}
+@media (prefers-reduced-motion: reduce) {
+    #wh-bubbles .bubble {
+        animation: none;
+        will-change: auto;
+        opacity: 0.5;
+        transform: translate3d(0, var(--rest), 0);
+    }
+}
+"""
+
+# Which scopes each page turns on
+PAGE_SCOPES = {
+    "consent": ["consent"],
+    "home": ["app", "home"],
+    "about": ["app", "about"],
+    "goals": ["app", "goals"],
+    "tips": ["app", "tips"],
+    "story": ["app", "story"],
+}
+
+BACKGROUND_IMAGE = "static/Background.jpg"
+
+
+# ---- COMPILER ----
+
+def minify(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def _scope_selector(selector, scope):
+    marker = f".stApp:has(.wh-page-{scope})"
+    selector = selector.strip()
+    if selector == ".stApp":
+        return marker
+    if selector.startswith(".stApp"):
+        return marker + selector[len(".stApp"):]
+    return f"{marker} {selector}"
+
+
+def scope_css(css, scope):
+    """Prefix every rule with the page's scope; @keyframes are left global."""
+    out = []
+    i = 0
+    while i < len(css):
+        brace = css.find("{", i)
+        if brace == -1:
+            break
+        head = css[i:brace].strip()
+        # Find the matching close brace (keyframes nest one level)
+        depth, j = 0, brace
+        while j < len(css):
+            if css[j] == "{":
+                depth += 1
+            elif css[j] == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        body = css[brace:j + 1]
+        if head.startswith("@"):
+            out.append(head + body)
+        else:
+            selectors = ",".join(_scope_selector(s, scope) for s in head.split(","))
+            out.append(selectors + body)
+        i = j + 1
+    return "".join(out)
+
+
+@TELEMETRY.timed("stylesheet_compile")
+def compile_stylesheet():
+    """(css, version) for the whole app."""
+    background = minify(f".stApp {{ {background_css(BACKGROUND_IMAGE)} }}")
+    parts = [scope_css(background, "app")]
+    for scope, css in SCOPES.items():
+        parts.append(scope_css(minify(css), scope))
+    parts.append(minify(BUBBLE_CSS))
+    css = "".join(parts)
+    version = hashlib.sha256(css.encode()).hexdigest()[:10]
+    return css, version
+
+
+@st.cache_resource
+def get_stylesheet():
+    return compile_stylesheet()
+
+
+# ---- BUBBLE LAYER ----
+
+BUBBLE_COUNT = 8
+MAX_BUBBLES = 24
+# Seconds for one bubble to rise; None keeps them still
+MOTIONS = {"float": 20, "calm": 40, "off": None}
+SHADES = ("light", "medium", "dark")
+
+
+def bubble_config():
+    """(count, motion) for this session, from ?bubbles= and ?motion= if given.
+
+    Kept in session state: st.switch_page() drops the query string, and the
+    setting (motion=off especially) has to survive page switches.
+    """
+    count, motion = st.session_state.get("bubble_config", (BUBBLE_COUNT, "float"))
+    if "bubbles" in st.query_params:
+        try:
+            count = int(st.query_params["bubbles"])
+        except ValueError:
+            count = BUBBLE_COUNT
+    if "motion" in st.query_params:
+        motion = st.query_params["motion"]
+    if motion not in MOTIONS:
+        motion = "float"
+    config = st.session_state.bubble_config = (max(0, min(count, MAX_BUBBLES)), motion)
+    return config
+
+
+def bubble_markup(count, motion):
+    """Inner HTML of the bubble layer. Seeded, so the same config always draws the same bubbles."""
+    rng = random.Random(count)
+    duration = MOTIONS[motion] or MOTIONS["float"]
+    bubbles = []
+    for i in range(count):
+        rise = duration * rng.uniform(0.75, 1.25)
+        style = (
+            f"--left:{(i + rng.random()) * 100 / max(count, 1):.1f}%;"
+            f"--size:{rng.randint(18, 40)}px;"
+            f"--duration:{rise:.1f}s;"
+            # A negative delay starts each bubble part-way up, so the layer is never empty
+            f"--delay:{-rng.uniform(0, rise):.1f}s;"
+            f"--rest:{-rng.uniform(10, 90):.0f}vh"
+        )
+        bubbles.append(f"<span class='bubble {SHADES[i % len(SHADES)]}' style='{style}'></span>")
+    return "".join(bubbles)
+
+
+# ---- INJECTION ----
+
+_INJECT_JS = """
+<script>
+(function () {
+  const doc = window.parent.document;
+  const id = "wh-styles-%(version)s";
+  if (!doc.getElementById(id)) {
+    doc.querySelectorAll("style[id^='wh-styles-']").forEach(function (old) { old.remove(); });
+    const style = doc.createElement("style");
+    style.id = id;
+    style.textContent = %(css)s;
+    doc.head.appendChild(style);
+  }
+  let layer = doc.getElementById("wh-bubbles");
+  if (!layer) {
+    layer = doc.createElement("div");
+    layer.id = "wh-bubbles";
+    layer.setAttribute("aria-hidden", "true");
+    doc.body.appendChild(layer);
+  }
+  if (layer.dataset.version !== "%(bubbles)s") {
+    layer.className = %(still)s ? "still" : "";
+    layer.innerHTML = %(markup)s;
+    layer.dataset.version = "%(bubbles)s";
+  }
+})();
+</script>
+"""
+
+
+def _js_string(text):
+    # json.dumps leaves "</" alone, which would close the <script> tag early
+    return json.dumps(text).replace("</", "<\\/")
+
+
+def apply_styles(page):
+    """Inject the stylesheet and bubble layer once per session, then mark which page is showing."""
+    css, version = get_stylesheet()
+    count, motion = bubble_config()
+    bubbles = f"{count}-{motion}"
+    if (st.session_state.get("styles_version"), st.session_state.get("bubbles_version")) != (version, bubbles):
+        # The script runs in a same-origin st.iframe and adds the sheet to
+        # the app's <head> and the bubbles to its <body>, where they stay for the
+        # rest of the session; later reruns don't send or re-mount either
+        st.iframe(_INJECT_JS % {
+            "version": version,
+            "css": _js_string(css),
+            "bubbles": bubbles,
+            "still": "true" if MOTIONS[motion] is None else "false",
+            "markup": _js_string(bubble_markup(count, motion)),
+        }, height="content")  # a script and no markup: measures 0px tall
+        st.session_state.styles_version = version
+        st.session_state.bubbles_version = bubbles
+    scopes = " ".join(f"wh-page-{scope}" for scope in PAGE_SCOPES.get(page, ["app"]))
+    st.markdown(f"<div class='wh-page {scopes}'></div>", unsafe_allow_html=True)
+
+
+# ---- PAYLOAD REPORT ----
+
+def payload_bytes(node):
+    """Bytes of element protos the app sent in its last run (walks the AppTest tree)."""
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if hasattr(proto, "ByteSize") else 0
+    children = getattr(node, "children", None) or {}
+    return size + sum(payload_bytes(child) for child in children.values())
+
+
+def payload_report(script="WaterHabitsApp.py", pages=("home", "about", "goals", "tips", "story")):
+    """{page: (first_run_bytes, rerun_bytes)} measured headlessly with AppTest."""
+    import os
+    from streamlit.testing.v1 import AppTest
+
+    report = {}
+    at = AppTest.from_file(os.path.abspath(script), default_timeout=60)
+    at.secrets["OPENAI_API_KEY"] = "sk-report"
+    at.run()
+    report["consent"] = (payload_bytes(at.main), None)
+    at.run()
+    report["consent"] = (report["consent"][0], payload_bytes(at.main))
+    for page in pages:
+        fresh = AppTest.from_file(os.path.abspath(script), default_timeout=60)
+        fresh.secrets["OPENAI_API_KEY"] = "sk-report"
+        fresh.session_state.agreed_to_terms = True
+        page_file = os.path.join(os.path.dirname(os.path.abspath(script)), "app_pages", f"{page}.py")
+        if os.path.exists(page_file):
+            fresh.switch_page(page_file)
+        else:
+            # Older single-script layout routed on session state
+            fresh.session_state.page = page
+        fresh.run()
+        first = payload_bytes(fresh.main)
+        fresh.run()
+        report[page] = (first, payload_bytes(fresh.main))
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-page payload sizes (first run of a session vs. a rerun).")
+    parser.add_argument("--script", default="WaterHabitsApp.py")
+    args = parser.parse_args()
+
+    css, version = compile_stylesheet()
+    print(f"stylesheet {version}: {len(css.encode())} bytes minified")
+    print(f"{'page':10} {'first run':>10} {'rerun':>10}")
+    for page, (first, rerun) in payload_report(args.script).items():
+        print(f"{page:10} {first:>10} {rerun if rerun is not None else '-':>10}")
@@ -0,0 +1,288 @@
+# ---- TELEMETRY ----
+# In-process timing and token counters, aggregated into fixed-bucket
+# histograms (constant memory, mergeable, Prometheus-native).
+#
+#   with TELEMETRY.span("corpus_load"):         # time a block
+#   TELEMETRY.observe("rerun", 0.12, page="tips")
+#   TELEMETRY.count_tokens("gpt-4o-mini", "story", prompt=210, completion=640)
+#   TELEMETRY.watch_breakers(breakers)           # export circuit-breaker state too
+#
+# Every label set gets its own histogram; p50/p95/p99 are interpolated from
+# the buckets the same way Prometheus' histogram_quantile() does. The metrics
+# are written in Prometheus text format to METRICS_FILE (for node_exporter's
+# textfile collector), served at /metrics by serve.py and shown on the
+# hidden admin page (/admin?token=...).
+
+import functools
+import hmac
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from water_habits.client_proxy import ClientProxy
+
+# Upper bounds (seconds); wide enough for a 2 ms cache hit and a 2 min image call
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+METRICS_FILE = ".cache/metrics.prom"
+EXPORT_INTERVAL = 15.0  # seconds between metrics file writes
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.bounds = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(self.bounds) and seconds > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q):
+        """Linear interpolation inside the bucket that holds the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                low = self.bounds[i - 1] if i else 0.0
+                if i == len(self.bounds):
+                    return low  # +Inf bucket: the best we can say is "above the top bound"
+                return low + (self.bounds[i] - low) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+class Telemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}   # (name, labels) -> Histogram
+        self._tokens = {}  # (model, kind, type) -> count
+        self._breakers = {}  # name -> CircuitBreaker, read at export time
+        self._exporter = None
+
+    # ---- RECORDING ----
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None)))
+        with self._lock:
+            histogram = self._spans.get(key)
+            if histogram is None:
+                histogram = self._spans[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the with-block. If it raises, the exception's class name is the `outcome` label."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            labels["outcome"] = type(e).__name__
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator form of span()."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count_tokens(self, model, kind, prompt=0, completion=0):
+        with self._lock:
+            for token_type, n in (("prompt", prompt), ("completion", completion)):
+                if n:
+                    key = (model, kind, token_type)
+                    self._tokens[key] = self._tokens.get(key, 0) + n
+
+    def record_usage(self, model, kind, usage):
+        """Add a response's `usage` (if it has one) to the token counters."""
+        if usage is not None:
+            self.count_tokens(
+                model, kind,
+                prompt=getattr(usage, "prompt_tokens", 0) or 0,
+                completion=getattr(usage, "completion_tokens", 0) or 0,
+            )
+
+    def watch_breakers(self, breakers):
+        """Include these circuit breakers' state and counters in the Prometheus output."""
+        with self._lock:
+            for breaker in breakers:
+                self._breakers[breaker.name] = breaker
+
+    # ---- READING ----
+    def summary(self):
+        """One row per span/label set: count, mean and p50/p95/p99 in seconds."""
+        with self._lock:
+            items = [(name, labels, h.count, h.sum, [h.quantile(q) for q in (0.5, 0.95, 0.99)])
+                     for (name, labels), h in self._spans.items()]
+        rows = []
+        for name, labels, count, total, (p50, p95, p99) in sorted(items):
+            rows.append({
+                "span": name, **dict(labels), "count": count, "mean": total / count,
+                "p50": p50, "p95": p95, "p99": p99,
+            })
+        return rows
+
+    def tokens(self):
+        with self._lock:
+            return [
+                {"model": model, "kind": kind, "type": token_type, "tokens": n}
+                for (model, kind, token_type), n in sorted(self._tokens.items())
+            ]
+
+    def prometheus_text(self):
+        def fmt(labels):
+            return ",".join(f'{k}="{v}"' for k, v in labels)
+
+        lines = [
+            "# HELP wh_span_seconds Time spent in instrumented spans.",
+            "# TYPE wh_span_seconds histogram",
+        ]
+        with self._lock:
+            spans = [(name, labels, list(h.counts), h.count, h.sum, h.bounds)
+                     for (name, labels), h in sorted(self._spans.items())]
+            tokens = sorted(self._tokens.items())
+            breakers = sorted(self._breakers.items())
+        for name, labels, counts, count, total, bounds in spans:
+            base = (("span", name),) + labels
+            cumulative = 0
+            for bound, n in zip(list(bounds) + ["+Inf"], counts):
+                cumulative += n
+                lines.append(f"wh_span_seconds_bucket{{{fmt(base + (('le', bound),))}}} {cumulative}")
+            lines.append(f"wh_span_seconds_sum{{{fmt(base)}}} {total:.6f}")
+            lines.append(f"wh_span_seconds_count{{{fmt(base)}}} {count}")
+        lines += [
+            "# HELP wh_openai_tokens_total Tokens reported in OpenAI response usage.",
+            "# TYPE wh_openai_tokens_total counter",
+        ]
+        for (model, kind, token_type), n in tokens:
+            labels = (("model", model), ("kind", kind), ("type", token_type))
+            lines.append(f"wh_openai_tokens_total{{{fmt(labels)}}} {n}")
+
+        stats = [(name, breaker.stats()) for name, breaker in breakers]  # each takes its own lock
+        lines += [
+            "# HELP wh_breaker_state Circuit breaker state (1 for the current state).",
+            "# TYPE wh_breaker_state gauge",
+        ]
+        for name, s in stats:
+            for state in ("closed", "open", "half_open"):
+                lines.append(f'wh_breaker_state{{breaker="{name}",state="{state}"}} {int(s["state"] == state)}')
+        for metric, key, text in (
+            ("wh_breaker_opened_total", "opened", "Times the circuit has opened."),
+            ("wh_breaker_rejected_total", "rejected", "Calls refused while the circuit was open."),
+        ):
+            lines += [f"# HELP {metric} {text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{breaker="{name}"}} {s[key]}' for name, s in stats]
+        return "\n".join(lines) + "\n"
+
+    # ---- EXPORT ----
+    def write_metrics(self, path=METRICS_FILE):
+        """Write the Prometheus text atomically, so a scraper never reads half a file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def start_export(self, path=METRICS_FILE, interval=EXPORT_INTERVAL):
+        """Rewrite the metrics file every `interval` seconds from a daemon thread (once per process)."""
+        with self._lock:
+            if self._exporter is not None:
+                return
+            self._exporter = threading.Thread(
+                target=self._export_loop, args=(path, interval), name="metrics-export", daemon=True
+            )
+        self._exporter.start()
+
+    def _export_loop(self, path, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.write_metrics(path)
+            except OSError:
+                pass  # a full or read-only disk shouldn't take the app down
+
+
+TELEMETRY = Telemetry()
+
+
+# ---- ACCESS ----
+# The admin page and the /metrics route share one token.
+
+def admin_token():
+    """ADMIN_TOKEN from .streamlit/secrets.toml, else the environment; None if neither sets it."""
+    import streamlit as st
+
+    try:
+        token = st.secrets.get("ADMIN_TOKEN")
+    except FileNotFoundError:  # no secrets.toml at all (StreamlitSecretNotFoundError)
+        token = None
+    return str(token) if token else os.environ.get("ADMIN_TOKEN") or None
+
+
+def token_matches(given):
+    expected = admin_token()
+    # Compared as bytes: compare_digest raises on non-ASCII str
+    return bool(expected) and hmac.compare_digest((given or "").encode(), expected.encode())
+
+
+# ---- CLIENT VIEW ----
+# Sits right above the raw client, so each span is one real HTTP attempt
+# (retries and hedges show up as separate observations).
+
+def _timed_stream(stream, model, kind, page, started):
+    """Pass chunks through; record the full stream time and the usage chunk at the end."""
+    outcome = None
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None)
+            if usage is not None:
+                TELEMETRY.record_usage(model, kind, usage)
+            yield chunk
+    except Exception as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        TELEMETRY.observe(
+            "openai_chat_stream", time.perf_counter() - started,
+            model=model, kind=kind, page=page, outcome=outcome,
+        )
+
+
+class InstrumentedClient(ClientProxy):
+    """`client` with every chat/image call timed and its token usage counted."""
+
+    def __init__(self, client, kind, page=None):
+        super().__init__(client)
+        self.kind = kind
+        self.page = page
+
+    def _call(self, endpoint, fn, **request):
+        model = request.get("model")
+        if endpoint == "images":
+            with TELEMETRY.span("openai_images", model=model, kind=self.kind, page=self.page):
+                return fn(**request)
+        if request.get("stream"):
+            # Ask for the usage chunk at the end of the stream (it has no choices,
+            # so iter_stream_text skips it)
+            request.setdefault("stream_options", {"include_usage": True})
+        started = time.perf_counter()
+        # For a stream this is the time to the response headers; _timed_stream adds the rest
+        with TELEMETRY.span("openai_chat", model=model, kind=self.kind, page=self.page):
+            response = fn(**request)
+        if request.get("stream"):
+            return _timed_stream(response, model, self.kind, self.page, started)
+        TELEMETRY.record_usage(model, self.kind, getattr(response, "usage", None))
+        return response
@@ -0,0 +1,154 @@
+# ---- CIRCUIT BREAKER TESTS ----
+#   python -m pytest water_habits/test_circuit_breaker.py
+#
+# State transitions (closed -> open -> half-open -> closed/open) on a fake
+# clock, so cool-downs, windows and slow calls take no real time.
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from water_habits import circuit_breaker
+from water_habits.circuit_breaker import CLOSED, HALF_OPEN, OPEN, BreakerClient, CircuitBreaker, CircuitOpen
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("chat", failure_rate=0.5, slow_call=8.0, window=60.0, min_calls=4, open_for=30.0)
+
+
+def _ok():
+    return "ok"
+
+
+def _down():
+    raise httpx.ConnectError("down")
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        with pytest.raises(httpx.ConnectError):
+            breaker.call(_down)
+
+
+def test_stays_closed_below_min_calls(breaker):
+    _fail(breaker, 3)
+    assert breaker.state == CLOSED
+
+
+def test_opens_at_the_failure_rate(breaker):
+    breaker.call(_ok)
+    breaker.call(_ok)
+    _fail(breaker, 1)
+    assert breaker.state == CLOSED  # 1 of 3, and too few calls
+    _fail(breaker, 1)
+    assert breaker.state == OPEN  # 2 of 4
+    assert breaker.stats()["opened"] == 1
+
+
+def test_open_circuit_rejects_without_calling(breaker):
+    _fail(breaker, 4)
+    calls = []
+    with pytest.raises(CircuitOpen):
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_slow_calls_count_as_failures(breaker, clock):
+    def slow():
+        clock.now += 9.0
+        return "late"
+
+    for _ in range(4):
+        assert breaker.call(slow) == "late"  # the caller still gets its answer
+    assert breaker.state == OPEN
+
+
+def test_bad_requests_do_not_count(breaker):
+    def bad_request():
+        raise ValueError("invalid prompt")
+
+    for _ in range(6):
+        with pytest.raises(ValueError):
+            breaker.call(bad_request)
+    assert breaker.state == CLOSED
+
+
+def test_old_failures_leave_the_window(breaker, clock):
+    _fail(breaker, 3)
+    clock.now += 61.0
+    breaker.call(_ok)
+    assert breaker.stats()["recent_calls"] == 1
+    assert breaker.state == CLOSED
+
+
+def test_half_open_after_the_cool_down(breaker, clock):
+    _fail(breaker, 4)
+    clock.now += 29.0
+    assert breaker.state == OPEN
+    clock.now += 1.0
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_lets_one_probe_through(breaker, clock):
+    _fail(breaker, 4)
+    clock.now += 30.0
+    assert breaker.allow()
+    assert not breaker.allow()  # the probe is still out
+
+
+def test_successful_probe_closes(breaker, clock):
+    _fail(breaker, 4)
+    clock.now += 30.0
+    assert breaker.call(_ok) == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.stats()["recent_failures"] == 0
+
+
+def test_failed_probe_opens_again(breaker, clock):
+    _fail(breaker, 4)
+    clock.now += 30.0
+    _fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert breaker.stats()["opened"] == 2
+    clock.now += 29.0
+    assert breaker.state == OPEN  # a fresh cool-down
+
+
+def test_straggler_from_before_opening_is_ignored(breaker):
+    _fail(breaker, 4)
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN
+
+
+def test_client_view_keeps_chat_and_images_apart(clock):
+    chat = CircuitBreaker("chat", min_calls=1)
+    images = CircuitBreaker("images", min_calls=1)
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **request: _down())),
+        images=SimpleNamespace(generate=lambda **request: "picture"),
+    )
+    view = BreakerClient(client, chat, images)
+    with pytest.raises(httpx.ConnectError):
+        view.chat.completions.create(model="m")
+    with pytest.raises(CircuitOpen):
+        view.chat.completions.create(model="m")
+    assert view.images.generate(model="m") == "picture"
+    assert (chat.state, images.state) == (OPEN, CLOSED)
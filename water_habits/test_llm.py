@@ -0,0 +1,69 @@
+# ---- LLM HELPER TESTS ----
+#   python -m pytest water_habits/test_llm.py
+#
+# parse_story_bundle()'s validation and panel bounds, and partial_json_string()
+# on a story that is still streaming in.
+
+import json
+
+import pytest
+
+from water_habits.llm import MAX_PANELS, MIN_PANELS, parse_story_bundle, partial_json_string
+
+
+def _bundle(panels, story="Andy saves water.", tip="Turn off the tap!"):
+    return json.dumps({"story": story, "panels": panels, "tip": tip})
+
+
+def _panels(n):
+    return [f"Panel {i + 1}." for i in range(n)]
+
+
+@pytest.mark.parametrize("n", range(MIN_PANELS, MAX_PANELS + 1))
+def test_panel_counts_in_range_are_kept(n):
+    assert parse_story_bundle(_bundle(_panels(n)))["panels"] == _panels(n)
+
+
+def test_too_few_panels_is_refused():
+    with pytest.raises(ValueError, match=f"expected at least {MIN_PANELS}"):
+        parse_story_bundle(_bundle(_panels(MIN_PANELS - 1)))
+
+
+def test_extra_panels_are_dropped():
+    assert parse_story_bundle(_bundle(_panels(MAX_PANELS + 3)))["panels"] == _panels(MAX_PANELS)
+
+
+def test_blank_panels_do_not_count():
+    panels = _panels(MIN_PANELS - 1) + ["", "   "]
+    with pytest.raises(ValueError):
+        parse_story_bundle(_bundle(panels))
+    padded = [" " + p + " " for p in _panels(MIN_PANELS)] + [" "]
+    assert parse_story_bundle(_bundle(padded))["panels"] == _panels(MIN_PANELS)
+
+
+def test_fields_are_stripped():
+    bundle = parse_story_bundle(_bundle(_panels(MIN_PANELS), story="  Once.  ", tip=" Tap off. "))
+    assert (bundle["story"], bundle["tip"]) == ("Once.", "Tap off.")
+
+
+@pytest.mark.parametrize("text", [
+    "not json",
+    "[1, 2]",
+    _bundle(_panels(MIN_PANELS), story="  "),
+    _bundle(_panels(MIN_PANELS), tip=None),
+    _bundle("one long panel"),
+    _bundle([1, 2, 3, 4]),
+])
+def test_malformed_responses_raise_value_error(text):
+    with pytest.raises(ValueError):
+        parse_story_bundle(text)
+
+
+def test_partial_story_while_streaming():
+    full = json.dumps({"story": 'Andy said "hi" — then 💧', "panels": []})
+    assert partial_json_string(full, "story") == 'Andy said "hi" — then 💧'
+    assert partial_json_string(full[:len('{"story":')], "story") == ""
+    assert partial_json_string(full[:full.index("hi")], "story") == 'Andy said "'
+    split_escape = full.index("\\u2014") + 3  # json.dumps writes the dash as \u2014
+    assert partial_json_string(full[:split_escape], "story") == 'Andy said "hi" '
+    assert partial_json_string(full, "tip") == ""
@@ -0,0 +1,126 @@
+# ---- LLM CACHE TESTS ----
+#   python -m pytest water_habits/test_llm_cache.py
+#
+# Variants, TTL expiry and LRU eviction by entry count and by size, on a fake
+# clock so "least recently used" and "stale" don't depend on real time.
+
+from types import SimpleNamespace
+
+import pytest
+
+from water_habits import llm_cache
+from water_habits.llm_cache import LLMCache, cache_key, cached_completion
+
+TTL = 100.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def _cache(tmp_path, **limits):
+    limits = {"ttl": TTL, "max_variants": 1, **limits}
+    return LLMCache(str(tmp_path / "llm_cache.sqlite3"), **limits)
+
+
+def _put(cache, clock, key, value):
+    clock.now += 1  # every write is strictly newer than the last
+    cache.put(key, value)
+
+
+def test_key_ignores_transport_params():
+    messages = [{"role": "user", "content": "hi"}]
+    assert cache_key("m", messages, stream=True, timeout=5) == cache_key("m", messages)
+    assert cache_key("m", messages, temperature=0.9) != cache_key("m", messages)
+
+
+def test_misses_until_every_variant_is_stored(tmp_path, clock):
+    cache = _cache(tmp_path, max_variants=3)
+    for answer in ["a", "b", "c"]:
+        assert cache.get("k") is None
+        _put(cache, clock, "k", answer)
+    assert cache.get("k") in {"a", "b", "c"}
+    assert cache.stats() == {"chat": {"miss": 3, "hit": 1}}
+
+
+def test_empty_answers_are_not_stored(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.put("k", "")
+    assert cache.get("k") is None
+
+
+def test_stale_answers_are_not_served(tmp_path, clock):
+    cache = _cache(tmp_path)
+    _put(cache, clock, "k", "old")
+    clock.now += TTL - 2
+    assert cache.get("k") == "old"
+    clock.now += 2
+    assert cache.get("k") is None
+
+
+def test_stale_answers_are_deleted_on_the_next_put(tmp_path, clock):
+    cache = _cache(tmp_path)
+    _put(cache, clock, "old", "x")
+    clock.now += TTL
+    _put(cache, clock, "new", "y")
+    keys = [row[0] for row in cache._conn().execute("SELECT key FROM entries")]
+    assert keys == ["new"]
+
+
+def test_entry_limit_drops_the_least_recently_used(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=3)
+    for key in ["a", "b", "c"]:
+        _put(cache, clock, key, key)
+    clock.now += 1
+    assert cache.get("a") == "a"  # a is now the most recently used
+    _put(cache, clock, "d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ["a", "c", "d"]] == ["a", "c", "d"]
+    assert cache.stats()["all"] == {"evicted": 1}
+
+
+def test_byte_limit_drops_until_it_fits(tmp_path, clock):
+    cache = _cache(tmp_path, max_bytes=25)
+    for key in ["a", "b", "c"]:
+        _put(cache, clock, key, key * 10)
+    # 30 bytes stored: a goes; b and c (20 bytes) fit
+    assert cache.get("a") is None
+    assert cache.get("b") == "b" * 10 and cache.get("c") == "c" * 10
+
+    _put(cache, clock, "big", "z" * 25)  # needs all 20 bytes freed
+    assert [cache.get(key) for key in ["b", "c", "big"]] == [None, None, "z" * 25]
+
+
+def test_size_counts_bytes_not_characters(tmp_path, clock):
+    cache = _cache(tmp_path, max_bytes=10)
+    _put(cache, clock, "a", "💧💧")  # 8 bytes
+    _put(cache, clock, "b", "💧")    # 4 more: over
+    assert cache.get("a") is None and cache.get("b") == "💧"
+
+
+def test_cached_completion_stops_calling_once_full(tmp_path, clock):
+    cache = _cache(tmp_path, max_variants=2)
+    calls = []
+
+    def create(**request):
+        calls.append(request)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f" tip {len(calls)} "))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    request = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+    answers = [cached_completion(cache, client, "tip", **request) for _ in range(5)]
+    assert len(calls) == 2
+    assert answers[:2] == ["tip 1", "tip 2"]
+    assert set(answers[2:]) <= {"tip 1", "tip 2"}
@@ -0,0 +1,113 @@
+# ---- PROGRESS TESTS ----
+#   python -m pytest water_habits/test_progress.py
+#
+# Streak and goal rollups, folded one event at a time (_fold) and through the
+# store, with and without a flush in between.
+
+import pytest
+
+from water_habits.progress import DAILY_GOAL, ProgressStore, _NEW_DAY, _NEW_DEVICE, _fold
+
+TOKEN = "abcdefghijklmnopqrstuv"
+
+
+def _folded(*events):
+    """Fold (day, kind) events into a fresh device; returns (device, {day: counts})."""
+    device, days = dict(_NEW_DEVICE), {}
+    for day, kind in events:
+        _fold(device, days.setdefault(day, dict(_NEW_DAY)), day, kind)
+    return device, days
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long flush interval: only explicit flush() calls write
+    return ProgressStore(str(tmp_path / "progress.sqlite3"), flush_interval=3600)
+
+
+def test_consecutive_days_grow_the_streak():
+    device, _ = _folded(("2026-03-01", "tip"), ("2026-03-02", "story"), ("2026-03-03", "tip"))
+    assert (device["streak"], device["best_streak"], device["last_day"]) == (3, 3, "2026-03-03")
+
+
+def test_missed_day_restarts_the_streak_but_keeps_the_best():
+    device, _ = _folded(("2026-03-01", "tip"), ("2026-03-02", "tip"), ("2026-03-04", "tip"))
+    assert (device["streak"], device["best_streak"]) == (1, 2)
+
+
+def test_streak_crosses_month_ends():
+    device, _ = _folded(("2026-02-28", "tip"), ("2026-03-01", "tip"))
+    assert device["streak"] == 2
+
+
+def test_out_of_order_day_counts_but_leaves_the_streak():
+    device, days = _folded(("2026-03-02", "tip"), ("2026-03-03", "tip"), ("2026-03-01", "story"))
+    assert (device["streak"], device["last_day"]) == (2, "2026-03-03")
+    assert (device["tips"], device["stories"]) == (2, 1)
+    assert days["2026-03-01"] == {"tips": 0, "stories": 1}
+
+
+def test_goal_day_counts_once_per_day():
+    device, days = _folded(*[("2026-03-01", "tip")] * (DAILY_GOAL + 2))
+    assert device["goal_days"] == 1
+    assert days["2026-03-01"]["tips"] == DAILY_GOAL + 2
+
+    device, _ = _folded(*[("2026-03-01", "tip")] * (DAILY_GOAL - 1))
+    assert device["goal_days"] == 0
+
+
+def test_unknown_kind_is_refused(store):
+    with pytest.raises(ValueError):
+        store.record(TOKEN, "video", "2026-03-01")
+
+
+def test_summary_includes_pending_events(store):
+    events = [("2026-03-01", "tip"), ("2026-03-02", "story")] + [("2026-03-02", "tip")] * (DAILY_GOAL - 1)
+    for day, kind in events:
+        store.record(TOKEN, kind, day)
+    pending = store.summary(TOKEN, "2026-03-02")
+    assert store.stats()["pending"] == len(events)
+    assert pending == {
+        "today_tips": DAILY_GOAL - 1, "today_stories": 1, "goal_met_today": True,
+        "streak": 2, "best_streak": 2, "goal_days": 1, "tips": DAILY_GOAL, "stories": 1,
+    }
+
+    # Flushing moves the events into the rollups without counting them twice
+    assert store.flush() == len(events)
+    assert store.stats() == {"devices": 1, "events": len(events), "pending": 0}
+    assert store.summary(TOKEN, "2026-03-02") == pending
+
+
+def test_summary_mixes_flushed_and_pending(store):
+    store.record(TOKEN, "tip", "2026-03-01")
+    store.flush()
+    store.record(TOKEN, "tip", "2026-03-02")
+    summary = store.summary(TOKEN, "2026-03-02")
+    assert (summary["streak"], summary["today_tips"], summary["tips"]) == (2, 1, 2)
+
+
+def test_summary_drops_a_lapsed_streak(store):
+    store.record(TOKEN, "tip", "2026-03-01")
+    store.record(TOKEN, "tip", "2026-03-02")
+    store.flush()
+    assert store.summary(TOKEN, "2026-03-03")["streak"] == 2  # yesterday still counts
+    lapsed = store.summary(TOKEN, "2026-03-04")
+    assert (lapsed["streak"], lapsed["best_streak"], lapsed["today_tips"]) == (0, 2, 0)
+
+
+def test_devices_are_kept_apart(store):
+    other = "vutsrqponmlkjihgfedcba"
+    store.record(TOKEN, "tip", "2026-03-01")
+    store.record(other, "story", "2026-03-01")
+    store.flush()
+    assert store.summary(TOKEN, "2026-03-01")["tips"] == 1
+    assert store.summary(other, "2026-03-01")["tips"] == 0
+
+
+def test_forget_removes_stored_and_pending_events(store):
+    store.record(TOKEN, "tip", "2026-03-01")
+    store.flush()
+    store.record(TOKEN, "tip", "2026-03-02")
+    store.forget(TOKEN)
+    assert store.stats() == {"devices": 0, "events": 0, "pending": 0}
+    assert store.summary(TOKEN, "2026-03-02")["tips"] == 0
@@ -0,0 +1,207 @@
+# ---- RETRY TESTS ----
+#   python -m pytest water_habits/test_retry.py
+#
+# Retries, deadlines and hedging against plain functions and a fake client.
+# Backoff sleeps go through a recorder instead of time.sleep.
+
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from water_habits import retry
+from water_habits.retry import (
+    HEDGE_MIN_SAMPLES, DeadlineExceeded, LatencyTracker, ResilientClient, RetryPolicy,
+    call_with_retries, clip_timeout, hedged,
+)
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+class Throttled(httpx.NetworkError):
+    """A retryable error carrying a Retry-After header."""
+
+    def __init__(self, seconds):
+        super().__init__("429")
+        self.response = SimpleNamespace(headers={"retry-after": str(seconds)})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(retry.time, "sleep", slept.append)
+    return slept
+
+
+def _failing(*errors, result="ok"):
+    """fn(remaining) that raises each of `errors` in turn, then returns `result`; counts its calls."""
+    calls = []
+
+    def fn(remaining):
+        calls.append(remaining)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return fn, calls
+
+
+def _tracker(seconds):
+    tracker = LatencyTracker()
+    for _ in range(HEDGE_MIN_SAMPLES):
+        tracker.record(seconds)
+    return tracker
+
+
+# ---- call_with_retries ----
+
+def test_retryable_errors_are_retried(sleeps):
+    fn, calls = _failing(httpx.ConnectTimeout("slow"), httpx.ReadError("reset"))
+    assert call_with_retries(NO_WAIT, fn) == "ok"
+    assert len(calls) == 3 and len(sleeps) == 2
+
+
+def test_other_errors_are_not_retried(sleeps):
+    fn, calls = _failing(ValueError("bad request"))
+    with pytest.raises(ValueError):
+        call_with_retries(NO_WAIT, fn)
+    assert len(calls) == 1 and sleeps == []
+
+
+def test_gives_up_after_max_attempts(sleeps):
+    fn, calls = _failing(*[httpx.ConnectTimeout("slow")] * 5)
+    with pytest.raises(httpx.ConnectTimeout):
+        call_with_retries(NO_WAIT, fn)
+    assert len(calls) == NO_WAIT.max_attempts
+
+
+def test_retry_after_header_sets_the_delay(sleeps):
+    fn, _ = _failing(Throttled(0.3))
+    call_with_retries(NO_WAIT, fn)
+    assert sleeps == [0.3]
+
+
+def test_expired_deadline_makes_no_call(sleeps):
+    fn, calls = _failing()
+    with pytest.raises(DeadlineExceeded):
+        call_with_retries(NO_WAIT, fn, deadline=time.monotonic() - 1)
+    assert calls == []
+
+
+def test_no_retry_when_the_backoff_would_pass_the_deadline(sleeps):
+    fn, calls = _failing(Throttled(10))
+    with pytest.raises(Throttled):
+        call_with_retries(NO_WAIT, fn, deadline=time.monotonic() + 5)
+    assert len(calls) == 1 and sleeps == []
+
+
+def test_each_attempt_gets_the_time_left(sleeps):
+    fn, calls = _failing(httpx.ConnectTimeout("slow"))
+    call_with_retries(NO_WAIT, fn, deadline=time.monotonic() + 5)
+    assert all(0 < remaining <= 5 for remaining in calls)
+    assert calls[1] <= calls[0]
+
+
+def test_backoff_stays_under_the_cap():
+    policy = RetryPolicy(base_delay=0.5, max_delay=2.0)
+    assert all(0 <= policy.backoff(attempt) <= 2.0 for attempt in range(10) for _ in range(20))
+
+
+# ---- clip_timeout ----
+
+def test_clip_timeout():
+    assert clip_timeout(30, None) == 30
+    assert clip_timeout(30, 5) == 5
+    assert clip_timeout(3, 5) == 3
+    assert clip_timeout(None, 5) == httpx.Timeout(5)
+    clipped = clip_timeout(httpx.Timeout(60, connect=2), 5)
+    assert (clipped.read, clipped.connect) == (5, 2)
+
+
+# ---- hedging ----
+
+def test_slow_call_is_hedged_and_the_first_answer_wins():
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)  # the first copy hangs
+            return "slow"
+        return "fast"
+
+    tracker = _tracker(0.05)
+    try:
+        assert hedged(fn, tracker) == "fast"
+    finally:
+        release.set()
+    assert len(calls) == 2
+
+
+def test_fast_call_is_not_hedged():
+    calls = []
+    tracker = _tracker(5.0)
+    assert hedged(lambda: calls.append(1) or "ok", tracker) == "ok"
+    assert len(calls) == 1
+
+
+def test_hedge_gives_up_at_the_deadline():
+    release = threading.Event()
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            hedged(lambda: release.wait(5), _tracker(5.0), remaining=0.1)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+
+
+def test_hedge_raises_when_every_copy_fails():
+    def fn():
+        raise httpx.ConnectError("down")
+
+    with pytest.raises(httpx.ConnectError):
+        hedged(fn, _tracker(5.0))
+
+
+def test_percentile_needs_enough_samples():
+    tracker = LatencyTracker()
+    for i in range(HEDGE_MIN_SAMPLES - 1):
+        tracker.record(i)
+    assert tracker.percentile(0.95, default="default") == "default"
+    tracker.record(100)
+    assert tracker.percentile(0.95) == 100
+
+
+# ---- client view ----
+
+class _FakeClient:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._answer))
+        self.images = SimpleNamespace(generate=self._answer)
+
+    def _answer(self, **request):
+        self.requests.append(request)
+        if self.errors:
+            raise self.errors.pop(0)
+        return "answer"
+
+
+def test_client_view_retries_with_clipped_timeouts(sleeps):
+    client = _FakeClient(httpx.ConnectTimeout("slow"))
+    view = ResilientClient(client, "story", deadline=time.monotonic() + 5)
+    assert view.chat.completions.create(model="m", messages=[], timeout=60) == "answer"
+    assert len(client.requests) == 2
+    assert all(request["timeout"] <= 5 for request in client.requests)
+
+
+def test_client_view_images_are_retried(sleeps):
+    client = _FakeClient(httpx.ReadError("reset"))
+    view = ResilientClient(client, "image")
+    assert view.images.generate(model="m", prompt="a duck") == "answer"
+    assert len(client.requests) == 2
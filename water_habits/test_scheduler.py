@@ -0,0 +1,136 @@
+# ---- SCHEDULER TESTS ----
+#   python -m pytest water_habits/test_scheduler.py
+#
+# Ordering is checked one grant at a time: the model's request bucket is
+# emptied, the waiters are queued, and each _dispatch() gets exactly one
+# request's worth of capacity.
+
+import threading
+import time
+
+import pytest
+
+from water_habits.scheduler import Scheduler, SchedulerBusy, _Waiter
+
+MODEL = "test-model"
+
+
+def _scheduler(tpm=None, **kwargs):
+    scheduler = Scheduler(limits={MODEL: (60, tpm)}, **kwargs)
+    scheduler._model_buckets(MODEL)[0].level = 0.0
+    return scheduler
+
+
+def _queue(scheduler, *waiters):
+    """Queue (kind, session[, tokens]) waiters in this order; returns them."""
+    queued = []
+    for spec in waiters:
+        kind, session, tokens = (*spec, 0)[:3]
+        waiter = _Waiter(next(scheduler._seq), MODEL, kind, session, tokens)
+        scheduler._waiting.append(waiter)
+        queued.append(waiter)
+    return queued
+
+
+def _grant_one(scheduler):
+    """Give the model one request of capacity; returns whichever waiter got it."""
+    requests, _ = scheduler._model_buckets(MODEL)
+    requests.level, requests.updated = 1.0, time.monotonic()
+    before = set(scheduler._waiting)
+    scheduler._dispatch(time.monotonic())
+    granted = [w for w in before if w.granted]
+    assert len(granted) == 1
+    return granted[0]
+
+
+def test_higher_priority_goes_first():
+    scheduler = _scheduler()
+    image, story, tip = _queue(scheduler, ("image", "a"), ("story", "b"), ("tip", "c"))
+    assert [_grant_one(scheduler) for _ in range(3)] == [tip, story, image]
+
+
+def test_same_priority_is_first_come_first_served():
+    scheduler = _scheduler()
+    first, second, third = _queue(scheduler, ("story", "a"), ("story", "b"), ("story", "c"))
+    assert [_grant_one(scheduler) for _ in range(3)] == [first, second, third]
+
+
+def test_sessions_take_turns_within_a_priority():
+    scheduler = _scheduler()
+    a1, a2, a3, b1 = _queue(scheduler, ("image", "a"), ("image", "a"), ("image", "a"), ("image", "b"))
+    # a's first call is served, then b (served 0) jumps a's backlog (served 1)
+    assert [_grant_one(scheduler) for _ in range(4)] == [a1, b1, a2, a3]
+
+
+def test_blocked_head_holds_back_lower_priority_on_the_same_model():
+    scheduler = _scheduler(tpm=1000)
+    tip, refill = _queue(scheduler, ("tip", "a", 900), ("refill", "b", 10))
+    requests, tokens = scheduler._model_buckets(MODEL)
+    requests.level, tokens.level = 2.0, 100.0
+    scheduler._dispatch(time.monotonic())
+    # The refill would fit, but it must not overtake the tip that is waiting for tokens
+    assert not tip.granted and not refill.granted
+
+    tokens.level = 1000.0
+    scheduler._dispatch(time.monotonic())
+    assert tip.granted and refill.granted
+
+
+def test_other_models_are_not_blocked():
+    scheduler = _scheduler()
+    _queue(scheduler, ("tip", "a"))
+    other = scheduler.acquire("gpt-3.5-turbo", "refill", "b")
+    assert other.granted
+    assert scheduler.stats()["waiting"] == 1
+
+
+def test_deadline_raises_scheduler_busy_and_leaves_the_queue():
+    scheduler = _scheduler()
+    started = time.monotonic()
+    with pytest.raises(SchedulerBusy):
+        scheduler.acquire(MODEL, "story", "a", deadline=started + 0.05)
+    assert time.monotonic() - started < 1.0
+    assert scheduler.stats() == {"waiting": 0, "granted": 0, "queued": 1, "rejected": 1}
+
+
+def test_max_wait_caps_a_later_deadline():
+    scheduler = _scheduler(max_wait=0.05)
+    with pytest.raises(SchedulerBusy):
+        scheduler.acquire(MODEL, "story", "a", deadline=time.monotonic() + 30)
+
+
+def test_on_wait_reports_position_and_grant_wakes_the_waiter():
+    scheduler = _scheduler()
+    ahead, = _queue(scheduler, ("tip", "a"))
+    positions = []
+    result = {}
+
+    def wait():
+        result["ticket"] = scheduler.acquire(MODEL, "story", "b", on_wait=positions.append, deadline=time.monotonic() + 5)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    for _ in range(200):
+        if positions:
+            break
+        time.sleep(0.01)
+    assert positions == [2]
+
+    with scheduler._cond:
+        scheduler._waiting.remove(ahead)  # the call ahead gave up
+        requests, _ = scheduler._model_buckets(MODEL)
+        requests.level, requests.updated = 1.0, time.monotonic()
+        scheduler._cond.notify_all()
+    thread.join(timeout=5)
+    assert result["ticket"].granted
+
+
+def test_settle_returns_unused_tokens():
+    scheduler = Scheduler(limits={MODEL: (60, 1000)})
+    ticket = scheduler.acquire(MODEL, "tip", "a", tokens=600)
+    _, tokens = scheduler._model_buckets(MODEL)
+    assert tokens.level == pytest.approx(400, abs=1)
+    scheduler.settle(ticket, 100)
+    assert tokens.level == pytest.approx(900, abs=1)
+    scheduler.settle(ticket, None)  # no usage reported: nothing changes
+    assert tokens.level == pytest.approx(900, abs=1)
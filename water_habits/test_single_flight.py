@@ -0,0 +1,231 @@
+# ---- SINGLE-FLIGHT TESTS ----
+#   python -m pytest water_habits/test_single_flight.py
+#
+# The leader's call is held on an Event until the followers have queued up
+# behind it (stats()["coalesced"]), so every case runs in a fixed order.
+
+import threading
+import time
+
+import pytest
+
+from water_habits.single_flight import SingleFlight, StreamAbandoned
+
+KEY = ("tip", 7, "Brushing Teeth")
+FOLLOWERS = 4
+
+
+class Stopped(BaseException):
+    """Stands in for Streamlit's rerun/stop exceptions."""
+
+
+def _wait_for(check, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def _run(results, fn):
+    """Thread body: store fn()'s result or exception in `results`."""
+    try:
+        results.append(fn())
+    except BaseException as e:
+        results.append(e)
+
+
+def _queue_behind(flight, start_leader, start_follower):
+    """Start the leader, then FOLLOWERS callers that must wait for it; returns the threads."""
+    threads = [start_leader()]
+    _wait_for(lambda: flight.stats()["in_flight"] == 1)
+    threads += [start_follower() for _ in range(FOLLOWERS)]
+    _wait_for(lambda: flight.stats()["coalesced"] == FOLLOWERS)
+    return threads
+
+
+def test_concurrent_callers_share_one_call():
+    flight, gate, calls, results = SingleFlight(), threading.Event(), [], []
+
+    def fn():
+        calls.append(1)
+        gate.wait(5)
+        return "Splash!"
+
+    def call():
+        return _start(_run, results, lambda: flight.do(KEY, fn))
+
+    threads = _queue_behind(flight, call, call)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["Splash!"] * (FOLLOWERS + 1)
+    assert flight.stats() == {"calls": FOLLOWERS + 1, "coalesced": FOLLOWERS, "in_flight": 0}
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_leader_error_reaches_every_follower():
+    flight, gate, calls, results = SingleFlight(), threading.Event(), [], []
+    error = ValueError("rate limited")
+
+    def fn():
+        calls.append(1)
+        gate.wait(5)
+        raise error
+
+    def call():
+        return _start(_run, results, lambda: flight.do(KEY, fn))
+
+    threads = _queue_behind(flight, call, call)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [error] * (FOLLOWERS + 1)
+    assert flight.do(KEY, lambda: "fresh") == "fresh"  # the error isn't remembered
+
+
+def test_follower_takes_over_when_the_leader_is_stopped():
+    flight, gate, calls = SingleFlight(), threading.Event(), []
+    leader, followers = [], []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            gate.wait(5)
+            raise Stopped()
+        time.sleep(0.2)  # hold the new call open while the other followers wake up
+        return "Splash!"
+
+    threads = _queue_behind(
+        flight,
+        lambda: _start(_run, leader, lambda: flight.do(KEY, fn)),
+        lambda: _start(_run, followers, lambda: flight.do(KEY, fn)),
+    )
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert isinstance(leader[0], Stopped)
+    assert followers == ["Splash!"] * FOLLOWERS
+    assert len(calls) == 2  # one follower made the call again; the rest shared it
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_stream_followers_see_every_piece():
+    flight, gate, calls, results = SingleFlight(), threading.Event(), [], []
+
+    def pieces():
+        calls.append(1)
+        yield "Drip"
+        gate.wait(5)
+        yield "-drop!"
+
+    def call():
+        return _start(_run, results, lambda: "".join(flight.do_stream(KEY, pieces)))
+
+    threads = _queue_behind(flight, call, call)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["Drip-drop!"] * (FOLLOWERS + 1)
+
+
+def test_stream_follower_gets_stream_abandoned_mid_read():
+    flight, gate = SingleFlight(), threading.Event()
+    leader, followers, seen = [], [], []
+
+    def pieces():
+        yield "Drip"
+        gate.wait(5)
+        raise Stopped()
+
+    def follow():
+        for piece in flight.do_stream(KEY, pieces):
+            seen.append(piece)
+
+    threads = _queue_behind(
+        flight,
+        lambda: _start(_run, leader, lambda: list(flight.do_stream(KEY, pieces))),
+        lambda: _start(_run, followers, follow),
+    )
+    _wait_for(lambda: len(seen) == FOLLOWERS)  # every follower has read "Drip"
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert isinstance(leader[0], Stopped)
+    assert all(isinstance(result, StreamAbandoned) for result in followers)
+    assert seen == ["Drip"] * FOLLOWERS
+
+
+def test_stream_follower_that_read_nothing_takes_over():
+    flight, gate, calls = SingleFlight(), threading.Event(), []
+    leader, followers = [], []
+
+    def pieces():
+        calls.append(1)
+        if len(calls) == 1:
+            gate.wait(5)
+            raise Stopped()
+        time.sleep(0.2)
+        yield "Splash!"
+
+    threads = _queue_behind(
+        flight,
+        lambda: _start(_run, leader, lambda: list(flight.do_stream(KEY, pieces))),
+        lambda: _start(_run, followers, lambda: "".join(flight.do_stream(KEY, pieces))),
+    )
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert isinstance(leader[0], Stopped)
+    assert followers == ["Splash!"] * FOLLOWERS
+    assert len(calls) == 2
+
+
+def test_stream_error_reaches_followers():
+    flight, gate, results = SingleFlight(), threading.Event(), []
+
+    def pieces():
+        yield "Drip"
+        gate.wait(5)
+        raise ValueError("connection reset")
+
+    def call():
+        return _start(_run, results, lambda: list(flight.do_stream(KEY, pieces)))
+
+    threads = _queue_behind(flight, call, call)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(results) == FOLLOWERS + 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.parametrize("method", ["do", "do_stream"])
+def test_nothing_left_in_flight(method):
+    flight = SingleFlight()
+    if method == "do":
+        flight.do(KEY, lambda: None)
+    else:
+        list(flight.do_stream(KEY, lambda: iter(["a"])))
+    assert flight.stats() == {"calls": 1, "coalesced": 0, "in_flight": 0}
@@ -0,0 +1,69 @@
+# ---- STATIC CACHE TESTS ----
+#   python -m pytest water_habits/test_static_cache.py
+
+import asyncio
+
+import pytest
+
+from water_habits.static_cache import IMMUTABLE, StaticCacheMiddleware, is_immutable
+
+
+@pytest.mark.parametrize("path, query, expected", [
+    ("/app/static/Photo4.jpg", b"v=41d24aa1dc2d", True),
+    ("/app/static/Photo4.jpg", b"x=1&v=41d24aa1dc2d", True),
+    ("/app/static/Photo4.jpg", b"", False),
+    ("/app/static/Photo4.jpg", b"nav=1", False),
+    ("/app/static/build/Background.ec48da02436e.w1600.avif", b"", True),
+    ("/app/static/build/Kids_in_Bathroom.10277019d305.w480.webp", b"", True),
+    ("/app/static/build/manifest.json", b"", False),
+    ("/app/static/build/Background.w1600.avif", b"", False),
+    ("/_stcore/health", b"v=1", False),
+])
+def test_is_immutable(path, query, expected):
+    assert is_immutable(path, query) is expected
+
+
+def _call(path, query=b"", status=200, headers=()):
+    """Run one request through the middleware around a stub app; returns the response headers."""
+    sent = []
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+        await send({"type": "http.response.body", "body": b"x"})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "query_string": query}
+    asyncio.run(StaticCacheMiddleware(app)(scope, None, send))
+    assert sent[1]["body"] == b"x"
+    return dict(sent[0]["headers"])
+
+
+def test_versioned_response_gets_immutable_cache_control():
+    headers = _call("/app/static/Logo.png", b"v=e5f701469408", headers=[(b"etag", b'"abc"')])
+    assert headers == {b"etag": b'"abc"', b"cache-control": IMMUTABLE}
+
+
+def test_build_variant_gets_immutable_cache_control():
+    assert _call("/app/static/build/Background.ec48da02436e.w960.webp")[b"cache-control"] == IMMUTABLE
+
+
+def test_existing_cache_control_is_replaced():
+    headers = _call("/app/static/Logo.png", b"v=1", headers=[(b"Cache-Control", b"no-cache")])
+    assert headers == {b"cache-control": IMMUTABLE}
+
+
+def test_unversioned_and_error_responses_are_left_alone():
+    assert b"cache-control" not in _call("/app/static/Logo.png")
+    assert b"cache-control" not in _call("/app/static/Missing.png", b"v=1", status=404)
+
+
+def test_non_http_scopes_pass_through():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scope["type"])
+
+    asyncio.run(StaticCacheMiddleware(app)({"type": "websocket", "path": "/_stcore/stream"}, None, None))
+    assert seen == ["websocket"]
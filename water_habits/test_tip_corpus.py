@@ -0,0 +1,144 @@
+# ---- TIP CORPUS TESTS ----
+#   python -m pytest water_habits/test_tip_corpus.py
+#
+# Round trips through the binary layout, and when open_corpus() recompiles.
+
+import csv
+import os
+
+import pytest
+
+from water_habits.tip_corpus import CorpusError, Tip, TipCorpus, compile_corpus, open_corpus
+from water_habits.tip_index import TipIndex
+
+COLUMNS = ["age_group", "routine", "base_tip", "challenge_idea", "kid_friendly_phrase"]
+
+ROWS = [
+    ["3–5", "Brushing Teeth", "Tap off while brushing.", "Count to 10!", "Be a brushing superstar — tap off!"],
+    ["6–8", "Washing Hands", "Stop the water while you lather.", "", "Water off, bubbles on 🫧"],
+    ["3–5", "Bath Time", "Half a tub is plenty.", "Belly-button high only.", "Half a tub = full fun!"],
+    ["3–5", "Brushing Teeth", "Use a cup to rinse.", "No tap at all!", "Rinse with a cup, save a bunch!"],
+    ["9–12", "Washing Hands", 'Quote "this", comma, and\nnewline.', "Ünïcödé ✓", "日本語も"],
+]
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def _tip(row):
+    return Tip(base_tip=row[2], kid_friendly_phrase=row[4], challenge_idea=row[3])
+
+
+@pytest.fixture
+def paths(tmp_path):
+    csv_path, corpus_path = tmp_path / "tips.csv", tmp_path / "cache" / "tips.corpus"
+    _write_csv(csv_path, ROWS)
+    return str(csv_path), str(corpus_path)
+
+
+def test_round_trip(paths):
+    csv_path, corpus_path = paths
+    assert compile_corpus(csv_path, corpus_path) == len(ROWS)
+    corpus = TipCorpus(corpus_path)
+
+    assert len(corpus) == len(ROWS)
+    assert corpus.age_groups == ["3–5", "6–8", "9–12"]  # order of first appearance
+    assert corpus.routines == ["Brushing Teeth", "Washing Hands", "Bath Time"]
+    for age_group in corpus.age_groups:
+        for routine in corpus.routines:
+            expected = [_tip(r) for r in ROWS if (r[0], r[1]) == (age_group, routine)]
+            assert list(corpus.rows(age_group, routine)) == expected  # CSV order kept within a group
+
+
+def test_rows_are_contiguous_and_labelled(paths):
+    csv_path, corpus_path = paths
+    compile_corpus(csv_path, corpus_path)
+    corpus = TipCorpus(corpus_path)
+    seen = {}
+    for i in range(len(corpus)):
+        seen.setdefault(corpus.labels(i), []).append(i)
+    for key, rows in seen.items():
+        assert rows == list(range(rows[0], rows[0] + len(rows)))
+        assert [corpus.row(i) for i in rows] == list(corpus.rows(*key))
+
+
+def test_rows_view_indexing(paths):
+    csv_path, corpus_path = paths
+    compile_corpus(csv_path, corpus_path)
+    rows = TipCorpus(corpus_path).rows("3–5", "Brushing Teeth")
+    assert len(rows) == 2
+    assert rows[-1] == rows[1] == _tip(ROWS[3])
+    with pytest.raises(IndexError):
+        rows[2]
+    with pytest.raises(IndexError):
+        rows[-3]
+
+
+def test_missing_group_is_empty(paths):
+    csv_path, corpus_path = paths
+    compile_corpus(csv_path, corpus_path)
+    corpus = TipCorpus(corpus_path)
+    assert len(corpus.rows("6–8", "Bath Time")) == 0
+    assert list(corpus.rows("nope", "Brushing Teeth")) == []
+
+
+def test_not_a_corpus(tmp_path):
+    bad = tmp_path / "bad.corpus"
+    bad.write_bytes(b"x" * 512)
+    with pytest.raises(CorpusError):
+        TipCorpus(str(bad))
+    bad.write_bytes(b"short")
+    with pytest.raises(CorpusError):
+        TipCorpus(str(bad))
+
+
+def test_open_corpus_compiles_once_and_reuses(paths):
+    csv_path, corpus_path = paths
+    first = open_corpus(csv_path, corpus_path)
+    built = os.stat(corpus_path).st_mtime_ns
+    second = open_corpus(csv_path, corpus_path)
+    assert os.stat(corpus_path).st_mtime_ns == built  # same stamp: mapped, not rebuilt
+    assert second.source == first.source
+
+
+def test_stale_stamp_recompiles(paths):
+    csv_path, corpus_path = paths
+    before = open_corpus(csv_path, corpus_path)
+    _write_csv(csv_path, ROWS + [["13–15", "Showers", "Short showers.", "Beat the song.", "Quick!"]])
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # newer, even on coarse clocks
+
+    after = open_corpus(csv_path, corpus_path)
+    assert after.source != before.source
+    assert len(after) == len(ROWS) + 1
+    assert list(after.rows("13–15", "Showers")) == [Tip("Short showers.", "Quick!", "Beat the song.")]
+    assert len(before) == len(ROWS)  # an old mapping keeps reading the file it opened
+
+
+def test_damaged_corpus_is_rebuilt(paths):
+    csv_path, corpus_path = paths
+    open_corpus(csv_path, corpus_path)
+    with open(corpus_path, "r+b") as f:
+        f.write(b"garbage!")
+    assert len(open_corpus(csv_path, corpus_path)) == len(ROWS)
+
+
+def test_prebuilt_corpus_without_csv(paths):
+    csv_path, corpus_path = paths
+    open_corpus(csv_path, corpus_path)
+    os.remove(csv_path)
+    assert len(open_corpus(csv_path, corpus_path)) == len(ROWS)
+
+
+def test_tip_index_reads_the_corpus(paths):
+    csv_path, corpus_path = paths
+    index = TipIndex(csv_path, corpus_path)
+    assert index.routines == ["Brushing Teeth", "Washing Hands", "Bath Time"]
+    assert index.age_group_for(4) == "3–5"
+    assert index.age_group_for(10) == "9–12"
+    assert index.pick("3–5", "Brushing Teeth") in {_tip(ROWS[0]), _tip(ROWS[3])}
+    assert index.pick("6–8", "Bath Time") is None
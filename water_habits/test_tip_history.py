@@ -0,0 +1,83 @@
+# ---- TIP HISTORY TESTS ----
+#   python -m pytest water_habits/test_tip_history.py
+#
+# The bounded history, and that each export parses back to the records it was
+# built from.
+
+import csv
+import io
+import json
+
+import pytest
+
+from water_habits.tip_history import EXPORTS, TipHistory, export_file, exporter
+
+ENTRIES = [
+    ("Maya", 7, "Brushing Teeth", "Tap off while brushing!", "Count to 10"),
+    ("Léo", "5", "Bath Time", 'Half a tub, "belly-button" high.', ""),
+    ("Sam, Jr.", 11, "Washing Hands", "Bubbles on,\nwater off 🫧", "Sing the song"),
+]
+
+
+def _history(entries=ENTRIES, cap=100):
+    history = TipHistory(cap)
+    for entry in entries:
+        history.add(*entry)
+    return history
+
+
+def _text(history, fmt):
+    return export_file(history, fmt).read().decode()
+
+
+def test_cap_drops_the_oldest():
+    history = _history([(f"kid {i}", 6, "Bath Time", f"tip {i}", "") for i in range(5)], cap=3)
+    assert len(history) == 3
+    assert [r.tip for r in history.snapshot()] == ["tip 2", "tip 3", "tip 4"]
+
+
+def test_snapshot_is_a_copy():
+    history = _history()
+    snapshot = history.snapshot()
+    history.add("Ava", 4, "Bath Time", "Short bath.", "")
+    assert len(snapshot) == len(ENTRIES) and len(history) == len(ENTRIES) + 1
+
+
+def test_age_is_stored_as_an_int():
+    assert _history().snapshot()[1].age == 5
+
+
+def test_txt_export():
+    assert _text(_history(), "txt").splitlines()[0] == "Maya (7) - Tap off while brushing!"
+
+
+def test_csv_export_round_trips():
+    rows = list(csv.reader(io.StringIO(_text(_history(), "csv"))))
+    assert rows[0] == ["name", "age", "routine", "tip", "challenge", "time"]
+    assert [row[:5] for row in rows[1:]] == [[str(v) for v in entry] for entry in ENTRIES]
+
+
+def test_json_export_round_trips():
+    items = json.loads(_text(_history(), "json"))
+    assert [[item[k] for k in ("name", "age", "routine", "tip", "challenge")] for item in items] == [
+        [name, int(age), routine, tip, challenge] for name, age, routine, tip, challenge in ENTRIES
+    ]
+    assert all("timestamp" not in item and item["time"] for item in items)
+
+
+@pytest.mark.parametrize("fmt", sorted(EXPORTS))
+def test_empty_history_exports(fmt):
+    text = _text(TipHistory(), fmt)
+    if fmt == "json":
+        assert json.loads(text) == []
+    elif fmt == "csv":
+        assert text.strip() == "name,age,routine,tip,challenge,time"
+    else:
+        assert text == ""
+
+
+def test_exporter_builds_nothing_until_called():
+    history = TipHistory()
+    export = exporter(history, "json")
+    history.add(*ENTRIES[0])  # added after the button was drawn, before the click
+    assert json.loads(export().read())[0]["name"] == "Maya"
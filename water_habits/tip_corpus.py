@@ -0,0 +1,224 @@
+# ---- TIP CORPUS ----
+# expanded_tips_data.csv compiled into a read-only columnar file that every
+# Streamlit process memory-maps. The OS page cache holds one copy for all of
+# them, nothing is parsed at startup, and drawing a tip reads a few offsets
+# and the three strings it returns.
+#
+#   python -m water_habits.tip_corpus                          # compile the CSV to CORPUS_PATH
+#   python -m water_habits.tip_corpus --csv big.csv --out tips.corpus
+#
+# TipIndex compiles it on first use (and again when the CSV changes), so the
+# command is only needed to ship a prebuilt corpus without the CSV.
+#
+# Layout (little-endian; sections start on 8-byte boundaries):
+#   header      magic, source CSV mtime_ns + size, row / dictionary / group counts
+#   directory   (offset, length) of every section below
+#   age_groups  dictionary: u32 string offsets + UTF-8 heap, in CSV order
+#   routines    dictionary: same
+#   groups      (u16 age code, u16 routine code, u32 first row, u32 row count),
+#               sorted by codes; rows are stored grouped, so a group is a range
+#   age_codes   u16 per row  (dictionary-encoded age_group column)
+#   routine_codes  u16 per row  (dictionary-encoded routine column)
+#   base_tip, kid_friendly_phrase, challenge_idea
+#               per column: u32 offsets (rows + 1) + UTF-8 heap
+
+import csv
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+CORPUS_PATH = ".cache/tips.corpus"
+MAGIC = b"WHTIPS\x00\x01"
+
+Tip = namedtuple("Tip", ["base_tip", "kid_friendly_phrase", "challenge_idea"])
+
+TEXT_COLUMNS = Tip._fields
+SECTIONS = ("age_groups", "routines", "groups", "age_codes", "routine_codes", *TEXT_COLUMNS)
+
+_HEADER = struct.Struct("<8sqqIIII")  # magic, source mtime_ns, source size, rows, ages, routines, groups
+_DIRECTORY = struct.Struct("<" + "QQ" * len(SECTIONS))
+_GROUP = struct.Struct("<HHII")
+_SPAN = struct.Struct("<II")
+
+
+class CorpusError(ValueError):
+    """The file isn't a tip corpus (or was written by another version)."""
+
+
+def source_stamp(csv_path):
+    st = os.stat(csv_path)
+    return st.st_mtime_ns, st.st_size
+
+
+# ---- COMPILING ----
+
+def _strings(values):
+    """u32 offsets (len + 1) followed by the UTF-8 heap."""
+    heap = bytearray()
+    offsets = [0]
+    for value in values:
+        heap += value.encode()
+        offsets.append(len(heap))
+    return struct.pack(f"<{len(offsets)}I", *offsets) + bytes(heap)
+
+
+def compile_corpus(csv_path, out_path):
+    """Write the corpus for `csv_path` to `out_path` (atomically); returns the row count."""
+    age_codes, routine_codes = {}, {}  # label -> code, in order of first appearance
+    groups = {}                        # (age code, routine code) -> [Tip, ...]
+    stamp = source_stamp(csv_path)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            age = age_codes.setdefault(row["age_group"], len(age_codes))
+            routine = routine_codes.setdefault(row["routine"], len(routine_codes))
+            groups.setdefault((age, routine), []).append(Tip(*(row[name] for name in TEXT_COLUMNS)))
+    if len(age_codes) > 0xFFFF or len(routine_codes) > 0xFFFF:
+        raise CorpusError("more than 65535 distinct age groups or routines")
+
+    keys = sorted(groups)
+    rows = [tip for key in keys for tip in groups[key]]
+    group_table, first = bytearray(), 0
+    for age, routine in keys:
+        group_table += _GROUP.pack(age, routine, first, len(groups[age, routine]))
+        first += len(groups[age, routine])
+
+    sections = {
+        "age_groups": _strings(age_codes),
+        "routines": _strings(routine_codes),
+        "groups": bytes(group_table),
+        "age_codes": struct.pack(f"<{len(rows)}H", *(a for a, r in keys for _ in groups[a, r])),
+        "routine_codes": struct.pack(f"<{len(rows)}H", *(r for a, r in keys for _ in groups[a, r])),
+    }
+    for i, name in enumerate(TEXT_COLUMNS):
+        sections[name] = _strings(tip[i] for tip in rows)
+
+    header = _HEADER.pack(MAGIC, *stamp, len(rows), len(age_codes), len(routine_codes), len(keys))
+    position = _HEADER.size + _DIRECTORY.size
+    directory, body = [], bytearray()
+    for name in SECTIONS:
+        padding = -position % 8
+        body += b"\0" * padding
+        position += padding
+        directory += [position, len(sections[name])]
+        body += sections[name]
+        position += len(sections[name])
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header + _DIRECTORY.pack(*directory) + body)
+    os.replace(tmp, out_path)  # readers keep their old mapping; new opens see the new file
+    return len(rows)
+
+
+# ---- READING ----
+
+class Rows:
+    """The tips of one (age group, routine): a lazy sequence, so random.choice reads one row."""
+
+    def __init__(self, corpus, first, count):
+        self._corpus = corpus
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if not -self._count <= i < self._count:
+            raise IndexError(i)
+        return self._corpus.row(self._first + i % self._count)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._corpus.row(self._first + i)
+
+
+class TipCorpus:
+    def __init__(self, path=CORPUS_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size + _DIRECTORY.size:
+            raise CorpusError(f"{path} is too short")
+        magic, mtime_ns, size, self.row_count, ages, routines, group_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise CorpusError(f"{path} is not a tip corpus")
+        self.source = (mtime_ns, size)
+        spans = _DIRECTORY.unpack_from(self._mm, _HEADER.size)
+        self._sections = {name: spans[2 * i] for i, name in enumerate(SECTIONS)}
+
+        # The dictionaries and the group table are tiny next to the text; read them once
+        self.age_groups = self._read_strings("age_groups", ages)
+        self.routines = self._read_strings("routines", routines)
+        self._groups = {}
+        for i in range(group_count):
+            age, routine, first, count = _GROUP.unpack_from(self._mm, self._sections["groups"] + i * _GROUP.size)
+            self._groups[self.age_groups[age], self.routines[routine]] = (first, count)
+
+    def _read_strings(self, section, count):
+        start = self._sections[section]
+        offsets = struct.unpack_from(f"<{count + 1}I", self._mm, start)
+        heap = start + 4 * (count + 1)
+        return [self._mm[heap + offsets[i]:heap + offsets[i + 1]].decode() for i in range(count)]
+
+    def _text(self, column, i):
+        start = self._sections[column]
+        low, high = _SPAN.unpack_from(self._mm, start + 4 * i)
+        heap = start + 4 * (self.row_count + 1)
+        return self._mm[heap + low:heap + high].decode()
+
+    def row(self, i):
+        return Tip(*(self._text(column, i) for column in TEXT_COLUMNS))
+
+    def labels(self, i):
+        """(age_group, routine) of row i, from the dictionary-encoded columns."""
+        age, = struct.unpack_from("<H", self._mm, self._sections["age_codes"] + 2 * i)
+        routine, = struct.unpack_from("<H", self._mm, self._sections["routine_codes"] + 2 * i)
+        return self.age_groups[age], self.routines[routine]
+
+    def rows(self, age_group, routine):
+        first, count = self._groups.get((age_group, routine), (0, 0))
+        return Rows(self, first, count)
+
+    def __len__(self):
+        return self.row_count
+
+
+def open_corpus(csv_path, corpus_path=CORPUS_PATH):
+    """The corpus for `csv_path`, compiled first if it's missing or older than the CSV.
+
+    Without the CSV an existing corpus is served as it is.
+    """
+    try:
+        stamp = source_stamp(csv_path)
+    except FileNotFoundError:
+        return TipCorpus(corpus_path)
+    try:
+        corpus = TipCorpus(corpus_path)
+        if corpus.source == stamp:
+            return corpus
+    except (OSError, CorpusError):
+        pass
+    compile_corpus(csv_path, corpus_path)
+    return TipCorpus(corpus_path)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compile the tips CSV into a memory-mapped columnar corpus.")
+    parser.add_argument("--csv", default="expanded_tips_data.csv")
+    parser.add_argument("--out", default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = compile_corpus(args.csv, args.out)
+    corpus = TipCorpus(args.out)
+    print(
+        f"{count} tips, {len(corpus.age_groups)} age groups, {len(corpus.routines)} routines, "
+        f"{len(corpus._groups)} groups -> {args.out} ({os.path.getsize(args.out)} bytes) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
@@ -0,0 +1,88 @@
+# ---- TIP HISTORY ----
+# The tips one session has generated, as compact records in a bounded deque
+# (the oldest record drops off at the cap), and its TXT / CSV / JSON exports.
+#
+# Exports are never built on a rerun: the Tips page hands st.download_button
+# a callable (exporter()), which Streamlit only runs when the button is
+# clicked, on a thread of its own. The export is then written chunk by chunk
+# from a generator instead of joining one big string.
+
+import csv
+import io
+import json
+import time
+from collections import deque, namedtuple
+
+HISTORY_CAP = 100  # records kept per session; "Tips Generated" still counts them all
+
+TipRecord = namedtuple("TipRecord", ["name", "age", "routine", "tip", "challenge", "timestamp"])
+
+
+class TipHistory:
+    def __init__(self, cap=HISTORY_CAP):
+        self._records = deque(maxlen=cap)
+
+    def add(self, name, age, routine, tip, challenge):
+        self._records.append(TipRecord(name, int(age), routine, tip, challenge, int(time.time())))
+
+    def snapshot(self):
+        """The records as a list; safe to take while the page is adding to the history."""
+        return list(self._records)  # deque copies in one C call, so a concurrent append can't break it
+
+    def __len__(self):
+        return len(self._records)
+
+
+def _when(record):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(record.timestamp))
+
+
+# ---- EXPORTS ----
+# Each yields the file in pieces, one record at a time
+
+def iter_txt(records):
+    for r in records:
+        yield f"{r.name} ({r.age}) - {r.tip}\n"
+
+
+def iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["name", "age", "routine", "tip", "challenge", "time"])
+    for r in records:
+        writer.writerow([r.name, r.age, r.routine, r.tip, r.challenge, _when(r)])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()  # the header, if there were no records
+
+
+def iter_json(records):
+    yield "["
+    for i, r in enumerate(records):
+        item = {**r._asdict(), "time": _when(r)}
+        del item["timestamp"]
+        yield ("," if i else "") + "\n  " + json.dumps(item, ensure_ascii=False)
+    yield "\n]\n"
+
+
+# format: (file name, mime type, generator)
+EXPORTS = {
+    "txt": ("water_tips_summary.txt", "text/plain", iter_txt),
+    "csv": ("water_tips_summary.csv", "text/csv", iter_csv),
+    "json": ("water_tips_summary.json", "application/json", iter_json),
+}
+
+
+def export_file(history, fmt):
+    """The whole export as a file object, encoded piece by piece."""
+    out = io.BytesIO()
+    for piece in EXPORTS[fmt][2](history.snapshot()):
+        out.write(piece.encode())
+    out.seek(0)
+    return out
+
+
+def exporter(history, fmt):
+    """A no-argument callable for st.download_button(data=...), so nothing is built until a click."""
+    return lambda: export_file(history, fmt)
@@ -0,0 +1,124 @@
+# ---- TIP INDEX ----
+# Process-wide lookup table for expanded_tips_data.csv.
+# The CSV is compiled once into a memory-mapped columnar corpus (tip_corpus)
+# with rows grouped by (age_group, routine), so picking a tip is a dict
+# lookup plus random.choice over a lazy range of rows: no pandas, and only
+# the picked row's bytes are read.
+
+import os
+import random
+import threading
+import time
+
+from water_habits.telemetry import TELEMETRY
+from water_habits.tip_corpus import CORPUS_PATH, open_corpus
+
+TIPS_CSV = "expanded_tips_data.csv"
+
+# Fallback bands, used only if the CSV has no parsable "min–max" age groups
+DEFAULT_AGE_GROUPS = ["3–5", "6–8", "9–12"]
+
+# How often (seconds) we stat the CSV to look for edits
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+def _parse_band(label):
+    """Turn an age-group label like '3–5' into (3, 5), or None."""
+    for dash in ("–", "-"):
+        if dash in label:
+            low, _, high = label.partition(dash)
+            try:
+                return int(low), int(high)
+            except ValueError:
+                return None
+    return None
+
+
+class TipIndex:
+    def __init__(self, csv_path=TIPS_CSV, corpus_path=CORPUS_PATH):
+        self.csv_path = csv_path
+        self.corpus_path = corpus_path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        self._corpus = None
+        self._routines = []
+        self._age_groups = []
+        self._bands = []
+        self._load()
+
+    # ---- LOADING ----
+    @TELEMETRY.timed("corpus_load")
+    def _load(self):
+        try:
+            mtime = os.stat(self.csv_path).st_mtime
+        except FileNotFoundError:
+            mtime = None  # a prebuilt corpus shipped without the CSV
+        # Recompiles when the CSV is newer than the corpus; otherwise just maps it
+        corpus = open_corpus(self.csv_path, self.corpus_path)
+
+        bands = []
+        for label in corpus.age_groups:
+            band = _parse_band(label)
+            if band:
+                bands.append((band[0], band[1], label))
+        bands.sort()
+
+        # Swap everything in at once so readers never see a half-built index
+        self._corpus = corpus
+        self._routines = list(corpus.routines)
+        self._age_groups = list(corpus.age_groups)
+        self._bands = bands
+        self._mtime = mtime
+
+    def refresh(self):
+        """Reload the CSV if it changed on disk (checked at most every few seconds)."""
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            if now - self._last_check < RELOAD_CHECK_INTERVAL:
+                return
+            self._last_check = now
+            try:
+                mtime = os.stat(self.csv_path).st_mtime
+            except OSError:
+                return  # keep serving the last good copy
+            if mtime != self._mtime:
+                try:
+                    self._load()
+                except Exception:
+                    # A half-saved CSV should not take the Tips page down
+                    pass
+
+    # ---- LOOKUPS ----
+    @property
+    def routines(self):
+        self.refresh()
+        return list(self._routines)
+
+    @property
+    def age_groups(self):
+        self.refresh()
+        return list(self._age_groups) or list(DEFAULT_AGE_GROUPS)
+
+    def age_group_for(self, age):
+        self.refresh()
+        for low, high, label in self._bands:
+            if low <= age <= high:
+                return label
+        # Same mapping the Tips page has always used
+        if 3 <= age <= 5:
+            return "3–5"
+        elif 6 <= age <= 8:
+            return "6–8"
+        return "9–12"
+
+    def tips_for(self, age_group, routine):
+        self.refresh()
+        return self._corpus.rows(age_group, routine)
+
+    def pick(self, age_group, routine):
+        """Random Tip for this age group + routine, or None if there is none."""
+        rows = self.tips_for(age_group, routine)
+        return random.choice(rows) if rows else None
@@ -0,0 +1,220 @@
+# ---- PRE-GENERATED TIP POOL ----
+# Kid-friendly rewrites of every CSV tip, generated ahead of time so
+# "Generate Tip" is a local lookup. The live API only tops up a
+# combination (tip phrase + age) in the background when it runs low.
+#
+#   python -m water_habits.tip_pool                  # build with the real API
+#   python -m water_habits.tip_pool --fake           # build with a local fake model
+#   python -m water_habits.tip_pool --variants 8 --concurrency 8
+#
+# The build is resumable: combinations that already have enough variants
+# are skipped, and every answer is written as soon as it arrives.
+
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from water_habits.sqlite_util import ThreadLocalConnection
+
+POOL_PATH = ".cache/tip_pool.sqlite3"
+AGES = range(3, 13)          # the Tips page slider range
+DEFAULT_VARIANTS = 5         # rewrites generated per combination
+MAX_SERVES = 25              # a rewrite is retired after being shown this many times
+LOW_WATER = 2                # fewer fresh rewrites than this triggers a refill
+REFILL_WORKERS = 2
+
+TIP_MODEL = "gpt-3.5-turbo"
+
+
+def tip_request(base, age):
+    """The chat.completions.create(...) arguments for one tip rewrite."""
+    return {
+        "model": TIP_MODEL,
+        "messages": [{"role": "user", "content": f"Rewrite this for a {age}-year-old in a fun way: '{base}'"}],
+        "max_tokens": 100,
+        "temperature": 0.9,
+    }
+
+
+def _phrase_key(base):
+    return hashlib.sha1(base.encode()).hexdigest()[:16]
+
+
+class TipPool:
+    def __init__(self, path=POOL_PATH, refill=None, max_serves=MAX_SERVES, low_water=LOW_WATER):
+        self.path = path
+        self.refill = refill  # callable(base, age) -> str, run off the render path
+        self.max_serves = max_serves
+        self.low_water = low_water
+        self._conn = ThreadLocalConnection(path)
+        self._refilling = set()
+        self._refill_lock = threading.Lock()
+        self._refill_pool = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS tips (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                phrase TEXT NOT NULL,
+                age INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                served INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS tips_combo ON tips (phrase, age, served);
+        """)
+
+    # ---- READ / WRITE ----
+    def add(self, base, age, text):
+        """Store one rewrite; returns False (and stores nothing) if it is empty."""
+        text = (text or "").strip()
+        if not text:
+            return False
+        self._conn().execute(
+            "INSERT INTO tips (phrase, age, text) VALUES (?, ?, ?)", (_phrase_key(base), age, text)
+        )
+        return True
+
+    def fresh_count(self, base, age):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM tips WHERE phrase = ? AND age = ? AND served < ?",
+            (_phrase_key(base), age, self.max_serves),
+        ).fetchone()[0]
+
+    def draw(self, base, age):
+        """A random fresh rewrite for this tip + age, or None if the pool has none."""
+        db = self._conn()
+        rows = db.execute(
+            "SELECT id, text FROM tips WHERE phrase = ? AND age = ? AND served < ?",
+            (_phrase_key(base), age, self.max_serves),
+        ).fetchall()
+        if len(rows) - 1 < self.low_water:
+            self.schedule_refill(base, age)
+        if not rows:
+            return None
+        tip_id, text = random.choice(rows)
+        db.execute("UPDATE tips SET served = served + 1 WHERE id = ?", (tip_id,))
+        return text
+
+    def stats(self):
+        total, fresh = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(served < ?), 0) FROM tips", (self.max_serves,)
+        ).fetchone()
+        with self._refill_lock:
+            refilling = len(self._refilling)
+        return {"tips": total, "fresh": fresh, "refilling": refilling}
+
+    # ---- BACKGROUND REFILL ----
+    def schedule_refill(self, base, age):
+        if self.refill is None:
+            return
+        combo = (base, age)
+        with self._refill_lock:
+            if combo in self._refilling:
+                return  # already topping this one up
+            self._refilling.add(combo)
+            if self._refill_pool is None:
+                self._refill_pool = ThreadPoolExecutor(max_workers=REFILL_WORKERS, thread_name_prefix="tip-refill")
+        self._refill_pool.submit(self._refill_one, base, age)
+
+    def _refill_one(self, base, age):
+        try:
+            # Bounded: a model that keeps answering with nothing mustn't keep us paying for calls
+            for _ in range(self.low_water + 1):
+                if self.fresh_count(base, age) >= self.low_water + 1:
+                    break
+                if not self.add(base, age, self.refill(base, age)):
+                    break
+        except Exception:
+            pass  # the live path still works; try again on the next draw
+        finally:
+            with self._refill_lock:
+                self._refilling.discard((base, age))
+
+
+# ---- BATCH BUILD ----
+
+def combinations(index):
+    """(phrase, age) for every CSV row and every slider age inside the row's age band."""
+    seen = set()
+    for age in AGES:
+        age_group = index.age_group_for(age)
+        for routine in index.routines:
+            for tip in index.tips_for(age_group, routine):
+                combo = (tip.kid_friendly_phrase, age)
+                if combo not in seen:
+                    seen.add(combo)
+                    yield combo
+
+
+def build_pool(pool, generate, index, variants=DEFAULT_VARIANTS, concurrency=4, verbose=True):
+    """Fill `pool` until every combination has `variants` rewrites; returns how many were added."""
+    todo = []
+    for base, age in combinations(index):
+        missing = variants - pool.fresh_count(base, age)
+        todo.extend([(base, age)] * max(0, missing))
+    if verbose:
+        print(f"{len(todo)} rewrites to generate ({concurrency} at a time)")
+
+    added = failed = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as workers:
+        futures = {workers.submit(generate, base, age): (base, age) for base, age in todo}
+        for future in as_completed(futures):
+            base, age = futures[future]
+            try:
+                if not pool.add(base, age, future.result()):
+                    raise ValueError("empty rewrite")
+                added += 1
+            except Exception as e:
+                failed += 1
+                if verbose:
+                    print(f"  failed ({age}) {base[:40]}...: {e}")
+            if verbose and (added + failed) % 50 == 0:
+                print(f"  {added + failed}/{len(todo)} in {time.monotonic() - started:.0f}s")
+    if verbose:
+        print(f"done: {added} added, {failed} failed")
+    return added
+
+
+def fake_generate(base, age):
+    """Offline stand-in for the model: a random interjection around the phrase (not reproducible)."""
+    flavor = random.choice(["Splash!", "Drip-drop!", "Water hero alert!", "Psst!"])
+    return f"{flavor} {base} (for a super {age}-year-old)"
+
+
+def openai_generate(client, timeout=None):
+    def generate(base, age):
+        response = client.chat.completions.create(timeout=timeout, **tip_request(base, age))
+        return response.choices[0].message.content.strip()
+    return generate
+
+
+def _api_key():
+    key = os.environ.get("OPENAI_API_KEY")
+    if key:
+        return key
+    import tomllib
+    with open(".streamlit/secrets.toml", "rb") as f:
+        return tomllib.load(f)["OPENAI_API_KEY"]
+
+
+if __name__ == "__main__":
+    from water_habits.tip_index import TipIndex
+
+    parser = argparse.ArgumentParser(description="Pre-generate kid-friendly tip rewrites.")
+    parser.add_argument("--out", default=POOL_PATH, help="pool file (SQLite)")
+    parser.add_argument("--variants", type=int, default=DEFAULT_VARIANTS, help="rewrites per tip + age")
+    parser.add_argument("--concurrency", type=int, default=4, help="API calls in flight at once")
+    parser.add_argument("--fake", action="store_true", help="use a local fake model instead of the API")
+    args = parser.parse_args()
+
+    if args.fake:
+        generate = fake_generate
+    else:
+        from water_habits.openai_client import make_client, timeout_for
+        generate = openai_generate(make_client(_api_key()), timeout_for("tip"))
+
+    build_pool(TipPool(args.out), generate, TipIndex(), args.variants, args.concurrency)